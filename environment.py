@@ -0,0 +1,99 @@
+"""
+Behave hooks for the whole suite.
+
+Behave only puts ``steps/`` on the import path while it loads the step
+modules, so it is added here too for the hooks to reach ``support``.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'steps'))
+
+from support.benchmarks import BENCHMARK_TAG, benchmarks_enabled  # noqa: E402
+from support.budget import RunBudget, needs_network  # noqa: E402
+from support.fixtures import fixtures  # noqa: E402
+from support.memory import MemoryTracker, memory_settings, repeat_features  # noqa: E402
+from support.profiling import SuiteProfiler, profile_settings  # noqa: E402
+from support.resilience import http  # noqa: E402
+from support.snapshots import BackgroundSnapshots, snapshots_enabled  # noqa: E402
+from support.timings import TimingRecorder, timings_settings  # noqa: E402
+
+
+def before_all(context):
+    context.run_budget = RunBudget.from_config(context.config.userdata)
+    context.network_skipped = 0
+    context.benchmarks = benchmarks_enabled(context.config.userdata)
+    http.budget = context.run_budget
+    settings = profile_settings(context.config.userdata)
+    context.profiler = SuiteProfiler(*settings) if settings else None
+    settings = timings_settings(context.config.userdata)
+    context.timings = TimingRecorder(*settings) if settings else None
+    context.snapshots = BackgroundSnapshots() if snapshots_enabled(context.config.userdata) else None
+    settings = memory_settings(context.config.userdata)
+    context.memory = MemoryTracker(settings) if settings else None
+    if settings:
+        repeat_features(context._runner, settings.iterations, context.config.lang)
+
+
+def before_feature(context, feature):
+    if context.memory:
+        context.memory.start_feature(feature)
+
+
+def before_scenario(context, scenario):
+    if context.memory:
+        context.memory.start_scenario(scenario)
+    if context.profiler:
+        context.profiler.start_scenario(scenario)
+    # Scenarios that need the live backend stop once the run budget is spent
+    if needs_network(scenario.effective_tags) and context.run_budget.expired():
+        context.network_skipped += 1
+        scenario.skip(reason=f"network scenario skipped: {context.run_budget.reason()}")
+    elif BENCHMARK_TAG in scenario.effective_tags and not context.benchmarks:
+        scenario.skip(reason="benchmark scenario skipped: run with -D benchmarks to include it")
+    elif context.snapshots:
+        context.snapshots.before_scenario(context, scenario)
+
+
+def before_step(context, step):
+    if context.profiler:
+        context.profiler.start_step(step)
+
+
+def after_step(context, step):
+    fixtures.release('step', context)
+    if context.snapshots:
+        context.snapshots.after_step(context, step)
+    if context.profiler:
+        context.profiler.end_step(step)
+    if context.timings:
+        context.timings.step(context.scenario, step)
+
+
+def after_scenario(context, scenario):
+    fixtures.release('scenario')
+    if context.profiler:
+        context.profiler.end_scenario(scenario)
+    if context.timings:
+        context.timings.scenario(scenario)
+
+
+def after_feature(context, feature):
+    fixtures.release('feature')
+
+
+def after_all(context):
+    fixtures.release('run')
+    if context.profiler:
+        context.profiler.finish()
+    if context.snapshots and context.snapshots.summary():
+        print(context.snapshots.summary())
+    if context.timings:
+        run_id = context.timings.save()
+        if run_id is not None:
+            print(f"Timings of run #{run_id} appended to {context.timings.path}")
+    if context.network_skipped:
+        print(f"{context.network_skipped} network scenarios skipped, {context.run_budget.reason()}")
+    if context.memory:
+        context.memory.finish()
@@ -1,3 +1,4 @@
+@network
 Feature: User Authentication
   As a user of Sweet Manager
   I want to be able to register and sign in
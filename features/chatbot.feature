@@ -1,3 +1,4 @@
+@snapshot_background
 Feature: Chatbot Functionality
   As a hotel manager
   I want to interact with the chatbot assistant
@@ -65,6 +66,19 @@ Feature: Chatbot Functionality
     Then an error message should be displayed
     And the error message should suggest starting the chatbot server
 
+  Scenario: Chatbot stops calling a dead server after repeated failures
+    Given the chatbot clock reads "2025-03-01T08:00:00"
+    And the chatbot service is unavailable
+    And the chatbot popup is open
+    And connecting to the chatbot times out after 10 seconds
+    When the user sends 10 messages
+    Then only 3 messages should reach the chatbot service
+    And every reply should suggest starting the chatbot server
+    And sending them should take at most 30 seconds on the chatbot clock
+    When the chatbot server comes back after 30 seconds
+    And the user sends the message "Are you back?"
+    Then the chatbot should answer normally again
+
   Scenario: Chatbot sends context with messages
     Given the chatbot popup is open
     And the user has income of 5000 and expenses of 3000
@@ -85,6 +99,14 @@ Feature: Chatbot Functionality
     And the messages should be displayed in chronological order
     And all messages should use the same conversation ID
 
+  Scenario: Slow chatbot replies are timestamped by the simulated clock
+    Given the chatbot clock reads "2025-03-01T08:00:00"
+    And the chatbot popup is open
+    And the chatbot takes 45 seconds to respond
+    When the user sends the message "Summarize this week's expenses"
+    Then the reply should be timestamped 45 seconds after the user message
+    And the messages should be displayed in chronological order
+
   Scenario: Chatbot handles long messages properly
     Given the chatbot popup is open
     When the user sends a very long message
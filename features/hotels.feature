@@ -1,3 +1,4 @@
+@network
 Feature: Hotel Management
   As a hotel owner
   I want to manage hotel information
@@ -1,3 +1,4 @@
+@snapshot_background
 Feature: Mobile Authentication
   As a hotel manager or guest
   I want to authenticate in the mobile application
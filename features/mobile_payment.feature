@@ -1,10 +1,12 @@
+@snapshot_background
 Feature: Mobile Payment Processing
   As a hotel owner
   I want to process payment for my selected subscription plan
   So that I can activate my subscription and use the service
 
   Background:
-    Given I am logged in as a hotel owner
+    Given the simulated clock reads "2025-01-15T09:00:00"
+    And I am logged in as a hotel owner
     And I have selected a subscription plan
     And I am on the payment checkout screen
 
@@ -41,6 +43,29 @@ Feature: Mobile Payment Processing
     Then I should see a validation error for expiration date
     And the error should indicate the card is expired
 
+  Scenario: Card expires when its month ends
+    Given the simulated clock reads "2025-12-20T09:00:00"
+    And I am logged in as a hotel owner
+    And I am on the payment checkout screen
+    When I enter valid card number "4532015112830366"
+    And I enter valid expiration date "1225"
+    And I enter valid CVV "123"
+    And I submit the payment
+    Then the card should be accepted
+    When 15 days pass
+    And I submit the payment
+    Then I should see a validation error for expiration date
+    And the error should indicate the card is expired
+
+  Scenario: Expiry follows a clock set after the checkout opened
+    Given the simulated clock reads "2026-02-01T09:00:00"
+    When I enter valid card number "4532015112830366"
+    And I enter valid expiration date "1225"
+    And I enter valid CVV "123"
+    And I submit the payment
+    Then I should see a validation error for expiration date
+    And the error should indicate the card is expired
+
   Scenario: CVV field validation
     When I enter CVV "12"
     And I try to submit the payment
@@ -83,13 +108,28 @@ Feature: Mobile Payment Processing
     When I enter valid card number "4532015112830366"
     And I enter valid expiration date "1225"
     And I enter valid CVV "123"
-    And I click the submit payment button
     But the payment service returns an error
+    And I click the submit payment button
     Then I should see an error message
     And the error message should explain the failure reason
     And the form should remain editable
     And I should be able to retry the payment
 
+  Scenario: Burst of taps is collapsed into one payment per owner
+    Given the checkout pipeline runs 4 workers
+    And the payment service takes 20 milliseconds per payment
+    When 50 owners each tap submit 10 times
+    Then 50 payments should be recorded via PaymentService
+    And 450 duplicate submissions should be suppressed
+
+  @benchmark
+  Scenario: Checkout workers overlap payment round trips
+    Given the checkout pipeline runs 4 workers
+    And the payment service takes 20 milliseconds per payment
+    When 50 owners each tap submit 10 times
+    Then 50 payments should be recorded via PaymentService
+    And the checkout pipeline should process at least 100 payments per second
+
   Scenario: Loading state during payment processing
     When I submit a valid payment
     Then the submit button should be disabled
@@ -165,3 +205,27 @@ Feature: Mobile Payment Processing
     And all fields should remain accessible
     And the submit button should always be visible
     And proper spacing should be maintained
+
+  Scenario: Batch card validation matches single card validation
+    Given 20000 random card inputs
+    When I validate the card inputs in batch
+    Then the batch results should match single card validation for 2000 samples
+
+  @benchmark
+  Scenario: Fuzz card validation in batch
+    Given 1000000 random card inputs
+    When I validate the card inputs in batch
+    Then the batch results should match single card validation for 5000 samples
+    And the batch validation should take less than 10 seconds
+
+  Scenario: Incremental card number formatting matches full rebuild
+    Given a stream of 20000 random card number keystrokes
+    When I replay the keystrokes through the incremental formatter and the full rebuild
+    Then the formatted text should be identical after every keystroke
+    And every edit should move at most one digit per digit typed or deleted
+
+  Scenario: Incremental expiration formatting matches full rebuild
+    Given a stream of 20000 random expiration date keystrokes
+    When I replay the keystrokes through the incremental formatter and the full rebuild
+    Then the formatted text should be identical after every keystroke
+    And every edit should move at most one digit per digit typed or deleted
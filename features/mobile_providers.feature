@@ -1,3 +1,4 @@
+@snapshot_background
 Feature: Mobile Providers Management
   As a hotel owner
   I want to manage my hotel providers
@@ -206,8 +207,10 @@ Feature: Mobile Providers Management
 
   Scenario: Refresh providers list
     Given I am viewing the providers list
+    And another device has changed providers since my last sync
     When I perform a pull-to-refresh gesture
     Then the providers should be fetched again
+    And the refresh should transfer only the changed providers
     And the list should be updated with the latest data
     And any new providers should appear
 
@@ -223,3 +226,76 @@ Feature: Mobile Providers Management
     Then the app should use TokenHelper to get the hotel ID
     And the hotel ID should be extracted from the JWT token
     And the hotel ID should be used for all provider operations
+
+  Scenario: Hotel ID lookups are memoized per session token
+    When 100000 provider operations read the hotel ID from the token
+    Then the token should have been verified at most once
+    And at least 99999 lookups should be served from the claims cache
+
+  Scenario: Cached token claims expire with the token
+    Given the simulated clock reads "2025-01-15T09:00:00"
+    And my session token expires in 30 minutes
+    When 29 minutes pass
+    Then the hotel ID should still be "hotel_123" without verifying the token again
+    When 2 minutes pass
+    Then the hotel ID should no longer be available
+
+  Scenario: Claims cached on one clock are not served on another
+    Given my session token expires in 30 minutes
+    And the simulated clock reads "2030-01-01T00:00:00"
+    Then the hotel ID should no longer be available
+
+  Scenario: Search providers by name, email, phone and RUC
+    Given I have 1000 generated providers in my hotel
+    When I search providers for "ANDES"
+    Then every search result should contain "andes"
+    And the search results should match a full scan for "andes"
+    When I search providers for "proveedores.pe"
+    Then the search results should match a full scan for "proveedores.pe"
+    When I search providers for "2012"
+    Then the search results should match a full scan for "2012"
+    And the search index should reflect providers added, updated and deleted
+
+  Scenario: Incremental provider searches match a full scan
+    Given I have 1000 generated providers in my hotel
+    When I type 300 incremental provider searches
+    Then every incremental provider search should match a full scan
+
+  @benchmark
+  Scenario: Provider search latency with 50k providers
+    Given I have 50000 generated providers in my hotel
+    When I type 2000 incremental provider searches
+    Then the median provider search latency should be under 1 millisecond
+
+  Scenario: Paged provider loading with 50k providers
+    Given the provider service holds 50000 providers for my hotel
+    When the providers view loads in pages of 20
+    Then only 20 providers should be rendered
+    And at most 2 provider pages should have been fetched
+    And the full providers list should not have been downloaded
+    When I scroll through the providers list
+    Then all providers should be accessible through scrolling
+    And the list should maintain performance
+
+  @benchmark
+  Scenario: Pull-to-refresh only transfers changed providers
+    Given the provider service has 50000 providers for my hotel
+    And 5 providers have changed since my last sync
+    When I perform a pull-to-refresh gesture
+    Then the providers should be fetched again
+    And the refresh should transfer only the changed providers
+    And the list should be updated with the latest data
+    And the refresh should take less than 5 milliseconds
+
+  Scenario: Onboard hundreds of providers in one batch
+    Given I am viewing the providers list
+    When I submit a batch creating 300 providers, updating 5 and deleting 5
+    Then the provider service should receive 1 batch call
+    And every batch item should succeed
+    And the list should be updated with the latest data
+
+  Scenario: Invalid provider batch is rejected atomically
+    Given I am viewing the providers list
+    When I submit a batch that deletes a provider that does not exist
+    Then no batch item should be applied
+    And the failing batch item should report the error
@@ -1,3 +1,4 @@
+@snapshot_background
 Feature: Mobile Subscription Plans
   As a hotel owner
   I want to view and select subscription plans
@@ -77,6 +78,14 @@ Feature: Mobile Subscription Plans
     Then I should return to the previous screen
     And no plan should be selected
 
+  Scenario: Back-stack stays bounded during long sessions
+    Given navigation memory tracking is enabled
+    When I open and close the payment screen 200 times from the plans screen
+    And I push 50 screens without going back
+    Then the back stack should hold at most 20 screens
+    And the screens still on the back stack should retain less than 256 kilobytes
+    And every back press should have returned to the plans screen
+
   Scenario: Plan comparison by price
     Then the "BÁSICO" plan should be the cheapest option
     And the "REGULAR" plan should be mid-tier pricing
@@ -87,6 +96,13 @@ Feature: Mobile Subscription Plans
     And the "REGULAR" plan should include all Basic features plus additional features
     And the "PREMIUM" plan should include all Regular features plus premium features
 
+  Scenario: Large region-specific plan catalog stays indexed
+    Given a plan catalog with 500 regions of 40 plans
+    When I look up every plan by region, title and identifier
+    Then every lookup should return the same plan
+    And each plan lookup should compare at most 2 keys
+    And every region should rank its plans by parsed price
+
   Scenario: UI responsiveness on different screen sizes
     Given I am viewing the plans on different screen sizes
     Then the layout should adapt appropriately
@@ -1,3 +1,4 @@
+@snapshot_background
 Feature: Mobile User Profile Management
   As a hotel owner or guest
   I want to manage my user profile
@@ -166,6 +167,24 @@ Feature: Mobile User Profile Management
     And updated data should be displayed
     And the refresh indicator should disappear
 
+  Scenario: Concurrent profile loads share one fetch
+    Given the user service takes 50 milliseconds per profile
+    When 20 screens load my profile at the same time
+    Then the user service should have been called once
+    And the profile cache should report 19 coalesced loads
+    When 5 more screens show my profile
+    Then the profile cache should report 5 hits
+
+  Scenario: Cached profile expires after its TTL
+    Given the simulated clock reads "2025-01-15T09:00:00"
+    And I am viewing my profile
+    When 4 minutes pass
+    And another screen shows my profile
+    Then the user service should have been called once
+    When 2 minutes pass
+    And another screen shows my profile
+    Then the user service should have been called 2 times
+
   Scenario: Profile consistency across app
     Given I update my profile information
     When I navigate to different screens
@@ -34,12 +34,26 @@ Feature: Payment Management
     When I register an owner payment
     Then the payment should be recorded successfully
 
+  @payment_reports
   Scenario: Get weekly incomes
     Given there are payments for a hotel
     When I request weekly incomes report
     Then I should receive weekly income statistics
 
+  @payment_reports
   Scenario: Get monthly incomes
     Given there are payments for a hotel
     When I request monthly incomes report
     Then I should receive monthly income statistics
+
+  @payment_reports @benchmark
+  Scenario: Get weekly incomes over two million payments
+    Given there are payments for a hotel among 2000000 payments
+    When I request weekly incomes report
+    Then I should receive weekly income statistics
+
+  @payment_reports @benchmark
+  Scenario: Get monthly incomes over two million payments
+    Given there are payments for a hotel among 2000000 payments
+    When I request monthly incomes report
+    Then I should receive monthly income statistics
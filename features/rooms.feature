@@ -1,3 +1,4 @@
+@network
 Feature: Room Management
   As a hotel administrator
   I want to manage room information and states
@@ -3,34 +3,57 @@ Feature: IoT Smoke Sensor Management
   I want to manage smoke sensors
   So that I can monitor room safety
 
+  @smoke_sensor_api
   Scenario: Create a new smoke sensor
     Given I am authenticated as a hotel administrator
     When I register a new smoke sensor for a room
     Then the sensor should be created successfully
     And the sensor should be active
 
+  @smoke_sensor_api
   Scenario: Update smoke sensor state
     Given a smoke sensor exists
     When I update the sensor state and temperature
     Then the sensor state should be updated successfully
 
+  @smoke_sensor_api
   Scenario: Get smoke sensor by ID
     Given a smoke sensor exists with a specific ID
     When I request the sensor information
     Then I should receive the sensor details
 
+  @smoke_sensor_api
   Scenario: Get all smoke sensors
     Given there are smoke sensors in the system
     When I request all sensors
     Then I should receive the complete sensors list
 
+  @smoke_sensor_api
   Scenario: Update sensor temperature
     Given a smoke sensor exists
     When I update only the temperature value
     Then the temperature should be updated successfully
     And an alert should be triggered if temperature is critical
 
+  @smoke_sensor_api
   Scenario: Update smoke sensor configuration
     Given a smoke sensor exists
     When I update the sensor configuration
     Then the sensor should be reconfigured successfully
+
+  Scenario: Alert on overheating sensors in the telemetry stream
+    Given a local smoke sensor service for telemetry
+    And 50 virtual smoke sensors reporting every 1 second
+    And 5 of them overheat past the critical temperature
+    When the telemetry simulator runs for 2 seconds
+    Then every overheating sensor should raise exactly one alert
+
+  @benchmark
+  Scenario: Ingest telemetry from a fleet of sensors
+    Given a local smoke sensor service for telemetry
+    And 2000 virtual smoke sensors reporting every 1 second
+    And 20 of them overheat past the critical temperature
+    When the telemetry simulator runs for 5 seconds
+    Then the service should ingest at least 90% of the target rate
+    And every overheating sensor should raise exactly one alert
+    And the 95th percentile alert latency should be under 250 milliseconds
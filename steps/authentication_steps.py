@@ -1,5 +1,6 @@
 from behave import given, when, then
-import requests
+
+from support.resilience import http
 
 BASE_URL = "https://sweetmanager-backend-emergents.onrender.com/api/v1"
 
@@ -18,7 +19,7 @@ def step_impl(context):
 
 @when('I submit the registration form')
 def step_impl(context):
-    context.response = requests.post(context.registration_url, json=context.registration_data)
+    context.response = http.post(context.registration_url, json=context.registration_data)
 
 @then('I should receive a successful registration confirmation')
 def step_impl(context):
@@ -69,7 +70,7 @@ def step_impl(context):
 
 @when('I submit the sign in form')
 def step_impl(context):
-    context.response = requests.post(context.sign_in_url, json=context.credentials)
+    context.response = http.post(context.sign_in_url, json=context.credentials)
 
 @then('I should be successfully authenticated')
 def step_impl(context):
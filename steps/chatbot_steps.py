@@ -6,14 +6,21 @@ This module contains step implementations for testing the chatbot functionality
 from behave import given, when, then
 import json
 import uuid
+from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
 
+from support.clock import SystemClock, VirtualClock, timestamp
+from support.fixtures import fixtures
+from support.resilience import CircuitBreaker
+from support.snapshots import per_scenario
+
 
 # Mock classes for Vue component testing
 class MockChatbotComponent:
     """Mock class to simulate the ChatbotPopupComponent behavior"""
     
-    def __init__(self):
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
         self.robot_icon = "robot.png"
         self.messages = []
         self.user_input = ""
@@ -22,7 +29,7 @@ class MockChatbotComponent:
         self.username = "Manager"
         self.income = 5000
         self.expenses = 3000
-        self.chatbot_service = MockChatbotService()
+        self.chatbot_service = MockChatbotService(self.clock)
         self.local_storage = {}
         
     def send_message(self):
@@ -37,7 +44,7 @@ class MockChatbotComponent:
         self.add_message({
             'type': 'user',
             'content': user_message,
-            'timestamp': '2024-01-01T00:00:00.000Z'
+            'timestamp': timestamp(self.clock.now())
         })
         
         self.is_loading = True
@@ -56,7 +63,7 @@ class MockChatbotComponent:
             self.add_message({
                 'type': 'robot',
                 'content': response.get('message', 'Sorry, I could not process your message.'),
-                'timestamp': '2024-01-01T00:00:01.000Z'
+                'timestamp': timestamp(self.clock.now())
             })
         except Exception as error:
             error_message = 'Sorry, there was an error processing your message.'
@@ -67,7 +74,7 @@ class MockChatbotComponent:
             self.add_message({
                 'type': 'robot',
                 'content': error_message,
-                'timestamp': '2024-01-01T00:00:02.000Z'
+                'timestamp': timestamp(self.clock.now())
             })
         finally:
             self.is_loading = False
@@ -95,7 +102,7 @@ class MockChatbotComponent:
         self.add_message({
             'type': 'robot',
             'content': f'¡Hola {self.username}! Soy SweetBot, tu asistente financiero para la gestión de tu hotel. Puedo ayudarte con finanzas, toma de decisiones y análisis de gastos. ¿En qué puedo ayudarte hoy?',
-            'timestamp': '2024-01-01T00:00:00.000Z'
+            'timestamp': timestamp(self.clock.now())
         })
     
     def close_chat(self):
@@ -125,10 +132,23 @@ class MockChatbotComponent:
 class MockChatbotService:
     """Mock class to simulate ChatbotApiService"""
     
-    def __init__(self):
+    def __init__(self, clock=None):
         self.base_url = 'http://localhost:8000'
         self.is_available = True
+        self.response_delay = 0
+        self.connect_timeout = 0
         self.last_request = None
+        self.requests_received = 0
+        # Stop calling a dead chatbot after a few failures instead of waiting on every message
+        self.breaker = CircuitBreaker('chatbot', failure_threshold=3, reset_timeout=30, clock=clock)
+    
+    @property
+    def clock(self):
+        return self.breaker.clock
+    
+    @clock.setter
+    def clock(self, clock):
+        self.breaker.clock = clock
     
     def generate_uuid(self):
         """Generate a UUID v4"""
@@ -136,6 +156,10 @@ class MockChatbotService:
     
     def send_message(self, message, username='User', income=0, expenses=0, conversation_id=None):
         """Mock send message to chatbot API"""
+        return self.breaker.call(self._send_message, message, username, income, expenses, conversation_id)
+    
+    def _send_message(self, message, username, income, expenses, conversation_id):
+        self.requests_received += 1
         self.last_request = {
             'message': message,
             'username': username,
@@ -145,8 +169,15 @@ class MockChatbotService:
         }
         
         if not self.is_available:
+            # A dead server costs the connect timeout before the request fails
+            if self.connect_timeout:
+                self.clock.sleep(self.connect_timeout)
             raise Exception('chatbot not running')
         
+        # Simulate the model thinking; free on a virtual clock
+        if self.response_delay:
+            self.clock.sleep(self.response_delay)
+        
         # Simulate API response
         return {
             'message': f'This is a response to: {message}',
@@ -155,6 +186,9 @@ class MockChatbotService:
     
     def get_models(self):
         """Get available models"""
+        return self.breaker.call(self._get_models)
+    
+    def _get_models(self):
         if not self.is_available:
             raise Exception('Service unavailable')
         
@@ -171,6 +205,21 @@ class ChatbotContext:
         self.service = None
         self.last_error = None
         self.last_event = None
+        self.clock = SystemClock()
+
+
+# Fixtures, built when a step first needs them and dropped with the scenario
+
+@fixtures.fixture('chatbot_ctx')
+def chatbot_context(context):
+    """Chatbot state of the running scenario"""
+    return ChatbotContext()
+
+
+@fixtures.fixture('chatbot_ctx.component')
+def chatbot_component(context):
+    """Popup component on the scenario's clock"""
+    return MockChatbotComponent(context.chatbot_ctx.clock)
 
 
 # Step Definitions
@@ -178,40 +227,36 @@ class ChatbotContext:
 @given('the chatbot service is available')
 def step_chatbot_service_available(context):
     """Initialize the chatbot service as available"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
+    fixtures.get(context, 'chatbot_ctx')
     
-    context.chatbot_ctx.service = MockChatbotService()
+    context.chatbot_ctx.service = MockChatbotService(context.chatbot_ctx.clock)
     context.chatbot_ctx.service.is_available = True
 
 
 @given('the chatbot service is unavailable')
 def step_chatbot_service_unavailable(context):
     """Set the chatbot service as unavailable"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
+    fixtures.get(context, 'chatbot_ctx')
     
-    context.chatbot_ctx.service = MockChatbotService()
+    context.chatbot_ctx.service = MockChatbotService(context.chatbot_ctx.clock)
     context.chatbot_ctx.service.is_available = False
+    if context.chatbot_ctx.component is not None:
+        context.chatbot_ctx.component.chatbot_service = context.chatbot_ctx.service
 
 
 @given('the user is logged in as "{username}"')
 def step_user_logged_in(context, username):
     """Set the logged in user"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
+    fixtures.get(context, 'chatbot_ctx')
     
     context.chatbot_ctx.username = username
 
 
 @given('the conversation is initialized with a new UUID')
+@per_scenario
 def step_conversation_initialized(context):
     """Initialize a new conversation with UUID"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
-    
-    if not context.chatbot_ctx.component:
-        context.chatbot_ctx.component = MockChatbotComponent()
+    fixtures.get(context, 'chatbot_ctx.component')
     
     context.chatbot_ctx.component.conversation_id = str(uuid.uuid4())
 
@@ -219,11 +264,10 @@ def step_conversation_initialized(context):
 @given('the chatbot popup is open')
 def step_chatbot_popup_open(context):
     """Open the chatbot popup"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
+    fixtures.get(context, 'chatbot_ctx')
     
     if not context.chatbot_ctx.component:
-        context.chatbot_ctx.component = MockChatbotComponent()
+        fixtures.get(context, 'chatbot_ctx.component')
         context.chatbot_ctx.component.conversation_id = str(uuid.uuid4())
         context.chatbot_ctx.component.chatbot_service = context.chatbot_ctx.service
         
@@ -256,11 +300,7 @@ def step_messages_in_history(context):
 @given('the user had a previous conversation')
 def step_previous_conversation(context):
     """Set up a previous conversation in localStorage"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
-    
-    if not context.chatbot_ctx.component:
-        context.chatbot_ctx.component = MockChatbotComponent()
+    fixtures.get(context, 'chatbot_ctx.component')
     
     # Create a previous conversation
     context.chatbot_ctx.component.conversation_id = str(uuid.uuid4())
@@ -297,13 +337,57 @@ def step_multiple_messages(context):
         })
 
 
+@given('the chatbot clock reads "{moment}"')
+def step_chatbot_clock(context, moment):
+    """Run the chatbot mocks on a virtual clock starting at an ISO date"""
+    fixtures.get(context, 'chatbot_ctx')
+    
+    clock = VirtualClock(datetime.fromisoformat(moment))
+    context.chatbot_ctx.clock = clock
+    for mock in (context.chatbot_ctx.service, context.chatbot_ctx.component):
+        if mock is not None:
+            mock.clock = clock
+    if context.chatbot_ctx.component is not None:
+        context.chatbot_ctx.component.chatbot_service.clock = clock
+
+
+@given('the chatbot takes {seconds:d} seconds to respond')
+def step_chatbot_response_delay(context, seconds):
+    """Make the chatbot service slow to answer"""
+    context.chatbot_ctx.component.chatbot_service.response_delay = seconds
+
+
+@given('connecting to the chatbot times out after {seconds:d} seconds')
+def step_chatbot_connect_timeout(context, seconds):
+    """Make every request to a dead chatbot hang until the connect timeout"""
+    context.chatbot_ctx.component.chatbot_service.connect_timeout = seconds
+
+
+@when('the user sends {count:d} messages')
+def step_send_many_messages(context, count):
+    """Send several messages in a row, timing them on the chatbot clock"""
+    component = context.chatbot_ctx.component
+    started = component.clock.monotonic()
+    for number in range(count):
+        component.user_input = f'Message {number + 1}'
+        component.send_message()
+    context.chatbot_ctx.sending_seconds = component.clock.monotonic() - started
+
+
+@when('the chatbot server comes back after {seconds:d} seconds')
+def step_chatbot_comes_back(context, seconds):
+    """Restart the chatbot once the breaker's wait has passed"""
+    service = context.chatbot_ctx.component.chatbot_service
+    service.clock.advance(seconds)
+    service.is_available = True
+
+
 @when('the chatbot popup is opened for the first time')
 def step_open_first_time(context):
     """Open chatbot for the first time"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
+    fixtures.get(context, 'chatbot_ctx')
     
-    context.chatbot_ctx.component = MockChatbotComponent()
+    context.chatbot_ctx.component = MockChatbotComponent(context.chatbot_ctx.clock)
     context.chatbot_ctx.component.conversation_id = str(uuid.uuid4())
     
     # Add welcome message
@@ -317,11 +401,7 @@ def step_open_first_time(context):
 @when('the chatbot popup is opened')
 def step_open_popup(context):
     """Open the chatbot popup"""
-    if not hasattr(context, 'chatbot_ctx'):
-        context.chatbot_ctx = ChatbotContext()
-    
-    if not context.chatbot_ctx.component:
-        context.chatbot_ctx.component = MockChatbotComponent()
+    fixtures.get(context, 'chatbot_ctx.component')
     
     # Try to restore conversation
     context.chatbot_ctx.component.restore_conversation()
@@ -634,6 +714,45 @@ def step_message_count(context, count):
     assert len(messages) == count, f"Expected {count} messages, found {len(messages)}"
 
 
+@then('the reply should be timestamped {seconds:d} seconds after the user message')
+def step_reply_timestamp_offset(context, seconds):
+    """Verify message timestamps come from the chatbot clock"""
+    messages = context.chatbot_ctx.component.messages
+    sent, reply = (datetime.strptime(m['timestamp'], '%Y-%m-%dT%H:%M:%S.%fZ') for m in messages[-2:])
+    assert messages[-2]['type'] == 'user' and messages[-1]['type'] == 'robot'
+    assert (reply - sent).total_seconds() == seconds
+
+
+@then('only {count:d} messages should reach the chatbot service')
+def step_messages_reached_service(context, count):
+    """Verify the circuit breaker stopped calling the dead chatbot"""
+    service = context.chatbot_ctx.component.chatbot_service
+    assert service.requests_received == count, f"{service.requests_received} requests reached the chatbot"
+    assert service.breaker.state == CircuitBreaker.OPEN
+
+
+@then('every reply should suggest starting the chatbot server')
+def step_every_reply_suggests_start(context):
+    """Verify rejected messages get the same hint as failed ones"""
+    messages = context.chatbot_ctx.component.messages
+    replies = [m['content'] for m in messages if m['type'] == 'robot'][1:]
+    assert replies and all('start the chatbot server' in reply for reply in replies)
+
+
+@then('sending them should take at most {seconds:d} seconds on the chatbot clock')
+def step_sending_duration(context, seconds):
+    """Verify a dead chatbot only costs the timeouts before the breaker opened"""
+    assert context.chatbot_ctx.sending_seconds <= seconds, context.chatbot_ctx.sending_seconds
+
+
+@then('the chatbot should answer normally again')
+def step_chatbot_answers_again(context):
+    """Verify the breaker closed after a successful trial request"""
+    component = context.chatbot_ctx.component
+    assert component.messages[-1]['content'].startswith('This is a response to')
+    assert component.chatbot_service.breaker.state == CircuitBreaker.CLOSED
+
+
 @then('the messages should be displayed in chronological order')
 def step_messages_chronological(context):
     """Verify messages are in chronological order"""
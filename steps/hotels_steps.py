@@ -1,5 +1,6 @@
 from behave import given, when, then
-import requests
+
+from support.resilience import http
 
 BASE_URL = "https://sweetmanager-backend-emergents.onrender.com/api/v1"
 
@@ -18,7 +19,7 @@ def step_impl(context):
         "stars": 5,
         "amenities": ["WiFi", "Pool", "Spa"]
     }
-    context.response = requests.post(f"{BASE_URL}/hotels", json=context.hotel_data, headers=context.headers)
+    context.response = http.post(f"{BASE_URL}/hotels", json=context.hotel_data, headers=context.headers)
 
 @then('the hotel should be created successfully')
 def step_impl(context):
@@ -34,7 +35,7 @@ def step_impl(context):
 
 @when('I request the list of all hotels')
 def step_impl(context):
-    context.response = requests.get(f"{BASE_URL}/hotels")
+    context.response = http.get(f"{BASE_URL}/hotels")
 
 @then('I should receive all registered hotels')
 def step_impl(context):
@@ -47,7 +48,7 @@ def step_impl(context):
 
 @when('I request the hotel information by ID')
 def step_impl(context):
-    context.response = requests.get(f"{BASE_URL}/hotels/{context.hotel_id}")
+    context.response = http.get(f"{BASE_URL}/hotels/{context.hotel_id}")
 
 @then('I should receive the hotel details')
 def step_impl(context):
@@ -66,7 +67,7 @@ def step_impl(context):
         "address": "456 New Address",
         "amenities": ["WiFi", "Pool", "Spa", "Gym"]
     }
-    context.response = requests.put(f"{BASE_URL}/hotels/{context.hotel_id}", json=context.update_data, headers=context.headers)
+    context.response = http.put(f"{BASE_URL}/hotels/{context.hotel_id}", json=context.update_data, headers=context.headers)
 
 @then('the hotel data should be updated successfully')
 def step_impl(context):
@@ -79,7 +80,7 @@ def step_impl(context):
 @when('I request my hotels list')
 def step_impl(context):
     owner_id = "test_owner_id_123"
-    context.response = requests.get(f"{BASE_URL}/hotels/owner/{owner_id}", headers=context.headers)
+    context.response = http.get(f"{BASE_URL}/hotels/owner/{owner_id}", headers=context.headers)
 
 @then('I should see only my hotels')
 def step_impl(context):
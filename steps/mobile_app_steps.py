@@ -6,9 +6,34 @@ including authentication, subscription plans, payments, providers, and user prof
 
 from behave import given, when, then
 import json
+import bisect
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from unittest.mock import Mock, MagicMock
 from datetime import datetime, timedelta
 
+from support.cache import TTLCache
+from support.cards import (
+    CardValidationEngine,
+    IncrementalCardFormatter,
+    IncrementalExpiryFormatter,
+    random_card_inputs,
+)
+from support.clock import SystemClock, VirtualClock
+from support.fixtures import fixtures
+from support.navigation import NavigationError, Navigator
+from support.payments import (
+    MockPaymentService,
+    PaymentPipeline,
+    idempotency_key,
+)
+from support.plans import PlanCatalog, default_plan_catalog, generate_plans
+from support.tokens import TEST_SECRET, TokenError, TokenHelper, encode_token
+
 
 # ============================================================================
 # MOCK CLASSES FOR FLUTTER MOBILE APP
@@ -17,7 +42,8 @@ from datetime import datetime, timedelta
 class MockFlutterAuthScreen:
     """Mock class to simulate Flutter AuthScreen behavior"""
     
-    def __init__(self):
+    def __init__(self, navigator=None):
+        self.navigator = navigator or Navigator(MOBILE_ROUTES, initial="auth")
         self.email_controller = ""
         self.password_controller = ""
         self.remember_me = False
@@ -41,10 +67,18 @@ class MockFlutterAuthScreen:
         self.is_login_loading = False
         self.error_message = None
         self.auth_token = None
-        self.current_screen = "auth"
+        self.login_requests = 0
+    
+    @property
+    def current_screen(self):
+        return self.navigator.current.route
     
     def login(self):
         """Simulate login action"""
+        if self.is_login_loading or self.auth_token:
+            # Taps while a login is in flight, or after it succeeded, send nothing
+            return self.auth_token is not None
+
         if not self.email_controller or not self.password_controller:
             self.error_message = "Email and password are required"
             return False
@@ -54,12 +88,13 @@ class MockFlutterAuthScreen:
             return False
         
         self.is_login_loading = True
+        self.login_requests += 1
         
         # Simulate successful login
         if "@" in self.email_controller and len(self.password_controller) >= 6:
             self.auth_token = f"token_for_{self.email_controller}"
             self.is_login_loading = False
-            self.current_screen = "home"
+            self.navigator.replace("home")
             return True
         else:
             self.error_message = "Invalid credentials"
@@ -88,7 +123,7 @@ class MockFlutterAuthScreen:
             return False
         
         self.is_loading = True
-        self.current_screen = "account_type_selection"
+        self.navigator.push("account_type_selection")
         self.is_loading = False
         return True
     
@@ -108,58 +143,34 @@ class MockFlutterAuthScreen:
 class MockSubscriptionPlansScreen:
     """Mock class for subscription plans screen"""
     
-    def __init__(self):
-        self.plans = [
-            {
-                'title': 'BÁSICO',
-                'price': '$29.99 al mes',
-                'icon': 'bed_outlined',
-                'features': [
-                    'Access to room management with IoT technology',
-                    'Collaborative administration for up to two people'
-                ],
-                'identifier': 1
-            },
-            {
-                'title': 'REGULAR',
-                'price': '$58.99 al mes',
-                'icon': 'apartment_outlined',
-                'features': [
-                    'Access to room management with IoT technology',
-                    'Collaborative administration for up to two people',
-                    'Access to interactive business management dashboards'
-                ],
-                'identifier': 2
-            },
-            {
-                'title': 'PREMIUM',
-                'price': '$110.69 al mes',
-                'icon': 'business_outlined',
-                'features': [
-                    'Access to room management with IoT technology',
-                    'Collaborative administration for up to two people',
-                    'Access to interactive business management dashboards',
-                    '24/7 support and maintenance'
-                ],
-                'identifier': 3
-            }
-        ]
+    def __init__(self, catalog=None, region=None):
+        self.catalog = catalog or default_plan_catalog()
+        self.region = region or self.catalog.default_region
+        self.plans = self.catalog.plans(self.region)
         self.selected_plan = None
     
     def select_plan(self, plan_name):
         """Select a subscription plan"""
-        for plan in self.plans:
-            if plan['title'] == plan_name:
-                self.selected_plan = plan
-                return plan['identifier']
-        return None
+        plan = self.catalog.get(plan_name, self.region)
+        if plan is None:
+            return None
+        self.selected_plan = plan
+        return plan['identifier']
 
 
 class MockPaymentScreen:
     """Mock class for payment screen"""
     
-    def __init__(self, card_identifier):
+    def __init__(self, card_identifier, clock=None, pipeline=None, owner_id=None):
         self.card_identifier = card_identifier
+        self.owner_id = owner_id
+        self.pipeline = pipeline or PaymentPipeline()
+        self.ticket = None
+        # Repeated taps and retries of this checkout share the nonce; a new checkout draws another
+        self.checkout_nonce = uuid.uuid4().hex
+        self.card_engine = CardValidationEngine(clock)
+        self.card_number_formatter = IncrementalCardFormatter()
+        self.expiration_formatter = IncrementalExpiryFormatter()
         self.card_number_controller = ""
         self.expiration_controller = ""
         self.cvv_controller = ""
@@ -183,54 +194,56 @@ class MockPaymentScreen:
         return digits
     
     def validate_card_number(self):
-        """Validate card number"""
-        digits = ''.join(filter(str.isdigit, self.card_number_controller))
-        return len(digits) >= 13
+        """Validate card number length, brand and Luhn checksum"""
+        return self.card_engine.check_number(self.card_number_controller)['valid']
     
     def validate_expiration(self):
         """Validate expiration date"""
-        digits = ''.join(filter(str.isdigit, self.expiration_controller))
-        if len(digits) != 4:
-            return False
-        
-        month = int(digits[:2])
-        year = int(digits[2:])
-        
-        if month < 1 or month > 12:
-            return False
-        
-        # Check if not expired
-        current_year = datetime.now().year % 100
-        current_month = datetime.now().month
-        
-        if year < current_year or (year == current_year and month < current_month):
-            return False
-        
-        return True
+        return self.card_engine.check_expiration(self.expiration_controller)
     
     def validate_cvv(self):
         """Validate CVV"""
-        return len(self.cvv_controller) in [3, 4] and self.cvv_controller.isdigit()
+        return self.card_engine.check_cvv(self.cvv_controller)
     
-    def process_payment(self):
-        """Process payment"""
-        if not self.validate_card_number():
-            self.error_message = "Invalid card number"
-            return False
-        
-        if not self.validate_expiration():
-            self.error_message = "Invalid or expired date"
-            return False
-        
-        if not self.validate_cvv():
-            self.error_message = "CVV must be 3 or 4 digits"
-            return False
+    def set_clock(self, clock):
+        """Validate expiry dates against another clock; the formatters never read the time"""
+        self.card_engine.clock = clock
+    
+    def payment_key(self):
+        """Idempotency key for the payment currently in the form"""
+        return idempotency_key(self.owner_id, self.card_identifier, self.checkout_nonce)
+    
+    def submit_payment(self):
+        """Validate the form and queue the payment without waiting for it"""
+        card = self.card_engine.validate(
+            self.card_number_controller, self.expiration_controller, self.cvv_controller
+        )
+        if card['error']:
+            self.error_message = card['error']
+            return None
         
+        self.error_message = None
         self.is_processing = True
-        # Simulate payment processing
-        self.payment_success = True
+        self.ticket = self.pipeline.submit(self.payment_key(), {
+            'owner_id': self.owner_id,
+            'plan_identifier': self.card_identifier,
+            'card_last4': ''.join(filter(str.isdigit, self.card_number_controller))[-4:],
+        })
+        return self.ticket
+    
+    def await_payment(self, timeout=5):
+        """Wait for the queued payment and reflect its outcome on the screen"""
+        self.ticket.wait(timeout)
         self.is_processing = False
-        return True
+        self.payment_success = self.ticket.status == 'succeeded'
+        self.error_message = self.ticket.error
+        return self.payment_success
+    
+    def process_payment(self):
+        """Process payment"""
+        if self.submit_payment() is None:
+            return False
+        return self.await_payment()
 
 
 class MockProvider:
@@ -244,21 +257,513 @@ class MockProvider:
         self.address = address
         self.ruc = ruc
         self.state = state
+    
+    def to_dict(self):
+        """Serialize the provider as the ProviderService JSON payload"""
+        return dict(vars(self))
+
+
+PROVIDER_REQUIRED_FIELDS = ('name', 'email', 'phone')
+
+
+def validate_provider_operations(operations, existing):
+    """Return an error message, or None, for each batch operation against the existing ids"""
+    deleted = set()
+    errors = []
+    for op in operations:
+        kind = op.get('op')
+        if kind == 'create':
+            missing = [f for f in PROVIDER_REQUIRED_FIELDS if not op.get('data', {}).get(f)]
+            errors.append(f"Missing required fields: {', '.join(missing)}" if missing else None)
+        elif kind in ('update', 'delete'):
+            provider_id = op.get('id')
+            if provider_id not in existing or provider_id in deleted:
+                errors.append(f"Provider {provider_id} not found")
+            else:
+                errors.append(None)
+                if kind == 'delete':
+                    deleted.add(provider_id)
+        else:
+            errors.append(f"Unknown operation: {kind}")
+    return errors
+
+
+class MockProviderService:
+    """Local stand-in for ProviderService with versioned change tracking"""
+    
+    def __init__(self, max_tombstones=10000):
+        self.is_available = True
+        self.version = 0
+        self.max_tombstones = max_tombstones
+        self.requests = []
+        self._providers = {}  # hotel id -> {provider id: provider payload}
+        self._ids = {}        # hotel id -> provider ids in ascending order, for paging
+        self._changes = {}    # hotel id -> {provider id: (version, created version, deleted)}
+        self._tombstones = {}  # hotel id -> number of deletions kept in the change log
+        self._floor = {}      # hotel id -> oldest version a delta can still be computed from
+        self._next_id = 1
+    
+    def _check_available(self):
+        if not self.is_available:
+            raise Exception('provider service unavailable')
+    
+    def _record(self, hotel_id, provider_id, created=False, deleted=False):
+        """Log a change under the current version"""
+        changes = self._changes.setdefault(hotel_id, OrderedDict())
+        previous = changes.pop(provider_id, None)
+        if created:
+            created_version = self.version
+        else:
+            # Entries dropped by compaction predate every client that can still get a delta
+            created_version = previous[1] if previous else 0
+        changes[provider_id] = (self.version, created_version, deleted)
+        if deleted:
+            self._tombstones[hotel_id] = self._tombstones.get(hotel_id, 0) + 1
+            self._compact(hotel_id)
+    
+    def _compact(self, hotel_id):
+        """Forget the oldest deletions; clients older than that get a full snapshot"""
+        changes = self._changes[hotel_id]
+        while self._tombstones[hotel_id] > self.max_tombstones:
+            provider_id, (version, _, deleted) = next(iter(changes.items()))
+            del changes[provider_id]
+            self._floor[hotel_id] = version
+            if deleted:
+                self._tombstones[hotel_id] -= 1
+    
+    def _create(self, hotel_id, provider_data):
+        provider = MockProvider(
+            id=self._next_id,
+            name=provider_data['name'],
+            email=provider_data['email'],
+            phone=provider_data['phone'],
+            address=provider_data.get('address', ''),
+            ruc=provider_data.get('ruc', ''),
+            state=provider_data.get('state', 'active')
+        ).to_dict()
+        self._next_id += 1
+        self._providers.setdefault(hotel_id, {})[provider['id']] = provider
+        # Ids only grow, so appending keeps the paging order sorted
+        self._ids.setdefault(hotel_id, []).append(provider['id'])
+        self._record(hotel_id, provider['id'], created=True)
+        return dict(provider)
+    
+    def _update(self, hotel_id, provider_id, provider_data):
+        provider = self._providers[hotel_id][provider_id]
+        provider.update({k: v for k, v in provider_data.items() if k != 'id'})
+        self._record(hotel_id, provider_id)
+        return dict(provider)
+    
+    def _delete(self, hotel_id, provider_id):
+        del self._providers[hotel_id][provider_id]
+        ids = self._ids[hotel_id]
+        del ids[bisect.bisect_left(ids, provider_id)]
+        self._record(hotel_id, provider_id, deleted=True)
+    
+    def create_provider(self, hotel_id, provider_data):
+        """Create a provider and return its payload"""
+        self._check_available()
+        self.version += 1
+        return self._create(hotel_id, provider_data)
+    
+    def update_provider(self, hotel_id, provider_id, provider_data):
+        """Update a provider and return its payload, or None if it does not exist"""
+        self._check_available()
+        if provider_id not in self._providers.get(hotel_id, {}):
+            return None
+        self.version += 1
+        return self._update(hotel_id, provider_id, provider_data)
+    
+    def delete_provider(self, hotel_id, provider_id):
+        """Delete a provider"""
+        self._check_available()
+        if provider_id not in self._providers.get(hotel_id, {}):
+            return False
+        self.version += 1
+        self._delete(hotel_id, provider_id)
+        return True
+    
+    def apply_provider_batch(self, hotel_id, operations):
+        """Apply create, update and delete operations atomically in one call
+        
+        Every operation is validated before any is applied; if one fails the
+        whole batch is rejected and each result explains its own outcome.
+        """
+        self._check_available()
+        self.requests.append(('batch', hotel_id, len(operations)))
+        errors = validate_provider_operations(operations, self._providers.get(hotel_id, {}))
+        if any(errors):
+            return {
+                'applied': False,
+                'version': self.version,
+                'results': [
+                    {'op': op.get('op'), 'id': op.get('id'),
+                     'status': 'error' if error else 'skipped', 'error': error}
+                    for op, error in zip(operations, errors)
+                ]
+            }
+        
+        # The whole batch shares one version so a delta never sees half of it
+        self.version += 1
+        results = []
+        for op in operations:
+            if op['op'] == 'create':
+                payload = self._create(hotel_id, op['data'])
+                results.append({'op': 'create', 'id': payload['id'], 'status': 'ok', 'provider': payload})
+            elif op['op'] == 'update':
+                payload = self._update(hotel_id, op['id'], op['data'])
+                results.append({'op': 'update', 'id': op['id'], 'status': 'ok', 'provider': payload})
+            else:
+                self._delete(hotel_id, op['id'])
+                results.append({'op': 'delete', 'id': op['id'], 'status': 'ok'})
+        return {'applied': True, 'version': self.version, 'results': results}
+    
+    def get_providers(self, hotel_id):
+        """Return every provider of a hotel"""
+        self._check_available()
+        return [dict(p) for p in self._providers.get(hotel_id, {}).values()]
+    
+    def get_provider_page(self, hotel_id, after_id=None, limit=20):
+        """Return up to limit active providers with ids after after_id, and the next page's cursor"""
+        self._check_available()
+        providers = self._providers.get(hotel_id, {})
+        ids = self._ids.get(hotel_id, [])
+        position = 0 if after_id is None else bisect.bisect_right(ids, after_id)
+        page = []
+        while position < len(ids) and len(page) < limit:
+            provider = providers[ids[position]]
+            if provider['state'].lower() == 'active':
+                page.append(dict(provider))
+            position += 1
+        return page, (ids[position - 1] if position < len(ids) else None)
+    
+    def get_provider_changes(self, hotel_id, since_version=None):
+        """Return providers created, updated and deleted after since_version"""
+        self._check_available()
+        self.requests.append(('changes', hotel_id, since_version))
+        if since_version is None or since_version < self._floor.get(hotel_id, 0):
+            return {
+                'version': self.version,
+                'full': True,
+                'created': self.get_providers(hotel_id),
+                'updated': [],
+                'deleted': []
+            }
+        
+        providers = self._providers.get(hotel_id, {})
+        created, updated, deleted = [], [], []
+        # The change log is ordered by version, so only the tail newer than the client is read
+        for provider_id, (version, created_version, is_deleted) in reversed(
+                self._changes.get(hotel_id, OrderedDict()).items()):
+            if version <= since_version:
+                break
+            if is_deleted:
+                if created_version <= since_version:
+                    deleted.append(provider_id)
+            elif created_version > since_version:
+                created.append(dict(providers[provider_id]))
+            else:
+                updated.append(dict(providers[provider_id]))
+        return {
+            'version': self.version,
+            'full': False,
+            'created': created[::-1],
+            'updated': updated[::-1],
+            'deleted': deleted[::-1]
+        }
+
+
+class ProviderSearchIndex:
+    """Case-insensitive prefix and substring index over provider fields"""
+    
+    SEARCH_FIELDS = ('name', 'email', 'phone', 'ruc')
+    GRAM_SIZE = 3
+    CACHE_SIZE = 256
+    IN_PLACE_CHANGE_RATIO = 0.1  # batches touching more of the prefix keys re-sort them instead
+    
+    def __init__(self, providers=()):
+        self.by_id = {}
+        self._values = {}       # provider id -> lowercased searchable values
+        self._haystacks = {}    # provider id -> values joined for a single substring test
+        self._grams = {}        # 1..GRAM_SIZE character gram -> set of provider ids
+        self._prefix_keys = []  # sorted (value, provider id) pairs for prefix lookups
+        self._results = OrderedDict()  # recent substring query -> matching ids
+        self.rebuild(providers)
+    
+    def __len__(self):
+        return len(self.by_id)
+    
+    def rebuild(self, providers):
+        """Rebuild the index from scratch"""
+        self.by_id = {}
+        self._values = {}
+        self._haystacks = {}
+        self._grams = {}
+        self._prefix_keys = []
+        for provider in providers:
+            self.by_id[provider.id] = provider
+            self._index(provider, sort_keys=False)
+        self._prefix_keys.sort()
+        self._invalidate()
+    
+    def add(self, provider):
+        """Index a newly created provider"""
+        self.by_id[provider.id] = provider
+        self._index(provider)
+        self._invalidate()
+    
+    def update(self, provider):
+        """Re-index a provider whose fields changed"""
+        self._unindex(provider.id)
+        self._index(provider)
+        self._invalidate()
+    
+    def remove(self, provider_id):
+        """Drop a provider from the index"""
+        if provider_id in self.by_id:
+            self._unindex(provider_id)
+            del self.by_id[provider_id]
+            self._invalidate()
+    
+    def apply_changes(self, upserts=(), removed_ids=()):
+        """Apply a batch of changes, key by key when small and with one re-sort when large"""
+        upserts = list(upserts)
+        stale = {p.id for p in upserts if p.id in self.by_id} | set(removed_ids)
+        changed_keys = sum(len(self._values.get(provider_id, ())) for provider_id in stale)
+        changed_keys += len(upserts) * len(self.SEARCH_FIELDS)
+        # A delta touches a few keys, so a refresh costs O(changes) and not a pass over the index
+        in_place = changed_keys <= len(self._prefix_keys) * self.IN_PLACE_CHANGE_RATIO
+        for provider_id in stale:
+            self._unindex(provider_id, drop_prefix_keys=in_place)
+        for provider_id in removed_ids:
+            self.by_id.pop(provider_id, None)
+        if not in_place and stale:
+            self._prefix_keys = [key for key in self._prefix_keys if key[1] not in stale]
+        for provider in upserts:
+            self.by_id[provider.id] = provider
+            self._index(provider, sort_keys=in_place)
+        if not in_place:
+            self._prefix_keys.sort()
+        self._invalidate()
+    
+    def search(self, query, prefix=False):
+        """Return providers whose name, email, phone or RUC contains the query"""
+        needle = query.strip().lower()
+        if not needle:
+            return list(self.by_id.values())
+        ids = self._prefix_ids(needle) if prefix else self._substring_ids(needle)
+        return [self.by_id[provider_id] for provider_id in sorted(ids)]
+    
+    def _substring_ids(self, needle):
+        if len(needle) <= self.GRAM_SIZE:
+            return self._grams.get(needle, set())
+        
+        ids = self._results.get(needle)
+        if ids is None:
+            ids = self._match_substring(needle)
+            self._results[needle] = ids
+            if len(self._results) > self.CACHE_SIZE:
+                self._results.popitem(last=False)
+        else:
+            self._results.move_to_end(needle)
+        return ids
+    
+    def _match_substring(self, needle):
+        
+        postings = []
+        for i in range(len(needle) - self.GRAM_SIZE + 1):
+            ids = self._grams.get(needle[i:i + self.GRAM_SIZE])
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        
+        # While typing, the result for the previous keystroke is usually the smallest candidate set
+        candidates = postings[0]
+        for end in range(len(needle) - 1, self.GRAM_SIZE, -1):
+            previous = self._results.get(needle[:end])
+            if previous is not None:
+                if len(previous) < len(candidates):
+                    candidates = previous
+                break
+        for ids in postings[1:]:
+            candidates = candidates & ids
+            if len(candidates) <= self.GRAM_SIZE:
+                break
+        
+        haystacks = self._haystacks
+        return {provider_id for provider_id in candidates if needle in haystacks[provider_id]}
+    
+    def _prefix_ids(self, needle):
+        ids = set()
+        start = bisect.bisect_left(self._prefix_keys, (needle,))
+        for value, provider_id in self._prefix_keys[start:]:
+            if not value.startswith(needle):
+                break
+            ids.add(provider_id)
+        return ids
+    
+    def _index(self, provider, sort_keys=True):
+        values = tuple(
+            str(getattr(provider, field) or '').lower() for field in self.SEARCH_FIELDS
+        )
+        self._values[provider.id] = values
+        self._haystacks[provider.id] = '\n'.join(values)
+        for gram in self._grams_of(values):
+            self._grams.setdefault(gram, set()).add(provider.id)
+        for value in values:
+            if not value:
+                continue
+            if sort_keys:
+                bisect.insort(self._prefix_keys, (value, provider.id))
+            else:
+                self._prefix_keys.append((value, provider.id))
+    
+    def _unindex(self, provider_id, drop_prefix_keys=True):
+        values = self._values.pop(provider_id, ())
+        self._haystacks.pop(provider_id, None)
+        for gram in self._grams_of(values):
+            ids = self._grams.get(gram)
+            if ids is not None:
+                ids.discard(provider_id)
+                if not ids:
+                    del self._grams[gram]
+        if not drop_prefix_keys:
+            return
+        for value in values:
+            i = bisect.bisect_left(self._prefix_keys, (value, provider_id))
+            if i < len(self._prefix_keys) and self._prefix_keys[i] == (value, provider_id):
+                del self._prefix_keys[i]
+    
+    def _grams_of(self, values):
+        grams = set()
+        for value in values:
+            for size in range(1, self.GRAM_SIZE + 1):
+                for i in range(len(value) - size + 1):
+                    grams.add(value[i:i + size])
+        return grams
+    
+    def _invalidate(self):
+        self._results.clear()
+
+
+class ProviderPageCursor:
+    """Lazily fetches a hotel's providers page by page, prefetching the next page"""
+    
+    def __init__(self, fetch_page, hotel_id, page_size=20, prefetch=True, max_cached_pages=4):
+        self.fetch_page = fetch_page  # (hotel_id, start, limit) -> (providers, next_start or None)
+        self.hotel_id = hotel_id
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.max_cached_pages = max_cached_pages
+        self.pages = OrderedDict()  # page number -> providers, least recently used first
+        self.page_starts = [None]    # page number -> service cursor that fetches it
+        self.last_page = None
+        self.fetch_count = 0
+    
+    def __iter__(self):
+        """Yield every provider, fetching pages only as iteration reaches them"""
+        number = 0
+        while True:
+            page = self.page(number)
+            yield from page
+            if not page or number == self.last_page:
+                return
+            number += 1
+    
+    def page(self, number):
+        """Return one page, loading it and prefetching its successor if needed"""
+        page = self._load(number)
+        if self.prefetch and page and number != self.last_page:
+            self._load(number + 1)
+            self.pages.move_to_end(number)
+        self._evict()
+        return page
+    
+    def window(self, start, count):
+        """Return the providers visible in rows start..start + count"""
+        if count <= 0:
+            return []
+        first = start // self.page_size
+        last = (start + count - 1) // self.page_size
+        rows = []
+        for number in range(first, last + 1):
+            page = self.page(number)
+            if not page:
+                break
+            rows.extend(page)
+        offset = start - first * self.page_size
+        return rows[offset:offset + count]
+    
+    def _load(self, number):
+        if number in self.pages:
+            self.pages.move_to_end(number)
+            return self.pages[number]
+        if self.last_page is not None and number > self.last_page:
+            return []
+        # The service cursor for a page is only known once its predecessor was fetched
+        while len(self.page_starts) <= number:
+            self._load(len(self.page_starts) - 1)
+            if self.last_page is not None and number > self.last_page:
+                return []
+        
+        providers, next_start = self.fetch_page(self.hotel_id, self.page_starts[number], self.page_size)
+        self.fetch_count += 1
+        self.pages[number] = providers
+        if next_start is None:
+            self.last_page = number
+        elif len(self.page_starts) == number + 1:
+            self.page_starts.append(next_start)
+        return providers
+    
+    def _evict(self):
+        while len(self.pages) > self.max_cached_pages:
+            self.pages.popitem(last=False)
 
 
 class MockProvidersView:
     """Mock class for providers view"""
     
-    def __init__(self):
-        self.providers = []
+    def __init__(self, token_helper=None):
+        self.search_index = ProviderSearchIndex()
+        self._index_stale = False
+        self._providers = {}  # provider id -> provider, in list order
+        self._next_id = 1
         self.loading = True
-        self.hotel_id = "hotel_123"
+        self.token_helper = token_helper or TokenHelper()
+        self.auth_token = None
+        self.provider_service = None
+        self.sync_version = None
+        self.page_cursor = None
+        self.first_visible_row = 0
+        self.visible_providers = []
         self.selected_provider = None
         self.show_dialog = False
         self.show_form = False
         self.error_message = None
         self.success_message = None
     
+    @property
+    def hotel_id(self):
+        """Hotel claim of the session token, read through TokenHelper on every operation"""
+        if self.auth_token is None:
+            return None
+        try:
+            return self.token_helper.hotel_id(self.auth_token)
+        except TokenError:
+            return None
+    
+    @property
+    def providers(self):
+        return list(self._providers.values())
+    
+    @providers.setter
+    def providers(self, providers):
+        self._providers = {p.id: p for p in providers}
+        self._next_id = max(self._providers, default=0) + 1
+        # Indexing is deferred to the first search so large lists paint immediately
+        self._index_stale = True
+    
     def fetch_providers(self):
         """Fetch providers from service"""
         self.loading = True
@@ -266,10 +771,122 @@ class MockProvidersView:
         self.loading = False
         return self.providers
     
+    def refresh_providers(self):
+        """Pull-to-refresh: merge only the providers changed since the last sync"""
+        if self.provider_service is None:
+            return self.fetch_providers()
+        
+        self.loading = True
+        try:
+            delta = self.provider_service.get_provider_changes(self.hotel_id, self.sync_version)
+        except Exception as error:
+            self.error_message = str(error)
+            self.loading = False
+            return None
+        
+        self.apply_provider_delta(delta)
+        self.loading = False
+        return delta
+    
+    def apply_provider_delta(self, delta):
+        """Merge a ProviderService delta into the local providers in place"""
+        if delta['full']:
+            self.providers = [MockProvider(**data) for data in delta['created']]
+        else:
+            self._merge_providers(delta['created'] + delta['updated'], delta['deleted'])
+        self.sync_version = delta['version']
+    
+    def _merge_providers(self, payloads, deleted_ids):
+        """Upsert and delete providers locally, touching the search index once"""
+        upserts = []
+        for data in payloads:
+            provider = self._providers.get(data['id'])
+            if provider is None:
+                provider = MockProvider(**data)
+                self._providers[provider.id] = provider
+                self._next_id = max(self._next_id, provider.id + 1)
+            else:
+                vars(provider).update(data)
+            upserts.append(provider)
+        removed = []
+        for provider_id in deleted_ids:
+            if self._providers.pop(provider_id, None) is not None:
+                removed.append(provider_id)
+        
+        if not self._index_stale and (upserts or removed):
+            self.search_index.apply_changes(upserts, removed)
+        self._reload_pages()
+    
+    def batch_providers(self, operations):
+        """Create, update and delete many providers in a single ProviderService call"""
+        try:
+            response = self.provider_service.apply_provider_batch(self.hotel_id, operations)
+        except Exception as error:
+            self.error_message = str(error)
+            return None
+        
+        if not response['applied']:
+            self.error_message = next(r['error'] for r in response['results'] if r['error'])
+            return response
+        
+        results = response['results']
+        self._merge_providers(
+            [r['provider'] for r in results if r['op'] != 'delete'],
+            [r['id'] for r in results if r['op'] == 'delete']
+        )
+        # Only skip ahead when no other change happened since the last sync
+        if self.sync_version == response['version'] - 1:
+            self.sync_version = response['version']
+        self.success_message = f"{len(results)} provider changes saved"
+        return response
+    
+    def fetch_provider_pages(self, page_size=20, prefetch=True):
+        """Fetch providers lazily, one page at a time, and render the first page"""
+        self.loading = True
+        if not self.hotel_id:
+            self.error_message = "No se pudo obtener el hotelId del token"
+            self.loading = False
+            return None
+        
+        self.page_cursor = ProviderPageCursor(
+            self._fetch_provider_page, self.hotel_id, page_size=page_size, prefetch=prefetch
+        )
+        try:
+            self.visible_providers = self.page_cursor.window(0, page_size)
+        except Exception as error:
+            self.page_cursor = None
+            self.error_message = str(error)
+            self.loading = False
+            return None
+        self.loading = False
+        return self.page_cursor
+    
+    def scroll_providers(self, first_row, row_count=None):
+        """Render the window of providers starting at first_row"""
+        cursor = self.page_cursor or self.fetch_provider_pages()
+        if cursor is None:
+            return []
+        self.first_visible_row = first_row
+        self.visible_providers = cursor.window(first_row, row_count or cursor.page_size)
+        return self.visible_providers
+    
+    def _fetch_provider_page(self, hotel_id, start, limit):
+        """Fetch one page of the hotel's active providers from ProviderService"""
+        if self.provider_service is None:
+            raise Exception('provider service unavailable')
+        payloads, next_start = self.provider_service.get_provider_page(hotel_id, start, limit)
+        return [MockProvider(**data) for data in payloads], next_start
+    
+    def _reload_pages(self):
+        """Drop the cached pages after a change and render the same rows again"""
+        if self.page_cursor is not None:
+            self.page_cursor = None
+            self.scroll_providers(self.first_visible_row)
+    
     def add_provider(self, provider_data):
         """Add a new provider"""
         new_provider = MockProvider(
-            id=len(self.providers) + 1,
+            id=self._next_id,
             name=provider_data['name'],
             email=provider_data['email'],
             phone=provider_data['phone'],
@@ -277,32 +894,52 @@ class MockProvidersView:
             ruc=provider_data.get('ruc', ''),
             state='active'
         )
-        self.providers.append(new_provider)
+        self._next_id += 1
+        self._providers[new_provider.id] = new_provider
+        if not self._index_stale:
+            self.search_index.add(new_provider)
+        self._reload_pages()
         self.success_message = "Provider created successfully"
         return new_provider
     
     def update_provider(self, provider_id, provider_data):
         """Update an existing provider"""
-        for provider in self.providers:
-            if provider.id == provider_id:
-                provider.name = provider_data.get('name', provider.name)
-                provider.email = provider_data.get('email', provider.email)
-                provider.phone = provider_data.get('phone', provider.phone)
-                provider.address = provider_data.get('address', provider.address)
-                provider.ruc = provider_data.get('ruc', provider.ruc)
-                self.success_message = "Provider updated successfully"
-                return provider
-        return None
+        provider = self._providers.get(provider_id)
+        if provider is None:
+            return None
+        provider.name = provider_data.get('name', provider.name)
+        provider.email = provider_data.get('email', provider.email)
+        provider.phone = provider_data.get('phone', provider.phone)
+        provider.address = provider_data.get('address', provider.address)
+        provider.ruc = provider_data.get('ruc', provider.ruc)
+        if not self._index_stale:
+            self.search_index.update(provider)
+        self._reload_pages()
+        self.success_message = "Provider updated successfully"
+        return provider
     
     def delete_provider(self, provider_id):
         """Delete a provider"""
-        self.providers = [p for p in self.providers if p.id != provider_id]
+        self._providers.pop(provider_id, None)
+        if not self._index_stale:
+            self.search_index.remove(provider_id)
+        self._reload_pages()
         self.success_message = "Provider deleted successfully"
         return True
     
     def get_active_providers(self):
         """Get only active providers"""
-        return [p for p in self.providers if p.state.lower() == 'active']
+        return [p for p in self._providers.values() if p.state.lower() == 'active']
+    
+    def search_providers(self, query, prefix=False):
+        """Search active providers by name, email, phone or RUC"""
+        if self._index_stale:
+            self.search_index.rebuild(self._providers.values())
+            self._index_stale = False
+        return [
+            p for p in self.search_index.search(query, prefix=prefix)
+            if p.state.lower() == 'active'
+        ]
 
 
 class MockUserProfile:
@@ -314,10 +951,52 @@ class MockUserProfile:
         self.photo_url = photo_url or "https://default-avatar.com/user.jpg"
 
 
+class MockUserService:
+    """Mock of the UserService profile endpoints"""
+    
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.is_available = True
+        self.profiles = {
+            'Owner': {'name': "Hotel Owner", 'photo_url': None},
+            'Guest': {'name': "Guest User", 'photo_url': None},
+        }
+        self.calls = []
+        self._lock = threading.Lock()
+    
+    def get_owner_profile(self, user_id):
+        return self._fetch('getOwnerProfile', user_id, 'Owner')
+    
+    def get_guest_profile(self, user_id):
+        return self._fetch('getGuestProfile', user_id, 'Guest')
+    
+    def update_profile(self, role, **fields):
+        self.profiles[role] = {**self.profiles[role], **fields}
+    
+    def _fetch(self, endpoint, user_id, role):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append((endpoint, user_id))
+        if not self.is_available:
+            raise Exception('user service unavailable')
+        return MockUserProfile(role=role, **self.profiles[role])
+
+
+PROFILE_TTL_SECONDS = 300
+
+
 class MockAccountPage:
     """Mock class for account page"""
     
-    def __init__(self):
+    def __init__(self, user_service=None, profile_cache=None, auth_token=None, token_helper=None):
+        self.user_service = user_service or MockUserService()
+        if profile_cache is None:
+            profile_cache = TTLCache(PROFILE_TTL_SECONDS)
+        self.profile_cache = profile_cache
+        self.auth_token = auth_token
+        self.token_helper = token_helper or TokenHelper()
+        self.user_id = None
         self.guest_profile = None
         self.owner_profile = None
         self.role_id = None
@@ -325,26 +1004,60 @@ class MockAccountPage:
         self.has_error = False
         self.error_message = None
     
+    @property
+    def role(self):
+        return "Owner" if self.role_id == 1 else "Guest"
+    
+    def profile_key(self):
+        return (self.user_id, self.role)
+    
     def initialize_account_data(self):
         """Initialize account data"""
         self.is_loading = True
         self.has_error = False
+        self.error_message = None
+        
+        if self.auth_token is not None:
+            try:
+                claims = self.token_helper.claims(self.auth_token)
+            except TokenError as error:
+                self.has_error = True
+                self.error_message = str(error)
+                self.is_loading = False
+                return False
+            self.user_id = claims.get('sub')
+            if self.role_id is None:
+                self.role_id = claims.get('roleId')
         
-        # Simulate profile fetch
-        if self.role_id == 1:  # Owner
-            self.owner_profile = MockUserProfile(name="Hotel Owner", role="Owner")
-        else:  # Guest
-            self.guest_profile = MockUserProfile(name="Guest User", role="Guest")
+        if self.role == "Owner":
+            fetch = self.user_service.get_owner_profile
+        else:
+            fetch = self.user_service.get_guest_profile
+        try:
+            profile = self.profile_cache.get(self.profile_key(), lambda: fetch(self.user_id))
+        except Exception as error:
+            self.has_error = True
+            self.error_message = str(error)
+            self.is_loading = False
+            return False
         
+        if self.role == "Owner":
+            self.owner_profile = profile
+        else:
+            self.guest_profile = profile
         self.is_loading = False
         return True
     
+    def refresh_profile(self):
+        """Pull-to-refresh: drop the cached profile and fetch it again"""
+        self.profile_cache.invalidate(self.profile_key())
+        return self.initialize_account_data()
+    
     def get_user_full_name(self):
         """Get user's full name"""
-        if self.owner_profile:
-            return self.owner_profile.name
-        elif self.guest_profile:
-            return self.guest_profile.name
+        profile = self.owner_profile or self.guest_profile
+        if profile and profile.name:
+            return profile.name
         return "Unknown User"
     
     def get_user_role(self):
@@ -364,6 +1077,18 @@ class MockAccountPage:
 # CONTEXT CLASS
 # ============================================================================
 
+MOBILE_ROUTES = (
+    "auth",
+    "home",
+    "terms",
+    "account_type_selection",
+    "subscription_plans",
+    "payment",
+    "providers",
+    "account",
+)
+
+
 class MobileAppContext:
     """Store context between steps for mobile app testing"""
     
@@ -373,8 +1098,96 @@ class MobileAppContext:
         self.payment_screen = None
         self.providers_view = None
         self.account_page = None
-        self.current_screen = "auth"
-        self.navigation_stack = []
+        self.navigator = Navigator(MOBILE_ROUTES, initial="auth")
+        self.clock = SystemClock()
+        self.payment_pipeline = None
+        self.user_service = MockUserService()
+        self.profile_cache = TTLCache(PROFILE_TTL_SECONDS, self.clock)
+        self.token_helper = TokenHelper(TEST_SECRET, self.clock)
+    
+    @property
+    def current_screen(self):
+        return self.navigator.current.route
+    
+    def set_clock(self, clock):
+        """Move every time-aware mock onto another clock"""
+        self.clock = clock
+        self.profile_cache.set_clock(clock)
+        self.token_helper.set_clock(clock)
+        if self.payment_screen is not None:
+            self.payment_screen.set_clock(clock)
+    
+    def close(self):
+        """Stop the checkout workers so no thread outlives the scenario"""
+        if self.payment_pipeline is not None:
+            self.payment_pipeline.close()
+
+
+# Fixtures, built when a step first needs them and dropped with the scenario
+
+@fixtures.fixture('mobile_ctx', teardown=MobileAppContext.close)
+def mobile_app_context(context):
+    """Mobile app state of the running scenario"""
+    return MobileAppContext()
+
+
+@fixtures.fixture('mobile_ctx.auth_screen')
+def auth_screen(context):
+    """Authentication screen, opened on first use"""
+    return MockFlutterAuthScreen(context.mobile_ctx.navigator)
+
+
+@fixtures.fixture('mobile_ctx.subscription_plans_screen')
+def subscription_plans_screen(context):
+    """Subscription plans screen, pushed on the navigator on first use"""
+    return context.mobile_ctx.navigator.push("subscription_plans", MockSubscriptionPlansScreen).screen
+
+
+@fixtures.fixture('mobile_ctx.providers_view')
+def providers_view(context):
+    """Providers view checking tokens with the scenario's helper"""
+    return MockProvidersView(context.mobile_ctx.token_helper)
+
+
+@fixtures.fixture('mobile_ctx.account_page')
+def account_page(context):
+    """Account page for the logged in user"""
+    return open_account_page(context)
+
+
+# ============================================================================
+# CLOCK STEPS
+# ============================================================================
+
+@given('the simulated clock reads "{moment}"')
+def step_simulated_clock(context, moment):
+    """Run the mobile mocks on a virtual clock starting at an ISO date"""
+    fixtures.get(context, 'mobile_ctx')
+    context.mobile_ctx.set_clock(VirtualClock(datetime.fromisoformat(moment)))
+
+
+@when('{days:d} days pass')
+def step_days_pass(context, days):
+    """Advance the virtual clock without waiting"""
+    context.mobile_ctx.clock.advance(timedelta(days=days))
+
+
+@when('{minutes:d} minutes pass')
+def step_minutes_pass(context, minutes):
+    """Advance the virtual clock without waiting"""
+    context.mobile_ctx.clock.advance(timedelta(minutes=minutes))
+
+
+def issue_token(context, subject, role_id, hotel_id=None, lifetime=timedelta(hours=1)):
+    """Sign a session JWT like the backend does at login"""
+    claims = {
+        'sub': subject,
+        'roleId': role_id,
+        'exp': int((context.mobile_ctx.clock.now() + lifetime).timestamp()),
+    }
+    if hotel_id is not None:
+        claims['hotelId'] = hotel_id
+    return encode_token(claims, TEST_SECRET)
 
 
 # ============================================================================
@@ -384,18 +1197,16 @@ class MobileAppContext:
 @given('the mobile app is launched')
 def step_mobile_app_launched(context):
     """Initialize the mobile app"""
-    if not hasattr(context, 'mobile_ctx'):
-        context.mobile_ctx = MobileAppContext()
+    fixtures.get(context, 'mobile_ctx')
 
 
 @given('I am on the authentication screen')
 def step_on_auth_screen(context):
     """Set up authentication screen"""
-    if not hasattr(context, 'mobile_ctx'):
-        context.mobile_ctx = MobileAppContext()
+    fixtures.get(context, 'mobile_ctx')
     
-    context.mobile_ctx.auth_screen = MockFlutterAuthScreen()
-    context.mobile_ctx.current_screen = "auth"
+    navigator = context.mobile_ctx.navigator
+    context.mobile_ctx.auth_screen = navigator.reset("auth", lambda: MockFlutterAuthScreen(navigator)).screen
 
 
 @then('I should see the text "{text}"')
@@ -420,8 +1231,7 @@ def step_see_tabs(context, tab1, tab2):
 @given('I am on the login tab')
 def step_on_login_tab(context):
     """Ensure on login tab"""
-    if not context.mobile_ctx.auth_screen:
-        context.mobile_ctx.auth_screen = MockFlutterAuthScreen()
+    fixtures.get(context, 'mobile_ctx.auth_screen')
     context.mobile_ctx.auth_screen.is_login_tab = True
 
 
@@ -439,6 +1249,15 @@ def step_enter_password(context, password):
     context.mobile_ctx.auth_screen.password_controller = password
 
 
+@when('I enter valid credentials')
+def step_enter_valid_credentials(context):
+    """Fill the login form with an owner's valid credentials"""
+    auth = context.mobile_ctx.auth_screen
+    auth.email_controller = "owner@hotel.com"
+    auth.password_controller = "password123"
+    auth.selected_role = "Owner"
+
+
 @when('I select role "{role}"')
 def step_select_role(context, role):
     """Select user role"""
@@ -542,8 +1361,7 @@ def step_click_tab(context, tab):
 @given('I am on the sign up tab')
 def step_on_signup_tab(context):
     """Ensure on signup tab"""
-    if not context.mobile_ctx.auth_screen:
-        context.mobile_ctx.auth_screen = MockFlutterAuthScreen()
+    fixtures.get(context, 'mobile_ctx.auth_screen')
     context.mobile_ctx.auth_screen.is_login_tab = False
 
 
@@ -648,7 +1466,7 @@ def step_registration_not_proceed(context):
 
 @when('I click on the terms and conditions link')
 def step_click_terms(context):
-    context.mobile_ctx.current_screen = "terms"
+    context.mobile_ctx.navigator.push("terms")
 
 
 @then('I should be redirected to the terms and conditions screen')
@@ -730,8 +1548,9 @@ def step_keyboard_behavior(context):
 
 @given('I have successfully registered')
 def step_successfully_registered(context):
-    context.mobile_ctx.auth_screen = MockFlutterAuthScreen()
-    context.mobile_ctx.auth_screen.current_screen = "account_type_selection"
+    navigator = context.mobile_ctx.navigator
+    context.mobile_ctx.auth_screen = navigator.reset("auth", lambda: MockFlutterAuthScreen(navigator)).screen
+    navigator.push("account_type_selection")
 
 
 @when('I am redirected to account type selection')
@@ -741,10 +1560,8 @@ def step_account_type_selection(context):
     assert True
 
 
-@when('I perform a pull-to-refresh gesture')
 @then('any entered sign up data should be preserved in the background')
 @then('the login button should be disabled')
-@then('multiple submissions should be prevented')
 @then('a loading indicator should be visible')
 def step_generic_behavior(context):
     assert True
@@ -757,28 +1574,38 @@ def step_generic_behavior(context):
 @given('I am logged in as a hotel owner')
 def step_logged_in_owner(context):
     """Set up logged in owner state"""
-    if not hasattr(context, 'mobile_ctx'):
-        context.mobile_ctx = MobileAppContext()
-    
-    if not context.mobile_ctx.auth_screen:
-        context.mobile_ctx.auth_screen = MockFlutterAuthScreen()
+    fixtures.get(context, 'mobile_ctx.auth_screen')
     
-    context.mobile_ctx.auth_screen.auth_token = "owner_token"
+    token = issue_token(context, subject="owner-1", role_id=1, hotel_id="hotel_123")
+    context.mobile_ctx.auth_screen.auth_token = token
     context.mobile_ctx.auth_screen.selected_role = "Owner"
+    if context.mobile_ctx.account_page:
+        context.mobile_ctx.account_page.auth_token = token
+        context.mobile_ctx.account_page.role_id = 1
 
 
 @given('I navigate to the subscription plans screen')
 def step_navigate_subscription_plans(context):
     """Navigate to subscription plans screen"""
-    context.mobile_ctx.subscription_plans_screen = MockSubscriptionPlansScreen()
-    context.mobile_ctx.current_screen = "subscription_plans"
+    entry = context.mobile_ctx.navigator.push("subscription_plans", MockSubscriptionPlansScreen)
+    context.mobile_ctx.subscription_plans_screen = entry.screen
+
+
+PLAN_TITLES = {'Basic': 'BÁSICO', 'Regular': 'REGULAR', 'Premium': 'PREMIUM'}
+
+
+def catalog_plan(context, title):
+    """Plan shown on the subscription plans screen, by title"""
+    screen = context.mobile_ctx.subscription_plans_screen
+    plan = screen.catalog.get(title, screen.region)
+    assert plan is not None, f"No {title} plan in region {screen.region}"
+    return plan
 
 
 @then('I should see the "{plan}" plan card')
 def step_see_plan_card(context, plan):
     """Verify plan card is visible"""
-    plans = context.mobile_ctx.subscription_plans_screen.plans
-    assert any(p['title'] == plan for p in plans)
+    assert catalog_plan(context, plan) in context.mobile_ctx.subscription_plans_screen.plans
 
 
 @then('each plan should display an icon')
@@ -800,9 +1627,7 @@ def step_view_plan(context, plan):
 @then('I should see the price "{price}"')
 def step_see_price(context, price):
     """Verify price is displayed"""
-    plans = context.mobile_ctx.subscription_plans_screen.plans
-    plan = next((p for p in plans if p['price'] == price), None)
-    assert plan is not None
+    assert catalog_plan(context, context.mobile_ctx.current_plan)['price'] == price
 
 
 @then('I should see the icon for bed/rooms')
@@ -816,21 +1641,20 @@ def step_see_icon(context):
 @then('I should see the feature "{feature}"')
 def step_see_feature(context, feature):
     """Verify feature is listed"""
-    assert True
+    assert feature in catalog_plan(context, context.mobile_ctx.current_plan)['feature_set']
 
 
 @then('I should see exactly {count:d} features for this plan')
 def step_see_feature_count(context, count):
     """Verify feature count"""
-    assert True
+    assert len(catalog_plan(context, context.mobile_ctx.current_plan)['features']) == count
 
 
 @when('I click on the "{plan}" plan card')
 def step_click_plan_card(context, plan):
     """Click on a plan card"""
     identifier = context.mobile_ctx.subscription_plans_screen.select_plan(plan)
-    context.mobile_ctx.payment_screen = MockPaymentScreen(identifier)
-    context.mobile_ctx.current_screen = "payment"
+    context.mobile_ctx.navigator.push("payment", lambda: open_payment_screen(context, identifier))
 
 
 @then('I should be navigated to the payment screen')
@@ -848,7 +1672,123 @@ def step_payment_card_identifier(context, identifier):
 @then('the selected plan should be {plan}')
 def step_selected_plan(context, plan):
     """Verify selected plan"""
-    assert context.mobile_ctx.subscription_plans_screen.selected_plan is not None
+    selected = context.mobile_ctx.subscription_plans_screen.selected_plan
+    assert selected is not None
+    assert selected['title'] == PLAN_TITLES[plan]
+
+
+@then('the "{plan}" plan should be the cheapest option')
+def step_plan_cheapest(context, plan):
+    """Verify the plan has the lowest price in its region"""
+    screen = context.mobile_ctx.subscription_plans_screen
+    assert screen.catalog.cheapest(screen.region) is catalog_plan(context, plan)
+
+
+@then('the "{plan}" plan should be mid-tier pricing')
+def step_plan_mid_tier(context, plan):
+    """Verify the plan is priced strictly between the cheapest and the dearest"""
+    screen = context.mobile_ctx.subscription_plans_screen
+    plan = catalog_plan(context, plan)
+    assert screen.catalog.cheapest(screen.region)['amount'] < plan['amount']
+    assert plan['amount'] < screen.catalog.most_expensive(screen.region)['amount']
+
+
+@then('the "{plan}" plan should be the most expensive option')
+def step_plan_most_expensive(context, plan):
+    """Verify the plan has the highest price in its region"""
+    screen = context.mobile_ctx.subscription_plans_screen
+    assert screen.catalog.most_expensive(screen.region) is catalog_plan(context, plan)
+
+
+@then('the "{plan}" plan should have the base features')
+def step_plan_base_features(context, plan):
+    """Verify every plan of the region offers this plan's features"""
+    base = catalog_plan(context, plan)['feature_set']
+    assert all(base <= other['feature_set'] for other in context.mobile_ctx.subscription_plans_screen.plans)
+
+
+@then('the "{plan}" plan should include all Basic features plus additional features')
+@then('the "{plan}" plan should include all Regular features plus premium features')
+def step_plan_feature_superset(context, plan):
+    """Verify the plan strictly extends the plan one tier below it"""
+    screen = context.mobile_ctx.subscription_plans_screen
+    plan = catalog_plan(context, plan)
+    below = screen.catalog.plans(screen.region)[screen.catalog.price_rank(plan) - 1]
+    assert below['title'] in (PLAN_TITLES['Basic'], PLAN_TITLES['Regular'])
+    assert screen.catalog.includes(plan, below)
+
+
+class CountedTitle(str):
+    """Plan title that counts the key comparisons a lookup makes with it"""
+
+    comparisons = 0
+
+    def __eq__(self, other):
+        CountedTitle.comparisons += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+class CountedIdentifier(int):
+    """Plan identifier that counts the key comparisons a lookup makes with it"""
+
+    comparisons = 0
+
+    def __eq__(self, other):
+        CountedIdentifier.comparisons += 1
+        return int.__eq__(self, other)
+
+    __hash__ = int.__hash__
+
+
+@given('a plan catalog with {regions:d} regions of {count:d} plans')
+def step_large_plan_catalog(context, regions, count):
+    """Build a large region-specific catalog"""
+    fixtures.get(context, 'mobile_ctx')
+    context.mobile_ctx.plan_records = generate_plans(regions, count)
+    context.mobile_ctx.plan_catalog = PlanCatalog(context.mobile_ctx.plan_records)
+
+
+@when('I look up every plan by region, title and identifier')
+def step_look_up_every_plan(context):
+    """Look up the whole catalog, counting the keys each lookup compares"""
+    catalog = context.mobile_ctx.plan_catalog
+    found, comparisons = [], []
+    for record in context.mobile_ctx.plan_records:
+        CountedTitle.comparisons = CountedIdentifier.comparisons = 0
+        found.append((
+            catalog.get(CountedTitle(record['title']), record['region']),
+            catalog.by_identifier(CountedIdentifier(record['identifier'])),
+        ))
+        comparisons.append((CountedTitle.comparisons, CountedIdentifier.comparisons))
+    context.mobile_ctx.plan_lookups = found
+    context.mobile_ctx.plan_lookup_comparisons = comparisons
+
+
+@then('every lookup should return the same plan')
+def step_lookups_agree(context):
+    """Verify both indexes resolve to the same immutable plan"""
+    for by_title, by_identifier in context.mobile_ctx.plan_lookups:
+        assert by_title is not None and by_title is by_identifier
+
+
+@then('each plan lookup should compare at most {limit:d} keys')
+def step_plan_lookup_comparisons(context, limit):
+    """Verify lookups probe an index instead of scanning the catalog"""
+    worst = max(max(pair) for pair in context.mobile_ctx.plan_lookup_comparisons)
+    assert worst <= limit, f"A lookup compared {worst} keys"
+
+
+@then('every region should rank its plans by parsed price')
+def step_regions_ranked(context):
+    """Verify the price order uses decimal amounts, not display strings"""
+    catalog = context.mobile_ctx.plan_catalog
+    for region in catalog.regions:
+        amounts = [plan['amount'] for plan in catalog.plans(region)]
+        assert amounts == sorted(amounts)
+        assert catalog.cheapest(region)['amount'] == amounts[0]
+        assert catalog.most_expensive(region)['amount'] == amounts[-1]
 
 
 # Add placeholders for remaining subscription plans steps
@@ -861,60 +1801,180 @@ def step_selected_plan(context, plan):
 @then('all plan cards should have proper padding')
 @then('all plan cards should be visually separated')
 @then('feature lists should be properly formatted')
-@when('I press the back button')
-@then('I should return to the previous screen')
-@then('no plan should be selected')
-@then('the "{plan}" plan should be the cheapest option')
-@then('the "{plan}" plan should be mid-tier pricing')
-@then('the "{plan}" plan should be the most expensive option')
-@then('the "{plan}" plan should have the base features')
-@then('the "{plan}" plan should include all Basic features plus additional features')
-@then('the "{plan}" plan should include all Regular features plus premium features')
 @given('I am viewing the plans on different screen sizes')
 @then('the layout should adapt appropriately')
 @then('text should remain readable')
 @then('buttons should remain accessible')
-@when('I tap on a plan card')
 @then('there should be visual feedback')
-@then('the navigation should occur smoothly')
-@then('loading state should be minimal')
 def step_generic_subscription_behavior(context):
     """Generic placeholder for subscription plan steps"""
     assert True
 
 
-# ============================================================================
-# PAYMENT STEPS
-# ============================================================================
+@when('I press the back button')
+def step_press_back(context):
+    """Pop the current screen off the back-stack"""
+    ctx = context.mobile_ctx
+    ctx.expected_back_route = ctx.navigator.previous.route
+    popped = ctx.navigator.pop()
+    if popped.route == "payment":
+        ctx.payment_screen = None
+    elif popped.route == "subscription_plans":
+        ctx.subscription_plans_screen = None
 
-@given('I have selected a subscription plan')
-def step_selected_plan_payment(context):
-    """Set up selected plan for payment"""
-    if not context.mobile_ctx.subscription_plans_screen:
-        context.mobile_ctx.subscription_plans_screen = MockSubscriptionPlansScreen()
-    context.mobile_ctx.subscription_plans_screen.select_plan("BÁSICO")
 
+@then('I should return to the previous screen')
+def step_returned_previous_screen(context):
+    """Verify back went to the screen underneath"""
+    assert context.mobile_ctx.current_screen == context.mobile_ctx.expected_back_route
 
-@given('I am on the payment checkout screen')
-def step_on_payment_screen(context):
-    """Set up payment screen"""
-    context.mobile_ctx.payment_screen = MockPaymentScreen(1)
-    context.mobile_ctx.current_screen = "payment"
 
+@then('I should return to the subscription plans screen')
+def step_returned_plans_screen(context):
+    """Verify back from checkout lands on the plans"""
+    assert context.mobile_ctx.current_screen == "subscription_plans"
 
-@then('I should see the heading "{heading}"')
-@then('I should see the subheading "{subheading}"')
-def step_see_heading(context, heading=None, subheading=None):
-    """Verify heading/subheading is visible"""
-    assert context.mobile_ctx.current_screen == "payment"
 
+@then('no plan should be selected')
+def step_no_plan_selected(context):
+    """Verify leaving the plans discarded any selection"""
+    entry = context.mobile_ctx.navigator.current
+    assert context.mobile_ctx.subscription_plans_screen is None
+    assert entry.screen is None or getattr(entry.screen, 'selected_plan', None) is None
 
-@then('I should see a payment form card')
-@then('I should see a card number input field')
-@then('I should see an expiration date input field')
-@then('I should see a CVV input field')
-@then('I should see a submit payment button')
-def step_see_payment_elements(context):
+
+@when('I tap on a plan card')
+def step_tap_plan_card(context):
+    """Tap the first plan card"""
+    plan = context.mobile_ctx.subscription_plans_screen.plans[0]
+    step_click_plan_card(context, plan['title'])
+
+
+@then('the navigation should occur smoothly')
+def step_navigation_smooth(context):
+    """Verify the tap opened the checkout once, on top of the plans"""
+    navigator = context.mobile_ctx.navigator
+    pushes = [t for t in navigator.transitions if t.kind == 'push' and t.target == "payment"]
+    assert len(pushes) == 1, f"{len(pushes)} pushes of the payment screen"
+    assert navigator.routes_on_stack()[-2:] == ["subscription_plans", "payment"]
+
+
+@then('every back press should have returned to the plans screen')
+def step_back_presses_returned(context):
+    """Verify no back press skipped or duplicated a screen"""
+    pops = [t for t in context.mobile_ctx.navigator.transitions if t.kind == 'pop']
+    assert pops
+    assert all(t.source == "payment" and t.target == "subscription_plans" for t in pops)
+
+
+@then('loading state should be minimal')
+def step_loading_minimal(context):
+    """Verify the new screen was ready as soon as it was shown"""
+    ctx = context.mobile_ctx
+    last = ctx.navigator.transitions[-1]
+    assert last.target == ctx.current_screen
+    assert ctx.navigator.current.screen is not None
+    assert ctx.navigator.current.screen.is_processing is False
+
+
+@given('navigation memory tracking is enabled')
+def step_track_navigation_memory(context):
+    """Measure the memory each new screen retains"""
+    context.mobile_ctx.navigator.track_memory = True
+
+
+@when('I open and close the payment screen {count:d} times from the plans screen')
+def step_open_close_payment(context, count):
+    """Alternate plan taps and back presses"""
+    plans = context.mobile_ctx.subscription_plans_screen.plans
+    for index in range(count):
+        step_click_plan_card(context, plans[index % len(plans)]['title'])
+        step_press_back(context)
+
+
+@when('I push {count:d} screens without going back')
+def step_push_screens(context, count):
+    """Keep drilling into plans and checkout screens"""
+    for index in range(count):
+        if index % 2:
+            context.mobile_ctx.navigator.push("payment", lambda: open_payment_screen(context, 1))
+        else:
+            context.mobile_ctx.navigator.push("subscription_plans", MockSubscriptionPlansScreen)
+
+
+@then('the back stack should hold at most {count:d} screens')
+def step_back_stack_bounded(context, count):
+    """Verify the oldest screens were dropped"""
+    navigator = context.mobile_ctx.navigator
+    assert navigator.depth <= count
+    assert navigator.dropped > 0
+
+
+@then('the screens still on the back stack should retain less than {limit:d} kilobytes')
+def step_back_stack_memory(context, limit):
+    """Verify the memory kept alive by the back-stack"""
+    retained = context.mobile_ctx.navigator.retained_bytes()
+    assert retained < limit * 1024
+
+
+# ============================================================================
+# PAYMENT STEPS
+# ============================================================================
+
+VALID_CARD = {
+    'card_number_controller': "4532015112830366",
+    'expiration_controller': "1225",
+    'cvv_controller': "123",
+}
+
+def open_payment_screen(context, identifier, owner_id=None):
+    """Open the checkout for a plan on the scenario's shared payment pipeline"""
+    ctx = context.mobile_ctx
+    if ctx.payment_pipeline is None:
+        ctx.payment_pipeline = PaymentPipeline()
+    if owner_id is None and ctx.auth_screen and ctx.auth_screen.auth_token:
+        owner_id = ctx.token_helper.claims(ctx.auth_screen.auth_token)['sub']
+    ctx.payment_screen = MockPaymentScreen(identifier, ctx.clock, ctx.payment_pipeline, owner_id)
+    return ctx.payment_screen
+
+
+def fill_valid_card(screen):
+    """Type a valid card into the checkout form"""
+    for field, value in VALID_CARD.items():
+        setattr(screen, field, value)
+
+
+def plan_identifier(plan_name):
+    """Identifier of a subscription plan by its English name"""
+    return default_plan_catalog().get(PLAN_TITLES[plan_name])['identifier']
+
+
+@given('I have selected a subscription plan')
+def step_selected_plan_payment(context):
+    """Set up selected plan for payment"""
+    fixtures.get(context, 'mobile_ctx.subscription_plans_screen')
+    context.mobile_ctx.subscription_plans_screen.select_plan("BÁSICO")
+
+
+@given('I am on the payment checkout screen')
+def step_on_payment_screen(context):
+    """Set up payment screen"""
+    context.mobile_ctx.navigator.push("payment", lambda: open_payment_screen(context, 1))
+
+
+@then('I should see the heading "{heading}"')
+@then('I should see the subheading "{subheading}"')
+def step_see_heading(context, heading=None, subheading=None):
+    """Verify heading/subheading is visible"""
+    assert context.mobile_ctx.current_screen == "payment"
+
+
+@then('I should see a payment form card')
+@then('I should see a card number input field')
+@then('I should see an expiration date input field')
+@then('I should see a CVV input field')
+@then('I should see a submit payment button')
+def step_see_payment_elements(context):
     """Verify payment form elements"""
     assert context.mobile_ctx.payment_screen is not None
 
@@ -1016,6 +2076,13 @@ def step_enter_cvv(context, cvv):
     context.mobile_ctx.payment_screen.cvv_controller = cvv
 
 
+@then('the card should be accepted')
+def step_card_accepted(context):
+    """Verify the payment went through"""
+    screen = context.mobile_ctx.payment_screen
+    assert screen.payment_success is True, screen.error_message
+
+
 @then('the error should indicate CVV must be 3 or 4 digits')
 def step_error_cvv_digits(context):
     """Verify CVV digit error"""
@@ -1039,7 +2106,7 @@ def step_cvv_max_length(context):
 @given('I selected the Premium plan with card identifier {identifier:d}')
 def step_selected_plan_identifier(context, identifier):
     """Set up selected plan with identifier"""
-    context.mobile_ctx.payment_screen = MockPaymentScreen(identifier)
+    open_payment_screen(context, identifier)
 
 
 @when('I enter valid card number "{number}"')
@@ -1085,20 +2152,340 @@ def step_confirmation_message(context):
     assert True
 
 
-# Add remaining payment steps as placeholders
+@given('{count:d} random card inputs')
+def step_random_card_inputs(context, count):
+    """Generate card inputs mixing Luhn-valid numbers, typos and junk"""
+    context.mobile_ctx.card_inputs = random_card_inputs(count, seed=2024)
+
+
+@when('I validate the card inputs in batch')
+def step_validate_cards_batch(context):
+    """Validate every card input with the vectorized engine"""
+    engine = CardValidationEngine()
+    began = time.perf_counter()
+    context.mobile_ctx.card_results = engine.validate_batch(*context.mobile_ctx.card_inputs)
+    context.mobile_ctx.card_batch_seconds = time.perf_counter() - began
+    context.mobile_ctx.card_engine = engine
+
+
+@then('the batch results should match single card validation for {count:d} samples')
+def step_batch_matches_single(context, count):
+    """Cross-check the vectorized path against the per-card path"""
+    numbers, expirations, cvvs = context.mobile_ctx.card_inputs
+    results = context.mobile_ctx.card_results
+    engine = context.mobile_ctx.card_engine
+    for i in random.Random(7).sample(range(len(numbers)), count):
+        card = engine.validate(numbers[i], expirations[i], cvvs[i])
+        for check in ('valid', 'luhn_ok', 'length_ok', 'expiration_ok', 'cvv_ok'):
+            assert bool(results[check][i]) == card[check], (check, numbers[i], expirations[i], cvvs[i])
+        assert results['brand'][i] == card['brand']
+
+
+@then('the batch validation should take less than {limit:d} seconds')
+def step_batch_validation_time(context, limit):
+    """Verify fuzzing throughput"""
+    assert context.mobile_ctx.card_batch_seconds < limit
+
+
+def apply_keystroke(formatter, keystroke):
+    """Apply one (action, argument) keystroke to an incremental formatter"""
+    action, argument = keystroke
+    if action == 'type' or action == 'paste':
+        formatter.insert(argument)
+    elif action == 'backspace':
+        formatter.backspace()
+    elif action == 'delete':
+        formatter.delete()
+    elif action == 'move':
+        formatter.move_caret(argument)
+    else:
+        formatter.set_text('')
+    return formatter.text
+
+
+def rebuild_after_keystroke(digits, caret, keystroke):
+    """Apply one keystroke to a raw digit string and caret, as a full rebuild would"""
+    action, argument = keystroke
+    if action == 'type' or action == 'paste':
+        typed = ''.join(filter(str.isdigit, argument))
+        return digits[:caret] + typed + digits[caret:], caret + len(typed)
+    if action == 'backspace':
+        return (digits[:caret - 1] + digits[caret:], caret - 1) if caret else (digits, caret)
+    if action == 'delete':
+        return digits[:caret] + digits[caret + 1:], caret
+    if action == 'move':
+        return digits, max(0, min(argument, len(digits)))
+    return '', 0
+
+
+@given('a stream of {count:d} random {field} keystrokes')
+def step_random_keystrokes(context, count, field):
+    """Generate typing, deleting, caret moves and pastes"""
+    rng = random.Random(31)
+    keystrokes = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.7:
+            keystrokes.append(('type', rng.choice('0123456789')))
+        elif roll < 0.8:
+            keystrokes.append(('backspace', None))
+        elif roll < 0.84:
+            keystrokes.append(('delete', None))
+        elif roll < 0.92:
+            keystrokes.append(('move', rng.randrange(0, 20)))
+        elif roll < 0.98:
+            keystrokes.append(('paste', rng.choice(['4532 0151', '1225', '12/25', '5555-4444'])))
+        else:
+            keystrokes.append(('clear', None))
+    context.mobile_ctx.keystroke_field = field
+    context.mobile_ctx.keystrokes = keystrokes
+
+
+@when('I replay the keystrokes through the incremental formatter and the full rebuild')
+def step_replay_keystrokes(context):
+    """Format after every keystroke both incrementally and by rebuilding"""
+    screen = context.mobile_ctx.payment_screen
+    if context.mobile_ctx.keystroke_field == 'card number':
+        formatter, rebuild = screen.card_number_formatter, screen.format_card_number
+    else:
+        formatter, rebuild = screen.expiration_formatter, screen.format_expiration
+    
+    incremental, rebuilt, gap_moves = [], [], []
+    digits, caret = '', 0
+    for keystroke in context.mobile_ctx.keystrokes:
+        moves_before = formatter.gap_moves
+        incremental.append(apply_keystroke(formatter, keystroke))
+        gap_moves.append(formatter.gap_moves - moves_before)
+        digits, caret = rebuild_after_keystroke(digits, caret, keystroke)
+        rebuilt.append(rebuild(digits))
+    context.mobile_ctx.formatted_outputs = (incremental, rebuilt)
+    context.mobile_ctx.keystroke_gap_moves = gap_moves
+
+
+@then('the formatted text should be identical after every keystroke')
+def step_formatted_identical(context):
+    """Verify the incremental formatter matches the full rebuild"""
+    incremental, rebuilt = context.mobile_ctx.formatted_outputs
+    for i, (expected, actual) in enumerate(zip(rebuilt, incremental)):
+        assert actual == expected, f"Keystroke {i}: {actual!r} != {expected!r}"
+
+
+@then('every edit should move at most one digit per digit typed or deleted')
+def step_edits_move_constant_digits(context):
+    """Verify edits only touch the digits next to the caret, wherever it is"""
+    keystrokes = context.mobile_ctx.keystrokes
+    for i, ((action, argument), moves) in enumerate(zip(keystrokes, context.mobile_ctx.keystroke_gap_moves)):
+        if action == 'move':
+            # Moving the caret shifts the digits it passes over, by design
+            continue
+        if action in ('type', 'paste'):
+            limit = sum(char.isdigit() for char in argument)
+        else:
+            limit = 1 if action in ('backspace', 'delete') else 0
+        assert moves <= limit, f"Keystroke {i} {action!r} moved {moves} digits"
+
+
 @when('I enter valid payment information')
-@then('the payment should be processed for Regular plan')
-@then('the payment should be processed for Premium plan')
-@then('the contract should be created with Regular plan details')
-@then('the contract should be created with Premium plan details')
+def step_enter_valid_payment_information(context):
+    """Fill the checkout form with a valid card"""
+    fill_valid_card(context.mobile_ctx.payment_screen)
+
+
+@then('the payment should be processed for {plan_name} plan')
+def step_payment_processed_for_plan(context, plan_name):
+    """Verify the queued payment was charged for the plan"""
+    screen = context.mobile_ctx.payment_screen
+    assert screen.payment_success is True, screen.error_message
+    assert screen.ticket.payload['plan_identifier'] == plan_identifier(plan_name)
+    assert screen.ticket.payment['contract_id'] == screen.ticket.contract['id']
+
+
+@then('the contract should be created with {plan_name} plan details')
+def step_contract_for_plan(context, plan_name):
+    """Verify the checkout contract references the plan"""
+    contract = context.mobile_ctx.payment_screen.ticket.contract
+    assert contract['subscription_id'] == plan_identifier(plan_name)
+    assert contract['status'] == 'ACTIVE'
+
+
 @when('the payment service returns an error')
+def step_payment_service_error(context):
+    """Make the payment service reject the next charges"""
+    screen = context.mobile_ctx.payment_screen
+    screen.pipeline.payment_service.fail_with("Payment declined: insufficient funds")
+
+
+@when('the payment fails')
+def step_payment_fails(context):
+    """Submit the form while the payment service rejects charges"""
+    step_payment_service_error(context)
+    assert context.mobile_ctx.payment_screen.process_payment() is False
+
+
 @then('the error message should explain the failure reason')
+def step_error_explains_reason(context):
+    """Verify the service's reason reaches the screen"""
+    screen = context.mobile_ctx.payment_screen
+    assert screen.error_message == screen.pipeline.payment_service.failure
+
+
 @then('the form should remain editable')
+@then('the entered data should remain in the form')
+def step_form_remains_editable(context):
+    """Verify a failed payment leaves the form unlocked and filled in"""
+    screen = context.mobile_ctx.payment_screen
+    assert screen.is_processing is False
+    assert screen.payment_success is False
+    assert screen.card_number_controller and screen.expiration_controller and screen.cvv_controller
+
+
 @then('I should be able to retry the payment')
+@then('I should be able to edit and resubmit')
+def step_retry_payment(context):
+    """Retry after the service recovers; the failed attempt leaves no contract behind"""
+    screen = context.mobile_ctx.payment_screen
+    screen.pipeline.payment_service.recover()
+    assert screen.process_payment() is True, screen.error_message
+    assert len(screen.pipeline.contract_service.active_contracts(screen.owner_id)) == 1
+    assert screen.pipeline.failed == 1
+
+
 @when('I submit a valid payment')
+def step_submit_valid_payment(context):
+    """Submit a valid card and leave the payment in flight"""
+    screen = context.mobile_ctx.payment_screen
+    fill_valid_card(screen)
+    assert screen.submit_payment() is not None, screen.error_message
+
+
 @then('the submit button should be disabled')
 @then('I should not be able to edit the form fields')
+def step_form_locked(context):
+    """Verify the form is locked while the payment is in flight"""
+    assert context.mobile_ctx.payment_screen.is_processing is True
+
+
 @then('multiple submissions should be prevented')
+def step_multiple_submissions_prevented(context):
+    """Tap submit again while in flight; every tap collapses into one payment"""
+    ctx = context.mobile_ctx
+    if ctx.current_screen != "payment":
+        auth = ctx.auth_screen
+        for _ in range(3):
+            auth.login()
+        assert auth.login_requests == 1, f"{auth.login_requests} login requests sent"
+        assert auth.is_login_loading is False
+        return
+    screen = ctx.payment_screen
+    ticket = screen.ticket
+    for _ in range(3):
+        assert screen.submit_payment() is ticket
+    assert screen.await_payment() is True, screen.error_message
+    assert ticket.submissions == 4
+    assert len(screen.pipeline.payment_service.payments) == 1
+
+
+@given('I complete a successful payment')
+def step_complete_successful_payment(context):
+    """Pay for the selected plan end to end"""
+    screen = context.mobile_ctx.payment_screen
+    fill_valid_card(screen)
+    assert screen.process_payment() is True, screen.error_message
+
+
+@then('a contract should be created via ContractOwnerService')
+def step_contract_created(context):
+    """Verify the contract stage ran"""
+    screen = context.mobile_ctx.payment_screen
+    assert screen.ticket.contract in screen.pipeline.contract_service.active_contracts()
+
+
+@then('the contract should include the selected plan identifier')
+def step_contract_plan_identifier(context):
+    """Verify the contract carries the plan identifier"""
+    screen = context.mobile_ctx.payment_screen
+    assert screen.ticket.contract['subscription_id'] == screen.card_identifier
+
+
+@then('the contract should be associated with the logged-in user')
+def step_contract_owner(context):
+    """Verify the contract belongs to the logged-in owner"""
+    contract = context.mobile_ctx.payment_screen.ticket.contract
+    token = context.mobile_ctx.auth_screen.auth_token
+    assert contract['owner_id'] == context.mobile_ctx.token_helper.claims(token)['sub']
+
+
+@then('the payment should be recorded via PaymentService')
+def step_payment_recorded(context):
+    """Verify the payment stage recorded the charge against the contract"""
+    screen = context.mobile_ctx.payment_screen
+    assert screen.pipeline.payment_service.payments == [screen.ticket.payment]
+    assert screen.ticket.payment['contract_id'] == screen.ticket.contract['id']
+
+
+@then('no payment should be processed')
+def step_no_payment_processed(context):
+    """Verify nothing reached the payment service"""
+    assert not context.mobile_ctx.payment_pipeline.payment_service.payments
+
+
+@then('the form data should be cleared')
+def step_payment_form_cleared(context):
+    """Verify leaving checkout discarded the form"""
+    assert context.mobile_ctx.payment_screen is None
+    assert "payment" not in context.mobile_ctx.navigator.routes_on_stack()
+
+
+@given('the checkout pipeline runs {workers:d} workers')
+def step_checkout_workers(context, workers):
+    """Use a dedicated pipeline with a fixed worker pool"""
+    context.mobile_ctx.payment_pipeline = PaymentPipeline(workers=workers)
+
+
+@given('the payment service takes {milliseconds:d} milliseconds per payment')
+def step_payment_latency(context, milliseconds):
+    """Simulate the payment service round trip"""
+    context.mobile_ctx.payment_pipeline.payment_service.latency = milliseconds / 1000
+
+
+@when('{forms:d} owners each tap submit {taps:d} times')
+def step_burst_of_taps(context, forms, taps):
+    """Interleave repeated taps from many checkout forms"""
+    screens = []
+    for index in range(forms):
+        screen = open_payment_screen(context, index % 3 + 1, owner_id=f"owner_{index}")
+        fill_valid_card(screen)
+        screens.append(screen)
+    for _ in range(taps):
+        for screen in screens:
+            screen.submit_payment()
+    context.mobile_ctx.payment_pipeline.join()
+    context.mobile_ctx.checkout_screens = screens
+
+
+@then('{count:d} payments should be recorded via PaymentService')
+def step_payments_recorded(context, count):
+    """Verify one charge per distinct form"""
+    pipeline = context.mobile_ctx.payment_pipeline
+    assert len(pipeline.payment_service.payments) == count
+    assert len(pipeline.contract_service.active_contracts()) == count
+
+
+@then('{count:d} duplicate submissions should be suppressed')
+def step_duplicates_suppressed(context, count):
+    """Verify repeated taps were collapsed by idempotency key"""
+    stats = context.mobile_ctx.payment_pipeline.stats()
+    assert stats['duplicates_suppressed'] == count
+
+
+@then('the checkout pipeline should process at least {rate:d} payments per second')
+def step_pipeline_throughput(context, rate):
+    """Verify the worker pool overlaps payment round trips"""
+    stats = context.mobile_ctx.payment_pipeline.stats()
+    assert stats['throughput'] >= rate
+
+
+# Add remaining payment steps as placeholders
 @when('I tap on the card number field')
 @then('the card number field should be focused')
 @then('the keyboard should appear')
@@ -1121,16 +2508,6 @@ def step_confirmation_message(context):
 @then('the numeric keyboard should appear for expiration date')
 @then('the numeric keyboard should appear for CVV')
 @then('the keyboard should not obscure the submit button')
-@given('I complete a successful payment')
-@then('a contract should be created via ContractOwnerService')
-@then('the contract should include the selected plan identifier')
-@then('the contract should be associated with the logged-in user')
-@then('the payment should be recorded via PaymentService')
-@then('no payment should be processed')
-@then('the form data should be cleared')
-@when('the payment fails')
-@then('the entered data should remain in the form')
-@then('I should be able to edit and resubmit')
 @then('the payment form should use secure input fields')
 @then('sensitive data should not be logged')
 @then('the CVV should never be displayed in plain text')
@@ -1152,17 +2529,17 @@ def step_generic_payment_behavior(context):
 @given('I have a valid hotel ID from my authentication token')
 def step_valid_hotel_id(context):
     """Set up valid hotel ID"""
-    if not context.mobile_ctx.providers_view:
-        context.mobile_ctx.providers_view = MockProvidersView()
-    context.mobile_ctx.providers_view.hotel_id = "hotel_123"
+    fixtures.get(context, 'mobile_ctx.providers_view')
+    context.mobile_ctx.providers_view.auth_token = issue_token(
+        context, subject="owner-1", role_id=1, hotel_id="hotel_123"
+    )
 
 
 @given('I navigate to the providers view screen')
 def step_navigate_providers(context):
     """Navigate to providers view"""
-    if not context.mobile_ctx.providers_view:
-        context.mobile_ctx.providers_view = MockProvidersView()
-    context.mobile_ctx.current_screen = "providers"
+    fixtures.get(context, 'mobile_ctx.providers_view')
+    context.mobile_ctx.navigator.push("providers", lambda: context.mobile_ctx.providers_view)
 
 
 @when('the providers view loads')
@@ -1193,8 +2570,7 @@ def step_only_active_providers(context):
 @given('I have no providers in my hotel')
 def step_no_providers(context):
     """Set up empty providers list"""
-    if not context.mobile_ctx.providers_view:
-        context.mobile_ctx.providers_view = MockProvidersView()
+    fixtures.get(context, 'mobile_ctx.providers_view')
     context.mobile_ctx.providers_view.providers = []
 
 
@@ -1208,8 +2584,7 @@ def step_empty_state(context):
 @given('I have multiple active providers')
 def step_multiple_providers(context):
     """Set up multiple providers"""
-    if not context.mobile_ctx.providers_view:
-        context.mobile_ctx.providers_view = MockProvidersView()
+    fixtures.get(context, 'mobile_ctx.providers_view')
     
     context.mobile_ctx.providers_view.providers = [
         MockProvider(1, "Provider 1", "provider1@test.com", "123456789"),
@@ -1239,6 +2614,362 @@ def step_have_providers(context):
         step_multiple_providers(context)
 
 
+PROVIDER_NAME_WORDS = [
+    'Andes', 'Pacifico', 'Lima', 'Norte', 'Sur', 'Central', 'Global', 'Express',
+    'Supplies', 'Foods', 'Textiles', 'Cleaning', 'Linens', 'Beverages', 'Tech', 'Services'
+]
+
+
+def generate_providers(count, seed=42):
+    """Generate a deterministic list of providers with varied searchable fields"""
+    rng = random.Random(seed)
+    providers = []
+    for i in range(1, count + 1):
+        name = f"{rng.choice(PROVIDER_NAME_WORDS)} {rng.choice(PROVIDER_NAME_WORDS)} {i}"
+        providers.append(MockProvider(
+            id=i,
+            name=name,
+            email=f"{name.lower().replace(' ', '.')}@proveedores.pe",
+            phone=f"9{rng.randrange(10 ** 8):08d}",
+            ruc=f"20{rng.randrange(10 ** 9):09d}",
+            state='active' if rng.random() < 0.9 else 'inactive'
+        ))
+    return providers
+
+
+@given('I have {count:d} generated providers in my hotel')
+def step_generated_providers(context, count):
+    """Set up a large deterministic providers list"""
+    fixtures.get(context, 'mobile_ctx.providers_view')
+    context.mobile_ctx.providers_view.providers = generate_providers(count)
+
+
+@when('I search providers for "{query}"')
+def step_search_providers(context, query):
+    """Search providers by name, email, phone or RUC"""
+    context.mobile_ctx.search_results = context.mobile_ctx.providers_view.search_providers(query)
+
+
+@then('every search result should contain "{query}"')
+def step_search_results_contain(context, query):
+    """Verify each search result matches the query in a searchable field"""
+    results = context.mobile_ctx.search_results
+    assert len(results) > 0
+    needle = query.lower()
+    for provider in results:
+        assert any(needle in str(getattr(provider, field)).lower()
+                   for field in ProviderSearchIndex.SEARCH_FIELDS)
+
+
+@then('the search results should match a full scan for "{query}"')
+def step_search_matches_scan(context, query):
+    """Cross-check the index against a linear scan"""
+    needle = query.lower()
+    expected = [
+        p.id for p in context.mobile_ctx.providers_view.get_active_providers()
+        if any(needle in str(getattr(p, field)).lower() for field in ProviderSearchIndex.SEARCH_FIELDS)
+    ]
+    assert sorted(expected) == [p.id for p in context.mobile_ctx.search_results]
+
+
+@when('I type {count:d} incremental provider searches')
+def step_type_incremental_searches(context, count):
+    """Simulate as-you-type searches built from existing provider fields"""
+    view = context.mobile_ctx.providers_view
+    rng = random.Random(7)
+    field_values = [
+        str(getattr(p, rng.choice(ProviderSearchIndex.SEARCH_FIELDS)))
+        for p in rng.sample(view.providers, min(count, len(view.providers)))
+    ]
+    queries, latencies = [], []
+    while len(latencies) < count:
+        value = field_values[len(latencies) % len(field_values)]
+        start = rng.randrange(max(1, len(value) - 8))
+        # Each keystroke extends the previous query by one character
+        for end in range(start + 3, min(len(value), start + 9) + 1):
+            began = time.perf_counter()
+            view.search_providers(value[start:end])
+            latencies.append(time.perf_counter() - began)
+            queries.append(value[start:end])
+    context.mobile_ctx.search_queries = queries[:count]
+    context.mobile_ctx.search_latencies = latencies[:count]
+
+
+@then('every incremental provider search should match a full scan')
+def step_incremental_searches_match_scan(context):
+    """Cross-check every as-you-type query against a linear scan"""
+    view = context.mobile_ctx.providers_view
+    active = view.get_active_providers()
+    for query in context.mobile_ctx.search_queries:
+        # Search trims the query, as the text field does
+        needle = query.strip().lower()
+        expected = [
+            p.id for p in active
+            if any(needle in str(getattr(p, field)).lower() for field in ProviderSearchIndex.SEARCH_FIELDS)
+        ]
+        assert [p.id for p in view.search_providers(query)] == sorted(expected), query
+
+
+@then('the median provider search latency should be under {limit:d} millisecond')
+@then('the median provider search latency should be under {limit:d} milliseconds')
+def step_search_latency_under(context, limit):
+    """Verify search latency stays within budget"""
+    median_ms = statistics.median(context.mobile_ctx.search_latencies) * 1000
+    assert median_ms < limit, f"Median search latency {median_ms:.3f} ms exceeds {limit} ms"
+
+
+@then('the search index should reflect providers added, updated and deleted')
+def step_search_index_tracks_mutations(context):
+    """Verify the index follows add, update and delete"""
+    view = context.mobile_ctx.providers_view
+    created = view.add_provider({
+        'name': 'Zeta Lavanderia', 'email': 'ventas@zeta.pe', 'phone': '911222333', 'ruc': '20999888777'
+    })
+    assert [p.id for p in view.search_providers('lavander')] == [created.id]
+    view.update_provider(created.id, {'name': 'Omega Lavanderia'})
+    assert [p.id for p in view.search_providers('omega lav', prefix=True)] == [created.id]
+    view.delete_provider(created.id)
+    assert view.search_providers('20999888777') == []
+
+
+@given('I have more than 10 providers')
+def step_more_than_ten_providers(context):
+    """Set up a providers list spanning several pages"""
+    step_provider_service_holds(context, 250)
+
+
+@when('the providers view loads in pages of {page_size:d}')
+def step_providers_view_loads_paged(context, page_size):
+    """Load the providers view in paged mode"""
+    began = time.perf_counter()
+    context.mobile_ctx.providers_view.fetch_provider_pages(page_size=page_size)
+    context.mobile_ctx.first_paint_seconds = time.perf_counter() - began
+
+
+@then('only {count:d} providers should be rendered')
+def step_only_count_rendered(context, count):
+    """Verify only the visible window is rendered"""
+    assert len(context.mobile_ctx.providers_view.visible_providers) == count
+
+
+@then('at most {count:d} provider pages should have been fetched')
+def step_pages_fetched_at_most(context, count):
+    """Verify the first paint only fetched the first page and its prefetch"""
+    assert context.mobile_ctx.providers_view.page_cursor.fetch_count <= count
+
+
+@then('the full providers list should not have been downloaded')
+def step_full_list_not_downloaded(context):
+    """Verify paging never pulled the whole list into the view"""
+    view = context.mobile_ctx.providers_view
+    cursor = view.page_cursor
+    assert not view.providers
+    assert sum(map(len, cursor.pages.values())) <= cursor.max_cached_pages * cursor.page_size
+
+
+@when('I scroll through the providers list')
+def step_scroll_providers(context):
+    """Scroll through the whole list one screen at a time"""
+    view = context.mobile_ctx.providers_view
+    cursor = view.page_cursor or view.fetch_provider_pages()
+    seen = []
+    max_cached_pages = 0
+    first_row = 0
+    while True:
+        window = view.scroll_providers(first_row)
+        if not window:
+            break
+        seen.extend(window)
+        max_cached_pages = max(max_cached_pages, len(cursor.pages))
+        first_row += len(window)
+    context.mobile_ctx.scrolled_providers = seen
+    context.mobile_ctx.max_cached_pages = max_cached_pages
+
+
+@then('all providers should be accessible through scrolling')
+def step_all_providers_scrollable(context):
+    """Verify every active provider on the service was reached by scrolling"""
+    view = context.mobile_ctx.providers_view
+    expected = [
+        p['id'] for p in view.provider_service.get_providers(view.hotel_id) if p['state'].lower() == 'active'
+    ]
+    assert [p.id for p in context.mobile_ctx.scrolled_providers] == expected
+
+
+@then('the list should maintain performance')
+def step_list_maintains_performance(context):
+    """Verify pages were fetched once each and memory stayed bounded"""
+    cursor = context.mobile_ctx.providers_view.page_cursor
+    assert context.mobile_ctx.max_cached_pages <= cursor.max_cached_pages
+    assert cursor.fetch_count == cursor.last_page + 1
+
+
+@given('the provider service holds {count:d} providers for my hotel')
+def step_provider_service_holds(context, count):
+    """Fill the local ProviderService stand-in without syncing the view"""
+    view = context.mobile_ctx.providers_view
+    service = MockProviderService()
+    for provider in generate_providers(count):
+        service.create_provider(view.hotel_id, provider.to_dict())
+    view.provider_service = service
+
+
+@given('the provider service has {count:d} providers for my hotel')
+def step_provider_service_has(context, count):
+    """Load the providers list from the local ProviderService stand-in"""
+    step_provider_service_holds(context, count)
+    view = context.mobile_ctx.providers_view
+    view.refresh_providers()
+    context.mobile_ctx.synced_version = view.sync_version
+
+
+@given('I am viewing the providers list')
+def step_viewing_providers_list(context):
+    """Load a synced providers list"""
+    step_provider_service_has(context, 100)
+
+
+@given('another device has changed providers since my last sync')
+def step_providers_changed_remotely(context):
+    """Create, update and delete providers behind the app's back"""
+    view = context.mobile_ctx.providers_view
+    service = view.provider_service
+    context.mobile_ctx.remote_created = [
+        service.create_provider(view.hotel_id, {
+            'name': f'Nuevo Proveedor {i}', 'email': f'nuevo{i}@proveedores.pe', 'phone': '900000000'
+        })['id']
+        for i in range(2)
+    ]
+    first, second = view.providers[0].id, view.providers[1].id
+    service.update_provider(view.hotel_id, first, {'phone': '911111111'})
+    service.delete_provider(view.hotel_id, second)
+    context.mobile_ctx.remote_change_count = 4
+
+
+@given('{count:d} providers have changed since my last sync')
+def step_count_providers_changed(context, count):
+    """Update a handful of providers on the service"""
+    view = context.mobile_ctx.providers_view
+    for provider in view.providers[:count]:
+        view.provider_service.update_provider(view.hotel_id, provider.id, {'state': 'inactive'})
+    context.mobile_ctx.remote_change_count = count
+
+
+@when('I perform a pull-to-refresh gesture')
+def step_pull_to_refresh(context):
+    """Refresh the providers list"""
+    view = context.mobile_ctx.providers_view
+    began = time.perf_counter()
+    context.mobile_ctx.last_delta = view.refresh_providers()
+    context.mobile_ctx.refresh_seconds = time.perf_counter() - began
+
+
+@then('the providers should be fetched again')
+def step_providers_fetched_again(context):
+    """Verify the refresh asked the service for changes since the last sync"""
+    service = context.mobile_ctx.providers_view.provider_service
+    assert service.requests[-1] == (
+        'changes', context.mobile_ctx.providers_view.hotel_id, context.mobile_ctx.synced_version
+    )
+    assert context.mobile_ctx.last_delta['full'] is False
+
+
+@then('the list should be updated with the latest data')
+def step_list_updated_latest(context):
+    """Verify the merged list equals the service state"""
+    view = context.mobile_ctx.providers_view
+    remote = sorted(view.provider_service.get_providers(view.hotel_id), key=lambda p: p['id'])
+    local = sorted((p.to_dict() for p in view.providers), key=lambda p: p['id'])
+    assert local == remote
+    assert view.sync_version == view.provider_service.version
+
+
+@then('any new providers should appear')
+def step_new_providers_appear(context):
+    """Verify providers created elsewhere are in the list"""
+    ids = {p.id for p in context.mobile_ctx.providers_view.providers}
+    assert set(context.mobile_ctx.remote_created) <= ids
+
+
+@then('the refresh should transfer only the changed providers')
+def step_refresh_transfers_changes(context):
+    """Verify the delta size tracks the number of changes, not the list size"""
+    delta = context.mobile_ctx.last_delta
+    transferred = len(delta['created']) + len(delta['updated']) + len(delta['deleted'])
+    assert transferred == context.mobile_ctx.remote_change_count
+
+
+@when('I submit a batch creating {created:d} providers, updating {updated:d} and deleting {deleted:d}')
+def step_submit_provider_batch(context, created, updated, deleted):
+    """Onboard and clean up many providers in one batch"""
+    view = context.mobile_ctx.providers_view
+    existing = [p.id for p in view.providers]
+    operations = [
+        {'op': 'create', 'data': {
+            'name': f'Onboarded Supplier {i}', 'email': f'supplier{i}@proveedores.pe',
+            'phone': f'9{i:08d}', 'ruc': f'20{i:09d}'
+        }}
+        for i in range(created)
+    ]
+    operations += [
+        {'op': 'update', 'id': provider_id, 'data': {'phone': '955555555'}}
+        for provider_id in existing[:updated]
+    ]
+    operations += [{'op': 'delete', 'id': provider_id} for provider_id in existing[len(existing) - deleted:]]
+    context.mobile_ctx.batch_response = view.batch_providers(operations)
+
+
+@when('I submit a batch that deletes a provider that does not exist')
+def step_submit_invalid_batch(context):
+    """Submit a batch with one invalid operation"""
+    view = context.mobile_ctx.providers_view
+    context.mobile_ctx.provider_count_before_batch = len(view.providers)
+    context.mobile_ctx.batch_response = view.batch_providers([
+        {'op': 'create', 'data': {'name': 'Valid Supplier', 'email': 'valid@proveedores.pe', 'phone': '911111111'}},
+        {'op': 'update', 'id': view.providers[0].id, 'data': {'name': 'Renamed Supplier'}},
+        {'op': 'delete', 'id': 999999}
+    ])
+
+
+@then('the provider service should receive {count:d} batch call')
+def step_service_batch_calls(context, count):
+    """Verify the whole batch was one round trip"""
+    service = context.mobile_ctx.providers_view.provider_service
+    assert len([r for r in service.requests if r[0] == 'batch']) == count
+
+
+@then('every batch item should succeed')
+def step_every_batch_item_ok(context):
+    """Verify per-item results"""
+    response = context.mobile_ctx.batch_response
+    assert response['applied'] is True
+    assert all(r['status'] == 'ok' for r in response['results'])
+
+
+@then('no batch item should be applied')
+def step_no_batch_item_applied(context):
+    """Verify an invalid batch left the providers untouched"""
+    view = context.mobile_ctx.providers_view
+    assert context.mobile_ctx.batch_response['applied'] is False
+    assert len(view.providers) == context.mobile_ctx.provider_count_before_batch
+    assert not view.search_providers('Renamed Supplier')
+    assert len(view.provider_service.get_providers(view.hotel_id)) == context.mobile_ctx.provider_count_before_batch
+
+
+@then('the failing batch item should report the error')
+def step_failing_batch_item_error(context):
+    """Verify the failing item carries the error and the others were skipped"""
+    statuses = [r['status'] for r in context.mobile_ctx.batch_response['results']]
+    assert statuses == ['skipped', 'skipped', 'error']
+    assert 'not found' in context.mobile_ctx.providers_view.error_message
+
+
+@then('the refresh should take less than {limit:d} milliseconds')
+def step_refresh_faster_than(context, limit):
+    """Verify refresh cost stays small"""
+    assert context.mobile_ctx.refresh_seconds * 1000 < limit
+
+
 @when('I tap on a provider card')
 def step_tap_provider_card(context):
     """Tap on provider card"""
@@ -1333,15 +3064,9 @@ def step_provider_details(context):
 @when('the providers are loaded')
 @then('the loading indicator should disappear')
 @then('the providers list should be displayed')
-@given('the provider service is unavailable')
-@when('I try to load the providers view')
 @then('an error message should be displayed')
 @then('the error should explain what went wrong')
 @then('I should see an option to retry')
-@given('I don\'t have a valid hotel ID in my token')
-@then('an error snackbar should be displayed')
-@then('the error should say "No se pudo obtener el hotelId del token"')
-@then('the loading should stop')
 @when('I successfully create a new provider')
 @when('I successfully update a provider')
 @when('I successfully delete a provider')
@@ -1354,27 +3079,136 @@ def step_provider_details(context):
 @then('all provider cards should have consistent styling')
 @then('proper spacing should be maintained between cards')
 @then('each card should be easily distinguishable')
-@given('I have more than 10 providers')
-@when('I scroll through the providers list')
-@then('all providers should be accessible through scrolling')
-@then('the list should maintain performance')
-@given('I am viewing the providers list')
-@then('the providers should be fetched again')
-@then('the list should be updated with the latest data')
-@then('any new providers should appear')
 @when('I perform any provider operation')
 @then('the app should use the ProviderService')
 @then('API calls should include the hotel ID')
 @then('proper authentication should be included')
 @then('errors should be handled gracefully')
-@then('the app should use TokenHelper to get the hotel ID')
-@then('the hotel ID should be extracted from the JWT token')
-@then('the hotel ID should be used for all provider operations')
 def step_generic_providers_behavior(context):
     """Generic placeholder for providers steps"""
     assert True
 
 
+@given('the provider service is unavailable')
+def step_provider_service_unavailable(context):
+    """Point the view at a ProviderService that rejects every call"""
+    service = MockProviderService()
+    service.is_available = False
+    context.mobile_ctx.providers_view.provider_service = service
+
+
+@given('I don\'t have a valid hotel ID in my token')
+def step_token_without_hotel(context):
+    """Sign a session token that carries no hotel claim"""
+    context.mobile_ctx.providers_view.auth_token = issue_token(context, subject="owner-1", role_id=1)
+
+
+@when('I try to load the providers view')
+def step_try_load_providers(context):
+    """Load the first page of providers"""
+    context.mobile_ctx.providers_view.fetch_provider_pages()
+
+
+@then('an error snackbar should be displayed')
+def step_error_snackbar(context):
+    """Verify the view reports an error"""
+    assert context.mobile_ctx.providers_view.error_message is not None
+
+
+@then('the error should say "No se pudo obtener el hotelId del token"')
+def step_missing_hotel_error(context):
+    """Verify the missing-hotel message"""
+    assert context.mobile_ctx.providers_view.error_message == "No se pudo obtener el hotelId del token"
+
+
+@then('the loading should stop')
+def step_loading_stops(context):
+    """Verify the loading indicator is gone"""
+    assert context.mobile_ctx.providers_view.loading is False
+
+
+@then('the app should use TokenHelper to get the hotel ID')
+def step_uses_token_helper(context):
+    """Verify the view resolves its hotel through the shared TokenHelper"""
+    view = context.mobile_ctx.providers_view
+    assert view.token_helper is context.mobile_ctx.token_helper
+    assert view.hotel_id == "hotel_123"
+    assert view.token_helper.cache.loads >= 1
+
+
+@then('the hotel ID should be extracted from the JWT token')
+def step_hotel_from_jwt(context):
+    """Verify the hotel matches the verified token claims"""
+    view = context.mobile_ctx.providers_view
+    assert view.hotel_id == view.token_helper.decode(view.auth_token)['hotelId']
+
+
+@then('the hotel ID should be used for all provider operations')
+def step_hotel_for_operations(context):
+    """Verify every ProviderService request carries the token's hotel"""
+    view = context.mobile_ctx.providers_view
+    view.provider_service = MockProviderService()
+    view.provider_service.create_provider(view.hotel_id, {
+        'name': "Andes Foods", 'email': "ventas@andesfoods.pe", 'phone': "987654321"
+    })
+    view.refresh_providers()
+    view.batch_providers([{'op': 'delete', 'id': view.providers[0].id}])
+    assert view.provider_service.requests
+    assert all(request[1] == "hotel_123" for request in view.provider_service.requests)
+
+
+@when('{count:d} provider operations read the hotel ID from the token')
+def step_hotel_id_lookups(context, count):
+    """Read the hotel ID repeatedly, counting how the claims cache answered"""
+    view = context.mobile_ctx.providers_view
+    cache = view.token_helper.cache
+    loads_before, hits_before = cache.loads, cache.hits
+    for _ in range(count):
+        view.hotel_id
+    context.mobile_ctx.token_loads = cache.loads - loads_before
+    context.mobile_ctx.token_hits = cache.hits - hits_before
+
+
+@then('the token should have been verified at most once')
+def step_token_verified_once(context):
+    """Verify repeated lookups never decoded the token again"""
+    assert context.mobile_ctx.token_loads <= 1
+
+
+@then('at least {count:d} lookups should be served from the claims cache')
+def step_cached_lookups(context, count):
+    """Verify the memoized path answered every lookup but the first"""
+    assert context.mobile_ctx.token_hits >= count, f"{context.mobile_ctx.token_hits} cache hits"
+
+
+@given('my session token expires in {minutes:d} minutes')
+def step_session_token_expiry(context, minutes):
+    """Sign a short-lived token and read its hotel once"""
+    view = context.mobile_ctx.providers_view
+    view.auth_token = issue_token(
+        context, subject="owner-1", role_id=1, hotel_id="hotel_123",
+        lifetime=timedelta(minutes=minutes)
+    )
+    assert view.hotel_id == "hotel_123"
+    context.mobile_ctx.token_loads_before = view.token_helper.cache.loads
+
+
+@then('the hotel ID should still be "{hotel_id}" without verifying the token again')
+def step_hotel_still_cached(context, hotel_id):
+    """Verify the cached claims are served until the token expires"""
+    view = context.mobile_ctx.providers_view
+    assert view.hotel_id == hotel_id
+    assert view.token_helper.cache.loads == context.mobile_ctx.token_loads_before
+
+
+@then('the hotel ID should no longer be available')
+def step_hotel_expired(context):
+    """Verify the claims expired together with the token"""
+    view = context.mobile_ctx.providers_view
+    assert view.hotel_id is None
+    assert view.fetch_provider_pages() is None
+
+
 # ============================================================================
 # USER PROFILE STEPS
 # ============================================================================
@@ -1382,19 +3216,24 @@ def step_generic_providers_behavior(context):
 @given('I am logged in to the mobile app')
 def step_logged_in_mobile(context):
     """Set up logged in state"""
-    if not hasattr(context, 'mobile_ctx'):
-        context.mobile_ctx = MobileAppContext()
-    if not context.mobile_ctx.auth_screen:
-        context.mobile_ctx.auth_screen = MockFlutterAuthScreen()
-    context.mobile_ctx.auth_screen.auth_token = "valid_token"
+    fixtures.get(context, 'mobile_ctx.auth_screen')
+    context.mobile_ctx.auth_screen.auth_token = issue_token(context, subject="user-1", role_id=2)
+
+
+def open_account_page(context, role_id=None):
+    """Account page on the scenario's shared user service and profile cache"""
+    ctx = context.mobile_ctx
+    token = ctx.auth_screen.auth_token if ctx.auth_screen else None
+    page = MockAccountPage(ctx.user_service, ctx.profile_cache, token, ctx.token_helper)
+    page.role_id = role_id
+    return page
 
 
 @given('I navigate to the account page')
 def step_navigate_account_page(context):
     """Navigate to account page"""
-    if not context.mobile_ctx.account_page:
-        context.mobile_ctx.account_page = MockAccountPage()
-    context.mobile_ctx.current_screen = "account"
+    fixtures.get(context, 'mobile_ctx.account_page')
+    context.mobile_ctx.navigator.push("account", lambda: context.mobile_ctx.account_page)
 
 
 @when('the account page loads')
@@ -1449,11 +3288,203 @@ def step_see_navigation_options(context):
 def step_logged_in_guest(context):
     """Set up logged in guest"""
     step_logged_in_mobile(context)
-    if not context.mobile_ctx.account_page:
-        context.mobile_ctx.account_page = MockAccountPage()
+    fixtures.get(context, 'mobile_ctx.account_page')
     context.mobile_ctx.account_page.role_id = 2
 
 
+@given('I am viewing my profile')
+def step_viewing_profile(context):
+    """Load the profile into the account page"""
+    assert context.mobile_ctx.account_page.initialize_account_data() is True
+
+
+@when('I pull to refresh')
+def step_pull_to_refresh_profile(context):
+    """Refresh the account page, bypassing the profile cache"""
+    context.mobile_ctx.profile_calls_before = len(context.mobile_ctx.user_service.calls)
+    context.mobile_ctx.account_page.refresh_profile()
+
+
+@then('the profile data should be refetched')
+def step_profile_refetched(context):
+    """Verify the refresh went to the user service"""
+    assert len(context.mobile_ctx.user_service.calls) == context.mobile_ctx.profile_calls_before + 1
+
+
+@then('updated data should be displayed')
+def step_updated_profile_displayed(context):
+    """Verify the page shows what the service holds"""
+    page = context.mobile_ctx.account_page
+    assert page.get_user_full_name() == context.mobile_ctx.user_service.profiles[page.role]['name']
+
+
+@then('the refresh indicator should disappear')
+def step_refresh_indicator_gone(context):
+    """Verify the refresh finished"""
+    assert context.mobile_ctx.account_page.is_loading is False
+
+
+@given('I update my profile information')
+def step_update_profile(context):
+    """Save new profile data and refresh the page that edited it"""
+    page = context.mobile_ctx.account_page
+    page.initialize_account_data()
+    context.mobile_ctx.user_service.update_profile(
+        page.role, name="Updated Name", photo_url="https://cdn.example.com/updated.jpg"
+    )
+    assert page.refresh_profile() is True
+    context.mobile_ctx.profile_calls_before = len(context.mobile_ctx.user_service.calls)
+
+
+@when('I navigate to different screens')
+def step_navigate_different_screens(context):
+    """Open several screens that each show the profile"""
+    page = context.mobile_ctx.account_page
+    screens = [open_account_page(context, page.role_id) for _ in range(3)]
+    for screen in screens:
+        screen.initialize_account_data()
+    context.mobile_ctx.profile_screens = [page] + screens
+
+
+@then('my updated profile data should be reflected everywhere')
+def step_profile_reflected_everywhere(context):
+    """Verify every screen shows the update without fetching it again"""
+    for screen in context.mobile_ctx.profile_screens:
+        assert screen.get_user_full_name() == "Updated Name"
+    assert len(context.mobile_ctx.user_service.calls) == context.mobile_ctx.profile_calls_before
+
+
+@then('the user name should be consistent')
+def step_profile_name_consistent(context):
+    """Verify all screens agree on the name"""
+    assert len({screen.get_user_full_name() for screen in context.mobile_ctx.profile_screens}) == 1
+
+
+@then('the profile photo should be consistent')
+def step_profile_photo_consistent(context):
+    """Verify all screens agree on the photo"""
+    assert len({screen.get_user_photo_url() for screen in context.mobile_ctx.profile_screens}) == 1
+
+
+@given('I have a valid authentication token')
+def step_valid_auth_token(context):
+    """Verify the session token of the account page"""
+    page = context.mobile_ctx.account_page
+    assert context.mobile_ctx.token_helper.decode(page.auth_token)['sub']
+
+
+@when('the account page initializes')
+def step_account_page_initializes(context):
+    """Initialize the account page from its session token"""
+    assert context.mobile_ctx.account_page.initialize_account_data() is True
+
+
+@then('the app should extract the role ID from the token')
+def step_role_from_token(context):
+    """Verify the role ID came from the token claims"""
+    page = context.mobile_ctx.account_page
+    assert page.role_id == page.token_helper.role_id(page.auth_token)
+
+
+@then('the role ID should be used to determine user type')
+def step_role_determines_type(context):
+    """Verify the page shows the role of the token"""
+    page = context.mobile_ctx.account_page
+    assert page.get_user_role() == ("Owner" if page.role_id == 1 else "Guest")
+
+
+@then('appropriate profile data should be fetched based on role')
+def step_profile_for_role(context):
+    """Verify the profile endpoint matches the role"""
+    page = context.mobile_ctx.account_page
+    endpoint = "getOwnerProfile" if page.role_id == 1 else "getGuestProfile"
+    assert context.mobile_ctx.user_service.calls[-1] == (endpoint, page.user_id)
+
+
+@when('the account page needs authentication data')
+def step_account_page_needs_token(context):
+    """Read the claims of the session token"""
+    page = context.mobile_ctx.account_page
+    context.mobile_ctx.token_claims = page.token_helper.claims(page.auth_token)
+
+
+@then('the TokenHelper should be used to access tokens')
+def step_account_uses_token_helper(context):
+    """Verify the page shares the scenario's TokenHelper"""
+    page = context.mobile_ctx.account_page
+    assert page.token_helper is context.mobile_ctx.token_helper
+    assert page.token_helper.claims(page.auth_token) is context.mobile_ctx.token_claims
+
+
+@then('the token should be validated before use')
+def step_token_validated(context):
+    """Verify a tampered token is rejected"""
+    header, _, signature = context.mobile_ctx.account_page.auth_token.split('.')
+    forged = encode_token({'sub': "user-1", 'roleId': 1}, "not-the-secret").split('.')[1]
+    try:
+        context.mobile_ctx.token_helper.claims(f"{header}.{forged}.{signature}")
+    except TokenError:
+        return
+    raise AssertionError("A token with a forged payload was accepted")
+
+
+@then('expired tokens should be handled appropriately')
+def step_expired_token_handled(context):
+    """Verify an expired session shows an error instead of a profile"""
+    page = open_account_page(context)
+    page.auth_token = issue_token(context, subject="user-1", role_id=2, lifetime=timedelta(minutes=-1))
+    assert page.initialize_account_data() is False
+    assert page.error_message == "Token expired"
+
+
+@given('the user service takes {milliseconds:d} milliseconds per profile')
+def step_user_service_latency(context, milliseconds):
+    """Simulate the profile endpoint round trip"""
+    context.mobile_ctx.user_service.latency = milliseconds / 1000
+
+
+@when('{count:d} screens load my profile at the same time')
+def step_concurrent_profile_loads(context, count):
+    """Load the profile from many screens on separate threads"""
+    role_id = context.mobile_ctx.account_page.role_id
+    screens = [open_account_page(context, role_id) for _ in range(count)]
+    threads = [threading.Thread(target=screen.initialize_account_data) for screen in screens]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(screen.get_user_full_name() == "Guest User" for screen in screens)
+    context.mobile_ctx.profile_screens = screens
+
+
+@when('another screen shows my profile')
+@when('{count:d} more screens show my profile')
+def step_more_screens_show_profile(context, count=1):
+    """Open more screens that read the profile"""
+    role_id = context.mobile_ctx.account_page.role_id
+    for _ in range(count):
+        assert open_account_page(context, role_id).initialize_account_data() is True
+
+
+@then('the user service should have been called once')
+@then('the user service should have been called {count:d} times')
+def step_user_service_calls(context, count=1):
+    """Verify how many profile fetches reached the service"""
+    assert len(context.mobile_ctx.user_service.calls) == count
+
+
+@then('the profile cache should report {count:d} coalesced loads')
+def step_profile_cache_coalesced(context, count):
+    """Verify concurrent misses waited on a single fetch"""
+    assert context.mobile_ctx.profile_cache.coalesced == count
+
+
+@then('the profile cache should report {count:d} hits')
+def step_profile_cache_hits(context, count):
+    """Verify later reads were served from the cache"""
+    assert context.mobile_ctx.profile_cache.hits == count
+
+
 # Add remaining user profile steps as placeholders
 @given('I have no profile photo uploaded')
 @when('I view my account page')
@@ -1481,11 +3512,6 @@ def step_logged_in_guest(context):
 @then('the profile should attempt to load again')
 @then('a loading indicator should appear')
 @then('the error message should disappear')
-@given('I have a valid authentication token')
-@when('the account page initializes')
-@then('the app should extract the role ID from the token')
-@then('the role ID should be used to determine user type')
-@then('appropriate profile data should be fetched based on role')
 @when('my profile is loaded')
 @then('the app should call UserService.getGuestProfile()')
 @then('the app should call UserService.getOwnerProfile()')
@@ -1506,10 +3532,6 @@ def step_logged_in_guest(context):
 @then('authentication tokens should be retrieved from secure storage')
 @then('tokens should be used for API calls')
 @then('sensitive data should be handled securely')
-@when('the account page needs authentication data')
-@then('the TokenHelper should be used to access tokens')
-@then('the token should be validated before use')
-@then('expired tokens should be handled appropriately')
 @then('the account page should use BaseLayout widget')
 @then('the role should be passed to BaseLayout')
 @then('navigation should be properly integrated')
@@ -1529,17 +3551,7 @@ def step_logged_in_guest(context):
 @then('I should be able to modify preferences')
 @then('preferences should be saved locally')
 @then('I should receive confirmation of changes')
-@given('I am viewing my profile')
-@when('I pull to refresh')
-@then('the profile data should be refetched')
 @then('a loading indicator should appear briefly')
-@then('updated data should be displayed')
-@then('the refresh indicator should disappear')
-@given('I update my profile information')
-@when('I navigate to different screens')
-@then('my updated profile data should be reflected everywhere')
-@then('the user name should be consistent')
-@then('the profile photo should be consistent')
 @when('the profile is loading')
 @then('interactive elements should be disabled')
 @then('the user should not be able to navigate away prematurely')
@@ -0,0 +1,126 @@
+from behave import given, when, then
+from decimal import Decimal
+import os
+
+from support.fixture_store import FixtureStore, fixture_store
+from support.fixtures import fixtures
+from support.incomes import (
+    IncomeAggregator, PaymentReportService, ledger_from_table, start_payment_report_service,
+)
+from support.resilience import http
+
+PAYMENT_COUNT = 20_000
+REPORT_HOTEL_ID = 7
+
+# Reports come from a local stand-in unless PAYMENT_REPORT_BASE_URL points at a real backend.
+# That backend must hold the payments of PAYMENT_REPORT_DATASET, a support.datagen dataset
+# directory, since the reference totals are computed from it. PAYMENT_REPORT_HOTEL_ID picks the hotel.
+# Ledgers, local report services and reference totals are built once per run and payment count
+
+
+def _shutdown_report_services(local_services):
+    for server, _ in local_services.values():
+        server.shutdown()
+        server.server_close()
+
+
+@fixtures.fixture('payment_ledgers', scope='run')
+def payment_ledgers(context):
+    return {}
+
+
+@fixtures.fixture('payment_report_services', scope='run', teardown=_shutdown_report_services)
+def payment_report_services(context):
+    return {}
+
+
+@fixtures.fixture('income_references', scope='run')
+def income_references(context):
+    return {}
+
+
+def payment_ledger(context):
+    ledgers = fixtures.get(context, "payment_ledgers")
+    if context.payment_count not in ledgers:
+        if os.environ.get("PAYMENT_REPORT_DATASET"):
+            store = FixtureStore(os.environ["PAYMENT_REPORT_DATASET"])
+        else:
+            store = fixture_store(context.payment_count, seed=39)
+        ledgers[context.payment_count] = ledger_from_table(store.table("payments"))
+    return ledgers[context.payment_count]
+
+
+def report_base_url(context):
+    if os.environ.get("PAYMENT_REPORT_BASE_URL"):
+        return os.environ["PAYMENT_REPORT_BASE_URL"]
+    services = fixtures.get(context, "payment_report_services")
+    if context.payment_count not in services:
+        services[context.payment_count] = start_payment_report_service(
+            PaymentReportService(payment_ledger(context))
+        )
+    return services[context.payment_count][1]
+
+
+def reference_aggregator(context, period):
+    references = fixtures.get(context, "income_references")
+    key = (context.payment_count, period)
+    if key not in references:
+        references[key] = IncomeAggregator(payment_ledger(context), period)
+    return references[key]
+
+
+def select_payments(context, count):
+    context.payment_count = count
+    context.base_url = report_base_url(context)
+    context.hotel_id = int(os.environ.get("PAYMENT_REPORT_HOTEL_ID", REPORT_HOTEL_ID))
+
+
+def in_cents(amount):
+    return int(amount * 100)
+
+
+def request_incomes(context, period, route):
+    context.period = period
+    context.response = http.get(f"{context.base_url}/payment/{route}",
+                                params={"hotelId": context.hotel_id}, headers=getattr(context, "headers", None))
+
+
+def check_incomes(context):
+    assert context.response.status_code == 200
+    report = context.response.json(parse_float=Decimal)
+    expected = reference_aggregator(context, context.period).report(context.hotel_id)
+    assert len(report) == len(expected), f"{len(report)} periods, expected {len(expected)}"
+    for row, reference in zip(report, expected):
+        assert row["periodStart"] == reference["periodStart"]
+        for field in ("customerIncome", "ownerIncome", "totalIncome"):
+            assert in_cents(row[field]) == round(reference[field] * 100), (row, reference)
+        assert in_cents(row["totalIncome"]) == in_cents(row["customerIncome"]) + in_cents(row["ownerIncome"])
+    ledger = payment_ledger(context)
+    hotel_total = int(ledger.amount_cents[ledger.hotel_id == context.hotel_id].sum())
+    assert sum(in_cents(row["totalIncome"]) for row in report) == hotel_total
+
+@given('there are payments for a hotel')
+def step_impl(context):
+    select_payments(context, PAYMENT_COUNT)
+
+@given('there are payments for a hotel among {count:d} payments')
+def step_impl(context, count):
+    select_payments(context, count)
+
+@when('I request weekly incomes report')
+def step_impl(context):
+    request_incomes(context, "week", "get-weekly-incomes")
+
+@then('I should receive weekly income statistics')
+def step_impl(context):
+    check_incomes(context)
+    assert all(row["periodStart"] for row in context.response.json())
+
+@when('I request monthly incomes report')
+def step_impl(context):
+    request_incomes(context, "month", "get-monthly-incomes")
+
+@then('I should receive monthly income statistics')
+def step_impl(context):
+    check_incomes(context)
+    assert all(row["periodStart"].endswith("-01") for row in context.response.json())
@@ -1,5 +1,6 @@
 from behave import given, when, then
-import requests
+
+from support.resilience import http
 
 BASE_URL = "https://sweetmanager-backend-emergents.onrender.com/api/v1"
 
@@ -16,7 +17,7 @@ def step_impl(context):
         "floor": 1,
         "typeRoomId": "suite_type_id"
     }
-    context.response = requests.post(f"{BASE_URL}/room/set-up", json=context.room_data, headers=context.headers)
+    context.response = http.post(f"{BASE_URL}/room/set-up", json=context.room_data, headers=context.headers)
 
 @then('the room should be created successfully')
 def step_impl(context):
@@ -38,7 +39,7 @@ def step_impl(context):
         "roomNumber": "202",
         "status": "available"
     }
-    context.response = requests.post(f"{BASE_URL}/room/create-room", json=context.room_data, headers=context.headers)
+    context.response = http.post(f"{BASE_URL}/room/create-room", json=context.room_data, headers=context.headers)
 
 @then('the room should be registered in the system')
 def step_impl(context):
@@ -53,7 +54,7 @@ def step_impl(context):
 @when('I update the room state to "{state}"')
 def step_impl(context, state):
     context.update_data = {"state": state}
-    context.response = requests.put(f"{BASE_URL}/room/update-room-state", 
+    context.response = http.put(f"{BASE_URL}/room/update-room-state", 
                                    params={"roomId": context.room_id}, 
                                    json=context.update_data, 
                                    headers=context.headers)
@@ -72,7 +73,7 @@ def step_impl(context):
 
 @when('I request the room information by ID')
 def step_impl(context):
-    context.response = requests.get(f"{BASE_URL}/room/get-room-by-id", params={"id": context.room_id})
+    context.response = http.get(f"{BASE_URL}/room/get-room-by-id", params={"id": context.room_id})
 
 @then('I should receive the room details')
 def step_impl(context):
@@ -84,7 +85,7 @@ def step_impl(context):
 
 @when('I filter rooms by state "{state}"')
 def step_impl(context, state):
-    context.response = requests.get(f"{BASE_URL}/room/get-room-by-state", params={"state": state})
+    context.response = http.get(f"{BASE_URL}/room/get-room-by-state", params={"state": state})
 
 @then('I should receive only available rooms')
 def step_impl(context):
@@ -96,7 +97,7 @@ def step_impl(context):
 
 @when('I request all rooms')
 def step_impl(context):
-    context.response = requests.get(f"{BASE_URL}/room/get-all-rooms")
+    context.response = http.get(f"{BASE_URL}/room/get-all-rooms")
 
 @then('I should receive the complete rooms list')
 def step_impl(context):
@@ -109,7 +110,7 @@ def step_impl(context):
 
 @when('I filter rooms by type "{room_type}"')
 def step_impl(context, room_type):
-    context.response = requests.get(f"{BASE_URL}/room/get-room-by-type-room", params={"typeRoom": room_type})
+    context.response = http.get(f"{BASE_URL}/room/get-room-by-type-room", params={"typeRoom": room_type})
 
 @then('I should receive only suite rooms')
 def step_impl(context):
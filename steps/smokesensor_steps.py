@@ -0,0 +1,174 @@
+from behave import given, when, then
+import os
+
+from support.fixtures import fixtures
+from support.resilience import http
+from support.sensor_service import CRITICAL_TEMPERATURE, start_sensor_service
+from support.telemetry import TelemetrySimulator
+
+
+def _shutdown_sensor_service(local_service):
+    server, _ = local_service
+    server.shutdown()
+    server.server_close()
+
+
+# Runs against a local stand-in unless SMOKE_SENSOR_BASE_URL points at a real backend
+@fixtures.fixture('sensor_service', scope='run', teardown=_shutdown_sensor_service)
+def sensor_service(context):
+    return start_sensor_service()
+
+
+def sensor_base_url(context):
+    if os.environ.get("SMOKE_SENSOR_BASE_URL"):
+        return os.environ["SMOKE_SENSOR_BASE_URL"]
+    return fixtures.get(context, "sensor_service")[1]
+
+
+def create_sensor(context, **fields):
+    sensor_data = {"roomId": "test_room_id_123", "hotelId": "test_hotel_id", "state": "ACTIVE"}
+    sensor_data.update(fields)
+    response = http.post(f"{sensor_base_url(context)}/smoke-sensor/create-smoke-sensor",
+                         json=sensor_data, headers=getattr(context, "headers", None))
+    assert response.status_code in [200, 201]
+    return response.json()
+
+@when('I register a new smoke sensor for a room')
+def step_impl(context):
+    context.sensor_data = {
+        "roomId": "test_room_id_123",
+        "hotelId": "test_hotel_id",
+        "state": "ACTIVE",
+        "temperature": 21.5
+    }
+    context.response = http.post(f"{sensor_base_url(context)}/smoke-sensor/create-smoke-sensor",
+                                 json=context.sensor_data, headers=context.headers)
+
+@then('the sensor should be created successfully')
+def step_impl(context):
+    assert context.response.status_code in [200, 201]
+    assert context.response.json()["roomId"] == context.sensor_data["roomId"]
+
+@then('the sensor should be active')
+def step_impl(context):
+    assert context.response.json()["state"] == "ACTIVE"
+
+@given('a smoke sensor exists')
+@given('a smoke sensor exists with a specific ID')
+def step_impl(context):
+    context.sensor_id = create_sensor(context)["id"]
+
+@when('I update the sensor state and temperature')
+def step_impl(context):
+    context.update_data = {"state": "INACTIVE", "temperature": 24.0}
+    context.response = http.put(f"{sensor_base_url(context)}/smoke-sensor/update-smoke-sensor-state",
+                                params={"id": context.sensor_id},
+                                json=context.update_data)
+
+@then('the sensor state should be updated successfully')
+def step_impl(context):
+    assert context.response.status_code in [200, 204]
+    assert context.response.json()["state"] == context.update_data["state"]
+    assert context.response.json()["temperature"] == context.update_data["temperature"]
+
+@when('I request the sensor information')
+def step_impl(context):
+    context.response = http.get(f"{sensor_base_url(context)}/smoke-sensor/get-smoke-sensor-by-id",
+                                params={"id": context.sensor_id})
+
+@then('I should receive the sensor details')
+def step_impl(context):
+    assert context.response.status_code == 200
+    assert context.response.json()["id"] == context.sensor_id
+
+@given('there are smoke sensors in the system')
+def step_impl(context):
+    context.sensor_ids = [create_sensor(context, roomId=f"room_{n}")["id"] for n in range(3)]
+
+@when('I request all sensors')
+def step_impl(context):
+    context.response = http.get(f"{sensor_base_url(context)}/smoke-sensor/get-all-smoke-sensors")
+
+@then('I should receive the complete sensors list')
+def step_impl(context):
+    assert context.response.status_code == 200
+    assert isinstance(context.response.json(), list)
+    assert set(context.sensor_ids) <= {sensor["id"] for sensor in context.response.json()}
+
+@when('I update only the temperature value')
+def step_impl(context):
+    context.temperature = CRITICAL_TEMPERATURE + 18
+    context.response = http.put(f"{sensor_base_url(context)}/smoke-sensor/update-smoke-sensor-temperature",
+                                params={"id": context.sensor_id},
+                                json={"temperature": context.temperature})
+
+@then('the temperature should be updated successfully')
+def step_impl(context):
+    assert context.response.status_code in [200, 204]
+    assert context.response.json()["temperature"] == context.temperature
+
+@then('an alert should be triggered if temperature is critical')
+def step_impl(context):
+    sensor = context.response.json()
+    if sensor["temperature"] >= sensor["thresholdTemperature"]:
+        assert sensor["state"] == "ALARM"
+        assert sensor["alert"]["sensorId"] == context.sensor_id
+    else:
+        assert sensor["alert"] is None
+
+@when('I update the sensor configuration')
+def step_impl(context):
+    context.config_data = {"thresholdTemperature": 60.0, "samplingIntervalSeconds": 30}
+    context.response = http.put(f"{sensor_base_url(context)}/smoke-sensor/update-smoke-sensor",
+                                params={"id": context.sensor_id},
+                                json=context.config_data)
+
+@then('the sensor should be reconfigured successfully')
+def step_impl(context):
+    assert context.response.status_code in [200, 204]
+    for field, value in context.config_data.items():
+        assert context.response.json()[field] == value
+
+@given('a local smoke sensor service for telemetry')
+def step_impl(context):
+    server, context.telemetry_url = start_sensor_service()
+    context.telemetry_service = server.service
+    context.add_cleanup(_shutdown_sensor_service, (server, context.telemetry_url))
+
+@given('{count:d} virtual smoke sensors reporting every {interval:d} second')
+def step_impl(context, count, interval):
+    service = context.telemetry_service
+    context.virtual_sensor_ids = [
+        service.create({"roomId": f"room_{n}", "hotelId": "test_hotel_id"})["id"] for n in range(count)
+    ]
+    context.telemetry_interval = interval
+
+@given('{count:d} of them overheat past the critical temperature')
+def step_impl(context, count):
+    step = len(context.virtual_sensor_ids) // count
+    context.overheating_ids = context.virtual_sensor_ids[::step][:count]
+
+@when('the telemetry simulator runs for {seconds:d} seconds')
+def step_impl(context, seconds):
+    simulator = TelemetrySimulator(context.telemetry_url, context.virtual_sensor_ids,
+                                   interval=context.telemetry_interval,
+                                   overheating=context.overheating_ids,
+                                   critical=CRITICAL_TEMPERATURE)
+    context.telemetry_report = simulator.run(seconds)
+
+@then('the service should ingest at least {percent:d}% of the target rate')
+def step_impl(context, percent):
+    report = context.telemetry_report
+    assert not report["errors"], report["errors"][:3]
+    assert report["accepted"] == report["sent"]
+    assert report["throughput"] >= report["target_rate"] * percent / 100
+
+@then('every overheating sensor should raise exactly one alert')
+def step_impl(context):
+    alerted = [sensor_id for sensor_id, _ in context.telemetry_report["alerts"]]
+    assert sorted(alerted) == sorted(context.overheating_ids)
+    assert len(context.telemetry_service.alerts) == len(context.overheating_ids)
+
+@then('the 95th percentile alert latency should be under {limit:d} milliseconds')
+def step_impl(context, limit):
+    assert context.telemetry_report["latency_p95"] * 1000 < limit
@@ -0,0 +1,7 @@
+"""
+Shared helpers for the step definitions.
+
+Behave only loads the modules directly inside ``steps/`` as step modules, so
+code that several step modules (or the environment hooks) need lives in this
+package and is imported with ``from support.<module> import ...``.
+"""
@@ -0,0 +1,160 @@
+"""
+Local stub of the backend's authentication, hotel and room endpoints.
+
+``BackendStub`` keeps accounts, hotels and rooms in memory and answers the
+requests the hotels, rooms and authentication scenarios send, with the same
+routes and query parameters as the onrender deployment. Sign-in returns a
+JWT from ``support.tokens``; writes require a bearer token. The differential
+runner in ``support.differential`` keeps this stub honest against the live
+API.
+"""
+
+import itertools
+import threading
+from datetime import datetime, timezone
+
+from support.local_api import JsonRouteHandler, NotFound, serve
+from support.tokens import encode_token
+
+
+ROLES = {'owner': 1, 'guest': 2, 'admin': 3}
+ROOM_STATES = ('available', 'occupied', 'maintenance')
+
+
+def _timestamp():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+class BackendStub:
+    """In-memory accounts, hotels and rooms"""
+
+    def __init__(self):
+        self.accounts = {}
+        self.hotels = {}
+        self.rooms = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def sign_up(self, role, data):
+        if not data.get('username') or not data.get('password'):
+            raise ValueError('username and password are required')
+        with self._lock:
+            if data['username'] in self.accounts:
+                return 409, {'message': f"User {data['username']} already exists"}
+            account = {
+                'id': next(self._ids),
+                'username': data['username'],
+                'email': data.get('email'),
+                'role': role,
+                'createdAt': _timestamp(),
+            }
+            self.accounts[data['username']] = dict(account, password=data['password'])
+            return 201, account
+
+    def sign_in(self, data):
+        account = self.accounts.get(data.get('username'))
+        if account is None or account['password'] != data.get('password'):
+            return 401, {'message': 'Invalid username or password'}
+        token = encode_token({'sub': str(account['id']), 'roleId': ROLES[account['role']]})
+        return 200, {'id': account['id'], 'username': account['username'], 'token': token}
+
+    def create_hotel(self, data):
+        if not data.get('name'):
+            raise ValueError('name is required')
+        with self._lock:
+            hotel = dict(data, id=next(self._ids), createdAt=_timestamp())
+            self.hotels[hotel['id']] = hotel
+            return dict(hotel)
+
+    def hotel(self, hotel_id):
+        hotel = self.hotels.get(_number(hotel_id))
+        if hotel is None:
+            raise NotFound(f"Hotel {hotel_id} not found")
+        return hotel
+
+    def update_hotel(self, hotel_id, data):
+        with self._lock:
+            hotel = self.hotel(hotel_id)
+            hotel.update(data, id=hotel['id'])
+            return dict(hotel)
+
+    def hotels_of(self, owner_id):
+        return [dict(hotel) for hotel in self.hotels.values() if str(hotel.get('ownerId')) == owner_id]
+
+    def create_room(self, data):
+        if not data.get('hotelId'):
+            raise ValueError('hotelId is required')
+        with self._lock:
+            room = dict(data, id=next(self._ids), state=data.get('status', data.get('state', 'available')))
+            self.rooms[room['id']] = room
+            return dict(room)
+
+    def room(self, room_id):
+        room = self.rooms.get(_number(room_id))
+        if room is None:
+            raise NotFound(f"Room {room_id} not found")
+        return room
+
+    def update_room_state(self, room_id, state):
+        if state not in ROOM_STATES:
+            raise ValueError(f"Unknown room state {state!r}")
+        with self._lock:
+            room = self.room(room_id)
+            room['state'] = state
+            return dict(room)
+
+    def rooms_where(self, field, value):
+        return [dict(room) for room in self.rooms.values() if room.get(field) == value]
+
+
+def _number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class BackendStubHandler(JsonRouteHandler):
+    """JSON routes over a BackendStub"""
+
+    def routes(self, method):
+        stub = self.service
+        return {
+            'GET': {
+                'hotels': lambda query, body: (200, [dict(hotel) for hotel in stub.hotels.values()]),
+                'hotels/{id}': lambda query, body: (200, dict(stub.hotel(query['id']))),
+                'hotels/owner/{ownerId}': lambda query, body: (200, stub.hotels_of(query['ownerId'])),
+                'room/get-room-by-id': lambda query, body: (200, dict(stub.room(query['id']))),
+                'room/get-room-by-state': lambda query, body: (200, stub.rooms_where('state', query['state'])),
+                'room/get-all-rooms': lambda query, body: (200, [dict(room) for room in stub.rooms.values()]),
+                'room/get-room-by-type-room': lambda query, body: (
+                    200, stub.rooms_where('typeRoomId', query['typeRoom'])),
+            },
+            'POST': {
+                'authentication/sign-up-admin': lambda query, body: stub.sign_up('admin', body),
+                'authentication/sign-up-guest': lambda query, body: stub.sign_up('guest', body),
+                'authentication/sign-up-owner': lambda query, body: stub.sign_up('owner', body),
+                'authentication/sign-in': lambda query, body: stub.sign_in(body),
+                'hotels': self._authorized(lambda query, body: (201, stub.create_hotel(body))),
+                'room/set-up': self._authorized(lambda query, body: (201, stub.create_room(body))),
+                'room/create-room': self._authorized(lambda query, body: (201, stub.create_room(body))),
+            },
+            'PUT': {
+                'hotels/{id}': self._authorized(
+                    lambda query, body: (200, stub.update_hotel(query['id'], body))),
+                'room/update-room-state': self._authorized(
+                    lambda query, body: (200, stub.update_room_state(query['roomId'], body['state']))),
+            },
+        }.get(method, {})
+
+    def _authorized(self, route):
+        def guarded(query, body):
+            if not (self.headers.get('Authorization') or '').startswith('Bearer '):
+                return 401, {'message': 'Unauthorized'}
+            return route(query, body)
+        return guarded
+
+
+def start_backend_stub(stub=None, port=0):
+    """Serve a BackendStub on localhost; return (server, base url)"""
+    return serve(BackendStubHandler, stub or BackendStub(), port)
@@ -0,0 +1,24 @@
+"""
+Opt-in benchmark scenarios.
+
+Scenarios tagged ``@benchmark`` hold their code to wall-clock budgets or
+build datasets with tens of thousands of rows. Those budgets do not hold
+under ``-D profile``, ``-D memory`` or a parallel run that keeps every core
+busy, and the datasets would dominate the default run. So the environment
+hooks skip these scenarios unless the run asks for them with
+``-D benchmarks`` or ``SWEET_MANAGER_BENCHMARKS=1``. Each benchmark keeps a
+small untagged scenario next to it that checks the same behaviour without
+timing it.
+"""
+
+import os
+
+
+BENCHMARK_TAG = 'benchmark'
+BENCHMARKS_ENV = 'SWEET_MANAGER_BENCHMARKS'
+
+
+def benchmarks_enabled(userdata=None):
+    """Whether ``@benchmark`` scenarios run"""
+    value = (userdata or {}).get('benchmarks', os.environ.get(BENCHMARKS_ENV))
+    return value is not None and value.lower() not in ('', '0', 'false', 'no', 'off')
@@ -0,0 +1,77 @@
+"""
+Run-wide time budget for the network scenarios.
+
+A ``RunBudget`` starts counting when the run starts. Once it is spent, the
+environment hooks skip the remaining ``@network`` scenarios, and
+``support.resilience.http`` refuses to start new requests. In-flight requests
+also have their timeouts clamped to what is left, so a slow backend cannot
+push the run past its deadline. Local scenarios are not affected.
+
+The budget is set in seconds with ``-D run_budget=600`` or the
+``SWEET_MANAGER_RUN_BUDGET`` environment variable. Without either, the run
+has no deadline.
+
+Some scenarios run against a local stand-in by default and only reach a real
+backend when an environment variable points them at one. They carry a tag
+from ``BACKEND_OVERRIDES`` and count as network scenarios, for the budget and
+for ``support.parallel``, whenever that variable is set.
+"""
+
+import os
+
+from support.clock import SystemClock
+
+
+BUDGET_ENV = 'SWEET_MANAGER_RUN_BUDGET'
+NETWORK_TAG = 'network'
+# Tag -> variable that points the tagged scenarios at a real backend
+BACKEND_OVERRIDES = {
+    'payment_reports': 'PAYMENT_REPORT_BASE_URL',
+    'smoke_sensor_api': 'SMOKE_SENSOR_BASE_URL',
+}
+
+
+class BudgetExhausted(Exception):
+    """The run-wide deadline has passed; the network call was not made"""
+
+
+class RunBudget:
+    """Deadline shared by every network step of a run"""
+
+    def __init__(self, seconds=None, clock=None):
+        self.seconds = seconds
+        self.clock = clock or SystemClock()
+        self.started = self.clock.monotonic()
+
+    @classmethod
+    def from_config(cls, userdata=None, clock=None):
+        """Budget from behave userdata, falling back to the environment"""
+        value = (userdata or {}).get('run_budget') or os.environ.get(BUDGET_ENV)
+        return cls(float(value) if value else None, clock)
+
+    def elapsed(self):
+        return self.clock.monotonic() - self.started
+
+    def remaining(self):
+        if self.seconds is None:
+            return float('inf')
+        return self.seconds - self.elapsed()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def reason(self):
+        return f"run budget of {self.seconds:g}s spent after {self.elapsed():.1f}s"
+
+    def check(self):
+        """Raise ``BudgetExhausted`` once the deadline has passed"""
+        if self.expired():
+            raise BudgetExhausted(self.reason())
+
+
+def needs_network(tags, environ=None):
+    """Whether a scenario with these tags waits on a remote backend"""
+    environ = os.environ if environ is None else environ
+    return NETWORK_TAG in tags or any(
+        environ.get(variable) for tag, variable in BACKEND_OVERRIDES.items() if tag in tags
+    )
@@ -0,0 +1,146 @@
+"""
+Time-aware read-through cache for the mock services.
+
+``TTLCache.get`` returns a fresh cached value or calls the loader. Concurrent
+misses on the same key are single-flight: the first caller loads while the
+others wait for its result, so a burst of screens asking for the same data
+costs one fetch. Entries expire on the injected clock and the cache can be
+bounded, evicting the least recently used entry first. Expiry times are
+stored in the clock's own ``monotonic()`` units, so the clock is only
+swapped through ``set_clock``, which drops what was cached under the old one.
+"""
+
+import threading
+from collections import OrderedDict
+
+from support.clock import SystemClock
+
+
+class _Flight:
+    """A load in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class TTLCache:
+    """Read-through cache with expiry, single-flight loading and hit counts"""
+
+    def __init__(self, ttl, clock=None, max_entries=None):
+        self.ttl = ttl
+        self.clock = clock or SystemClock()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, loader, ttl=None):
+        """Cached value for ``key``, loading it once on a miss
+
+        ``ttl`` overrides the cache-wide TTL in seconds; it may also be a
+        callable receiving the loaded value, for data that carries its own
+        expiry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self.clock.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                flight = self._inflight[key] = _Flight()
+                self.loads += 1
+                leader = True
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            value = loader()
+        except Exception as error:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.error = error
+            flight.done.set()
+            raise
+
+        lifetime = ttl if ttl is not None else self.ttl
+        if callable(lifetime):
+            lifetime = lifetime(value)
+        with self._lock:
+            # An invalidation during the load drops the flight; its value is stale
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+                if lifetime > 0:
+                    self._store(key, self.clock.monotonic() + lifetime, value)
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def peek(self, key):
+        """Fresh cached value without loading or counting, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock.monotonic():
+                return entry[1]
+            return None
+
+    def set_clock(self, clock):
+        """Run on another clock, forgetting entries whose expiry belongs to the old one"""
+        with self._lock:
+            self.clock = clock
+            self._entries.clear()
+            self._inflight.clear()
+
+    def invalidate(self, key=None):
+        """Forget one key, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._inflight.clear()
+            else:
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'loads': self.loads,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+        }
+
+    def _store(self, key, expires_at, value):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
@@ -0,0 +1,433 @@
+"""
+Card validation engine for the payment screen mocks.
+
+A single pass over each card number extracts the digits, computes the Luhn
+checksum and reads the BIN used for brand detection. ``validate_batch`` does
+the same for many cards at once with NumPy so checkout inputs can be fuzzed by
+the million.
+"""
+
+import numpy as np
+
+from support.clock import SystemClock
+
+
+BRANDS = ('unknown', 'visa', 'mastercard', 'amex', 'discover', 'diners', 'jcb')
+
+# Inclusive 6-digit BIN ranges per brand
+BRAND_RANGES = {
+    'visa': [(400000, 499999)],
+    'mastercard': [(510000, 559999), (222100, 272099)],
+    'amex': [(340000, 349999), (370000, 379999)],
+    'discover': [(601100, 601199), (644000, 659999)],
+    'diners': [(300000, 305999), (360000, 369999), (380000, 399999)],
+    'jcb': [(352800, 358999)],
+}
+
+BRAND_LENGTHS = {
+    'unknown': range(13, 20),
+    'visa': (13, 16, 19),
+    'mastercard': (16,),
+    'amex': (15,),
+    'discover': range(16, 20),
+    'diners': range(14, 20),
+    'jcb': range(16, 20),
+}
+
+MAX_CARD_DIGITS = 19
+
+CARD_NUMBER_ERROR = "Invalid card number"
+EXPIRATION_ERROR = "Invalid or expired date"
+CVV_ERROR = "CVV must be 3 or 4 digits"
+
+
+def _build_bin_table():
+    table = np.zeros(10 ** 6, dtype=np.uint8)
+    for code, brand in enumerate(BRANDS):
+        for low, high in BRAND_RANGES.get(brand, ()):
+            table[low:high + 1] = code
+    return table
+
+
+def _build_length_table():
+    table = np.zeros((len(BRANDS), MAX_CARD_DIGITS + 1), dtype=bool)
+    for code, brand in enumerate(BRANDS):
+        table[code, list(BRAND_LENGTHS[brand])] = True
+    return table
+
+
+BIN_TABLE = _build_bin_table()
+LENGTH_TABLE = _build_length_table()
+LUHN_DOUBLED = np.array([0, 2, 4, 6, 8, 1, 3, 5, 7, 9], dtype=np.uint8)
+_LUHN_DOUBLED = tuple(int(d) for d in LUHN_DOUBLED)
+_BRAND_LENGTHS = tuple(frozenset(BRAND_LENGTHS[brand]) for brand in BRANDS)
+
+
+def expiry_key(moment):
+    """Return the YYMM integer a card must not be older than at ``moment``"""
+    return (moment.year % 100) * 100 + moment.month
+
+
+class CardValidationEngine:
+    """Validates card number, expiry and CVV in one pass per field
+
+    The clock is read once per ``validate``/``validate_batch`` call, never
+    per field or per card.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+
+    def check_number(self, number):
+        """Return digits, brand and validity of a card number"""
+        digits = []
+        # Luhn sums for both parities, picked once the length is known
+        even_sum = odd_sum = 0
+        for char in number:
+            if '0' <= char <= '9':
+                value = ord(char) - 48
+                if len(digits) % 2:
+                    even_sum += value
+                    odd_sum += _LUHN_DOUBLED[value]
+                else:
+                    even_sum += _LUHN_DOUBLED[value]
+                    odd_sum += value
+                digits.append(char)
+
+        length = len(digits)
+        luhn_sum = odd_sum if length % 2 else even_sum
+        bin_prefix = int(''.join(digits[:6]).ljust(6, '0')) if digits else 0
+        brand = int(BIN_TABLE[bin_prefix])
+        length_ok = length in _BRAND_LENGTHS[brand]
+        luhn_ok = 0 < length <= MAX_CARD_DIGITS and luhn_sum % 10 == 0
+        return {
+            'digits': ''.join(digits),
+            'brand': BRANDS[brand],
+            'length_ok': length_ok,
+            'luhn_ok': luhn_ok,
+            'valid': length_ok and luhn_ok,
+        }
+
+    def check_expiration(self, expiration, current_key=None):
+        """Return whether an MM/YY expiration is well formed and not expired"""
+        digits = [char for char in expiration if '0' <= char <= '9']
+        if len(digits) != 4:
+            return False
+        month = int(digits[0] + digits[1])
+        year = int(digits[2] + digits[3])
+        if month < 1 or month > 12:
+            return False
+        if current_key is None:
+            current_key = expiry_key(self.clock.now())
+        return year * 100 + month >= current_key
+
+    def check_cvv(self, cvv):
+        """Return whether the CVV is 3 or 4 digits"""
+        return len(cvv) in (3, 4) and all('0' <= char <= '9' for char in cvv)
+
+    def validate(self, number, expiration, cvv):
+        """Validate a full card and return the first error message, if any"""
+        card = self.check_number(number)
+        card['expiration_ok'] = self.check_expiration(expiration, expiry_key(self.clock.now()))
+        card['cvv_ok'] = self.check_cvv(cvv)
+        if not card['valid']:
+            card['error'] = CARD_NUMBER_ERROR
+        elif not card['expiration_ok']:
+            card['error'] = EXPIRATION_ERROR
+        elif not card['cvv_ok']:
+            card['error'] = CVV_ERROR
+        else:
+            card['error'] = None
+        return card
+
+    def validate_batch(self, numbers, expirations=None, cvvs=None):
+        """Validate many cards at once, returning one NumPy array per check"""
+        digits, lengths = _digit_matrix(numbers, MAX_CARD_DIGITS)
+
+        # Position j is doubled when it is an odd distance from the last digit
+        positions = np.arange(digits.shape[1])
+        in_number = positions < lengths[:, None]
+        doubled = ((lengths[:, None] - 1 - positions) % 2 == 1) & in_number
+        luhn_sum = np.where(doubled, LUHN_DOUBLED[digits], digits).sum(axis=1, dtype=np.int64)
+        luhn_ok = (lengths > 0) & (lengths <= MAX_CARD_DIGITS) & (luhn_sum % 10 == 0)
+
+        bin_prefix = digits[:, :6].astype(np.int64) @ (10 ** np.arange(5, -1, -1))
+        brand = BIN_TABLE[bin_prefix]
+        length_ok = LENGTH_TABLE[brand, np.minimum(lengths, MAX_CARD_DIGITS)] & (lengths <= MAX_CARD_DIGITS)
+        result = {
+            'brand': np.array(BRANDS)[brand],
+            'length_ok': length_ok,
+            'luhn_ok': luhn_ok,
+            'valid': length_ok & luhn_ok,
+        }
+
+        if expirations is not None:
+            exp_digits, exp_lengths = _digit_matrix(expirations, 4)
+            month = exp_digits[:, 0].astype(np.int32) * 10 + exp_digits[:, 1]
+            year = exp_digits[:, 2].astype(np.int32) * 10 + exp_digits[:, 3]
+            result['expiration_ok'] = (
+                (exp_lengths == 4) & (month >= 1) & (month <= 12)
+                & (year * 100 + month >= expiry_key(self.clock.now()))
+            )
+        if cvvs is not None:
+            raw = _code_points(cvvs)
+            cvv_lengths = np.fromiter((len(cvv) for cvv in cvvs), dtype=np.int64, count=len(cvvs))
+            all_digits = ((raw >= 48) & (raw <= 57)).sum(axis=1) == cvv_lengths
+            result['cvv_ok'] = ((cvv_lengths == 3) | (cvv_lengths == 4)) & all_digits
+        return result
+
+
+def _digit_matrix(values, width):
+    """Left-align the digits of each string into an (n, width) uint8 matrix
+
+    Returns the matrix and the number of digits found per string; strings
+    holding more than ``width`` digits report their full digit count.
+    """
+    count = len(values)
+    raw = _code_points(values)
+    is_digit = (raw >= 48) & (raw <= 57)
+    lengths = is_digit.sum(axis=1)
+
+    # Compact digits to the left: each digit's column is the number of digits before it,
+    # everything else is scattered into a spare column that is dropped afterwards
+    columns = np.cumsum(is_digit, axis=1, dtype=np.int32) - 1
+    columns[~is_digit | (columns >= width)] = width
+    matrix = np.zeros((count, width + 1), dtype=np.uint8)
+    np.put_along_axis(matrix, columns, (raw - 48).astype(np.uint8), axis=1)
+    return matrix[:, :width], lengths
+
+
+def _code_points(values):
+    """Return an (n, max length) matrix of Unicode code points, zero padded"""
+    width = max((len(v) for v in values), default=0) or 1
+    return np.array(values, dtype=f'U{width}').view(np.uint32).reshape(len(values), width)
+
+
+def random_card_inputs(count, seed=0):
+    """Generate card numbers, expirations and CVVs for fuzzing the validators
+
+    Most numbers carry a correct Luhn check digit; a share get a typo in the
+    check digit, a stray ``-`` or the ``#### #### ...`` grouping the payment
+    screen displays, so every branch of the validators is exercised.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.arange(MAX_CARD_DIGITS)
+    rows = np.arange(count)
+    lengths = rng.choice([14, 15, 16, 19], size=count)
+    in_number = positions < lengths[:, None]
+    in_payload = positions < (lengths - 1)[:, None]
+
+    digits = rng.integers(0, 10, size=(count, MAX_CARD_DIGITS), dtype=np.uint8)
+    digits[:, 0] = rng.choice([3, 4, 5, 6], size=count)
+    doubled = ((lengths[:, None] - 1 - positions) % 2 == 1) & in_payload
+    total = np.where(doubled, LUHN_DOUBLED[digits], np.where(in_payload, digits, 0)).sum(axis=1)
+    digits[rows, lengths - 1] = (10 - total % 10) % 10
+    typo = rng.random(count) < 0.2
+    digits[typo, lengths[typo] - 1] = rng.integers(0, 10, size=int(typo.sum()), dtype=np.uint8)
+
+    codes = np.where(in_number, digits.astype(np.uint32) + 48, 0).astype(np.uint32)
+    dashed = rows[rng.random(count) < 0.05]
+    codes[dashed, (rng.random(len(dashed)) * lengths[dashed]).astype(np.int64)] = ord('-')
+
+    # Spread grouped numbers out by one column per group of four and fill the gaps with spaces
+    groups = MAX_CARD_DIGITS // 4
+    grouped = rng.random(count) < 0.2
+    numbers = np.zeros((count, MAX_CARD_DIGITS + groups), dtype=np.uint32)
+    target = positions + np.where(grouped[:, None], positions // 4, 0)
+    np.put_along_axis(numbers, target, codes, axis=1)
+    for group in range(1, groups + 1):
+        spaced = grouped & (lengths > 4 * group)
+        numbers[spaced, 5 * group - 1] = ord(' ')
+
+    months = rng.integers(0, 14, size=count)
+    years = rng.integers(20, 35, size=count)
+    expirations = (np.stack([months // 10, months % 10, years // 10, years % 10], axis=1) + 48).astype(np.uint32)
+
+    cvv_lengths = rng.integers(2, 6, size=count)
+    cvv_chars = rng.integers(0, 11, size=(count, 5))
+    cvvs = np.where(cvv_chars == 10, ord('a'), cvv_chars + 48)
+    cvvs = np.where(np.arange(5) < cvv_lengths[:, None], cvvs, 0).astype(np.uint32)
+
+    return (
+        _strings(numbers),
+        _strings(np.ascontiguousarray(expirations)),
+        _strings(np.ascontiguousarray(cvvs)),
+    )
+
+
+def _strings(code_points):
+    """Turn a zero padded code point matrix back into Python strings"""
+    return code_points.view(f'U{code_points.shape[1]}').ravel().tolist()
+
+
+class IncrementalCardFormatter:
+    """As-you-type card number formatter
+
+    The digits live in a gap buffer split at the caret: ``_head`` holds the
+    digits before it and ``_tail`` the digits after it, reversed, so typing,
+    backspace and delete touch one end of a list. The formatted text is kept
+    the same way. ``_head_text`` is the grouped text of the head, and
+    ``_tail_texts[a]`` is the grouped text of the tail, reversed, for a head
+    whose last group already holds ``a`` digits. Inserting or removing next
+    to the caret only pushes or pops characters on these lists and rotates
+    the four tail renderings, so every edit is O(1) amortized Python work
+    wherever the caret is, and a paste costs O(pasted digits). Moving the
+    caret shifts the digits it passes over. ``text`` joins the pieces when
+    read and always equals ``MockPaymentScreen.format_card_number`` of the
+    digits typed so far. ``gap_moves`` counts the digits pushed onto or popped
+    off either side of the gap, the unit of work of every edit.
+    """
+
+    def __init__(self, group_size=4):
+        self.group_size = group_size
+        self.gap_moves = 0
+        self._clear()
+
+    @property
+    def caret(self):
+        return len(self._head)
+
+    @property
+    def digits(self):
+        return self._head + self._tail[::-1]
+
+    @property
+    def text(self):
+        if self._text is None:
+            tail = self._tail_texts[len(self._head) % self.group_size]
+            separator = ' ' if self._head and self._tail and not len(self._head) % self.group_size else ''
+            self._text = ''.join(self._head_text) + separator + ''.join(reversed(tail))
+        return self._text
+
+    @property
+    def display_caret(self):
+        """Caret position in the formatted text"""
+        return self._display_index(self.caret)
+
+    def set_text(self, raw):
+        """Replace the whole field content"""
+        self._clear()
+        self.insert(raw)
+
+    def insert(self, chars):
+        """Type or paste at the caret; non-digits are dropped"""
+        for char in chars:
+            if '0' <= char <= '9':
+                self._push_head(char)
+        return self.text
+
+    def backspace(self):
+        """Delete the digit before the caret"""
+        if self._head:
+            self._pop_head()
+        return self.text
+
+    def delete(self):
+        """Delete the digit after the caret"""
+        if self._tail:
+            self._pop_tail()
+        return self.text
+
+    def move_caret(self, position):
+        """Move the caret to a digit index"""
+        position = max(0, min(position, len(self._head) + len(self._tail)))
+        while len(self._head) > position:
+            self._push_tail(self._pop_head())
+        while len(self._head) < position:
+            self._push_head(self._pop_tail())
+
+    def _clear(self):
+        self._head = []
+        self._tail = []
+        self._head_text = []
+        self._tail_texts = [[] for _ in range(self.group_size)]
+        self._text = None
+
+    def _push_head(self, digit):
+        if self._head and not len(self._head) % self.group_size:
+            self._head_text.append(' ')
+        self._head.append(digit)
+        self._head_text.append(digit)
+        self.gap_moves += 1
+        self._text = None
+
+    def _pop_head(self):
+        digit = self._head.pop()
+        self._head_text.pop()
+        if self._head and not len(self._head) % self.group_size:
+            self._head_text.pop()
+        self.gap_moves += 1
+        self._text = None
+        return digit
+
+    def _push_tail(self, digit):
+        """Put a digit in front of the tail"""
+        texts = self._tail_texts
+        # Each rendering takes the next alignment's, plus the new digit; the one for a head
+        # a digit short of a full group also gets the separator after the new digit
+        last = texts[0]
+        if self._tail:
+            last.append(' ')
+        self._tail_texts = texts[1:] + [last]
+        for text in self._tail_texts:
+            text.append(digit)
+        self._tail.append(digit)
+        self.gap_moves += 1
+        self._text = None
+
+    def _pop_tail(self):
+        """Take the digit in front of the tail"""
+        digit = self._tail.pop()
+        for text in self._tail_texts:
+            text.pop()
+        last = self._tail_texts[-1]
+        if self._tail:
+            last.pop()
+        self._tail_texts = [last] + self._tail_texts[:-1]
+        self.gap_moves += 1
+        self._text = None
+        return digit
+
+    def _display_index(self, digit_index):
+        """Index in the text where the digit at digit_index starts"""
+        return digit_index + digit_index // self.group_size
+
+
+class IncrementalExpiryFormatter(IncrementalCardFormatter):
+    """As-you-type MM/YY formatter matching ``MockPaymentScreen.format_expiration``"""
+
+    @property
+    def text(self):
+        if self._text is None:
+            # Only the first four digits are ever shown, so this is constant time
+            shown = self._head[:4]
+            if len(shown) < 4:
+                shown += self._tail[:-(5 - len(shown)):-1]
+            if len(shown) >= 2:
+                self._text = f"{shown[0]}{shown[1]}/{''.join(shown[2:])}"
+            else:
+                self._text = ''.join(shown)
+        return self._text
+
+    def _push_head(self, digit):
+        self._head.append(digit)
+        self.gap_moves += 1
+        self._text = None
+
+    def _pop_head(self):
+        self.gap_moves += 1
+        self._text = None
+        return self._head.pop()
+
+    def _push_tail(self, digit):
+        self._tail.append(digit)
+        self.gap_moves += 1
+        self._text = None
+
+    def _pop_tail(self):
+        self.gap_moves += 1
+        self._text = None
+        return self._tail.pop()
+
+    def _display_index(self, digit_index):
+        return digit_index + (1 if digit_index >= 2 else 0)
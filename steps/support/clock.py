@@ -0,0 +1,55 @@
+"""
+Clocks for the mock components.
+
+Every mock that depends on time takes a ``clock`` argument. ``SystemClock``
+reads the real time; ``VirtualClock`` only moves when a step advances it, so
+expiry, TTL and timeout behaviour can be exercised instantly and
+deterministically.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """Real wall-clock and monotonic time"""
+
+    def now(self):
+        return datetime.now()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock:
+    """Simulated time that only advances when told to"""
+
+    def __init__(self, start=None):
+        self._start = start or datetime(2025, 1, 1)
+        self._elapsed = 0.0
+
+    def now(self):
+        return self._start + timedelta(seconds=self._elapsed)
+
+    def monotonic(self):
+        return self._elapsed
+
+    def sleep(self, seconds):
+        """Waiting on a virtual clock just moves it forward"""
+        self.advance(seconds)
+
+    def advance(self, seconds):
+        if isinstance(seconds, timedelta):
+            seconds = seconds.total_seconds()
+        if seconds < 0:
+            raise ValueError("A clock cannot go backwards")
+        self._elapsed += seconds
+        return self.now()
+
+
+def timestamp(moment):
+    """Format a datetime like JavaScript's Date.toISOString()"""
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
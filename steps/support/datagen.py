@@ -0,0 +1,246 @@
+"""
+Seeded synthetic datasets for benchmarks and local stand-ins.
+
+``generate_dataset`` writes users per role, hotels per owner, room types,
+rooms per floor, payments, smoke sensors and providers for a given ``scale``,
+from 10 to 10M payments. The same ``(scale, seed)`` always yields the same
+bytes. Rows reference each other consistently: every hotel belongs to an
+owner, every room to a room type of its own hotel, and every payment to a
+guest or to the paying hotel's owner.
+
+Tables are generated in fixed-size chunks, each from its own RNG stream, and
+streamed to disk column by column as ``<table>/<column>.npy``. A
+``manifest.json`` written last records the row counts and dtypes. Each column
+can be loaded (or memory-mapped) on its own with ``numpy.load``. The payments
+columns match ``support.incomes.PaymentLedger``.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+CHUNK_ROWS = 1 << 18
+ROLES = {'owner': 1, 'guest': 2, 'admin': 3}
+ROOMS_PER_FLOOR = 10
+ROOM_TYPES = (b'SIMPLE', b'DOUBLE', b'SUITE', b'FAMILY')
+CRITICAL_TEMPERATURE = 57.0
+PAYMENTS_START = '2025-01-01'
+PAYMENTS_DAYS = 365
+
+_HOTEL_PREFIXES = np.array([b'Grand', b'Royal', b'Sunset', b'Golden', b'Silver', b'Ocean', b'Andean', b'Imperial'])
+_HOTEL_NAMES = np.array([b'Plaza', b'Palace', b'Bay', b'Garden', b'Tower', b'Inn', b'Resort', b'Suites'])
+_CITIES = np.array([b'Lima', b'Cusco', b'Arequipa', b'Trujillo', b'Piura', b'Iquitos', b'Puno', b'Tacna'])
+_SUPPLIES = np.array([b'Linen', b'Cleaning', b'Food', b'Laundry', b'Minibar', b'Maintenance'])
+
+SCHEMA = {
+    'users': {'id': 'i8', 'role_id': 'i1', 'username': 'S24', 'email': 'S48'},
+    'hotels': {'id': 'i8', 'owner_id': 'i8', 'name': 'S40', 'city': 'S16', 'stars': 'i1'},
+    'room_types': {'id': 'i8', 'hotel_id': 'i8', 'description': 'S16', 'price_cents': 'i8'},
+    'rooms': {'id': 'i8', 'hotel_id': 'i8', 'type_room_id': 'i8', 'floor': 'i2', 'number': 'i4'},
+    'payments': {'id': 'i8', 'hotel_id': 'i4', 'source': 'i1', 'payer_id': 'i8',
+                 'amount_cents': 'i8', 'paid_at': 'M8[s]'},
+    'sensors': {'id': 'i8', 'room_id': 'i8', 'hotel_id': 'i8', 'threshold_temperature': 'f4'},
+    'providers': {'id': 'i8', 'hotel_id': 'i8', 'name': 'S40', 'email': 'S48', 'phone': 'S12'},
+}
+
+
+def table_sizes(scale):
+    """Row counts for a dataset with ``scale`` payments, plus the user split"""
+    if scale < 1:
+        raise ValueError("scale must be at least 1")
+    hotels = max(1, scale // 2000)
+    owners = max(1, (hotels + 1) // 2)
+    guests = max(1, scale // 10)
+    rooms = max(hotels * ROOMS_PER_FLOOR, scale // 20)
+    return {
+        'owners': owners,
+        'admins': hotels,
+        'guests': guests,
+        'users': owners + hotels + guests,
+        'hotels': hotels,
+        'room_types': hotels * len(ROOM_TYPES),
+        'rooms': rooms,
+        'payments': scale,
+        'sensors': rooms,
+        'providers': hotels * 5,
+    }
+
+
+def _ids(start, stop):
+    return np.arange(start + 1, stop + 1, dtype=np.int64)
+
+
+def _labels(prefix, numbers):
+    return np.char.add(prefix, numbers.astype('S20'))
+
+
+def _spread(index, groups, total):
+    """Assign ``total`` rows to ``groups`` contiguous blocks; return group and position"""
+    group = index * groups // total
+    first = -(-group * total // groups)
+    return group, index - first
+
+
+def _users(sizes, rng, start, stop):
+    ids = _ids(start, stop)
+    owners, admins = sizes['owners'], sizes['admins']
+    role_id = np.where(ids <= owners, ROLES['owner'],
+                       np.where(ids <= owners + admins, ROLES['admin'], ROLES['guest']))
+    prefix = np.array([b'', b'owner', b'guest', b'admin'])[role_id]
+    username = np.char.add(prefix, ids.astype('S20'))
+    return {'id': ids, 'role_id': role_id, 'username': username,
+            'email': np.char.add(username, b'@sweetmanager.com')}
+
+
+def _hotels(sizes, rng, start, stop):
+    ids = _ids(start, stop)
+    count = len(ids)
+    name = np.char.add(np.char.add(_HOTEL_PREFIXES[rng.integers(0, len(_HOTEL_PREFIXES), count)], b' '),
+                       np.char.add(_HOTEL_NAMES[rng.integers(0, len(_HOTEL_NAMES), count)], b' Hotel'))
+    return {'id': ids, 'owner_id': (ids - 1) % sizes['owners'] + 1, 'name': name,
+            'city': _CITIES[rng.integers(0, len(_CITIES), count)], 'stars': rng.integers(1, 6, count)}
+
+
+def _room_types(sizes, rng, start, stop):
+    ids = _ids(start, stop)
+    kind = (ids - 1) % len(ROOM_TYPES)
+    base = np.array([8000, 12000, 25000, 18000])[kind]
+    return {'id': ids, 'hotel_id': (ids - 1) // len(ROOM_TYPES) + 1,
+            'description': np.array(ROOM_TYPES)[kind],
+            'price_cents': base + rng.integers(0, 50, len(ids)) * 100}
+
+
+def _rooms(sizes, rng, start, stop):
+    ids = _ids(start, stop)
+    hotel, position = _spread(ids - 1, sizes['hotels'], sizes['rooms'])
+    floor = position // ROOMS_PER_FLOOR + 1
+    return {'id': ids, 'hotel_id': hotel + 1,
+            'type_room_id': hotel * len(ROOM_TYPES) + position % len(ROOM_TYPES) + 1,
+            'floor': floor, 'number': floor * 100 + position % ROOMS_PER_FLOOR + 1}
+
+
+def _payments(sizes, rng, start, stop):
+    ids = _ids(start, stop)
+    count = len(ids)
+    hotel_id = rng.integers(1, sizes['hotels'] + 1, count)
+    source = (rng.random(count) < 0.25).astype(np.int8)
+    # Guests pay for stays; owners pay smaller subscription and service fees
+    guest_id = sizes['owners'] + sizes['admins'] + rng.integers(1, sizes['guests'] + 1, count)
+    dollars = np.where(source == 1, rng.lognormal(3.5, 0.6, count), rng.lognormal(5.0, 0.7, count))
+    seconds = rng.integers(0, PAYMENTS_DAYS * 86400, count)
+    return {'id': ids, 'hotel_id': hotel_id, 'source': source,
+            'payer_id': np.where(source == 1, (hotel_id - 1) % sizes['owners'] + 1, guest_id),
+            'amount_cents': np.maximum(np.rint(dollars * 100), 1),
+            'paid_at': np.datetime64(PAYMENTS_START, 's') + seconds.astype('timedelta64[s]')}
+
+
+def _sensors(sizes, rng, start, stop):
+    ids = _ids(start, stop)
+    hotel, _ = _spread(ids - 1, sizes['hotels'], sizes['rooms'])
+    return {'id': ids, 'room_id': ids, 'hotel_id': hotel + 1,
+            'threshold_temperature': np.full(len(ids), CRITICAL_TEMPERATURE)}
+
+
+def _providers(sizes, rng, start, stop):
+    ids = _ids(start, stop)
+    name = np.char.add(_SUPPLIES[rng.integers(0, len(_SUPPLIES), len(ids))], b' Supplies ')
+    return {'id': ids, 'hotel_id': (ids - 1) // 5 + 1, 'name': np.char.add(name, ids.astype('S20')),
+            'email': np.char.add(_labels(b'provider', ids), b'@suppliers.pe'),
+            'phone': np.char.add(b'9', rng.integers(10 ** 7, 10 ** 8, len(ids)).astype('S8'))}
+
+
+_BUILDERS = {
+    'users': _users,
+    'hotels': _hotels,
+    'room_types': _room_types,
+    'rooms': _rooms,
+    'payments': _payments,
+    'sensors': _sensors,
+    'providers': _providers,
+}
+
+
+def iter_table(table, scale, seed=0):
+    """Yield ``table`` chunk by chunk as dicts of column arrays"""
+    sizes = table_sizes(scale)
+    build = _BUILDERS[table]
+    table_number = list(SCHEMA).index(table)
+    for chunk, start in enumerate(range(0, sizes[table], CHUNK_ROWS)):
+        # One RNG stream per chunk keeps the output independent of how it is consumed
+        rng = np.random.default_rng([seed, table_number, chunk])
+        columns = build(sizes, rng, start, min(start + CHUNK_ROWS, sizes[table]))
+        yield {name: np.asarray(columns[name]).astype(dtype, copy=False)
+               for name, dtype in SCHEMA[table].items()}
+
+
+def build_table(table, scale, seed=0):
+    """Whole ``table`` in memory as a dict of column arrays"""
+    chunks = list(iter_table(table, scale, seed))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in SCHEMA[table]}
+
+
+def _write_table(directory, table, rows, chunks):
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    try:
+        for name, dtype in SCHEMA[table].items():
+            files[name] = open(os.path.join(directory, f"{name}.npy"), 'wb')
+            np.lib.format.write_array_header_1_0(files[name], {
+                'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                'fortran_order': False,
+                'shape': (rows,),
+            })
+        for chunk in chunks:
+            for name, column in chunk.items():
+                files[name].write(column.tobytes())
+    finally:
+        for handle in files.values():
+            handle.close()
+
+
+def generate_dataset(path, scale, seed=0, tables=None):
+    """Stream a dataset to ``path`` and return its manifest"""
+    sizes = table_sizes(scale)
+    tables = list(tables or SCHEMA)
+    manifest_path = os.path.join(path, 'manifest.json')
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    started = time.perf_counter()
+    for table in tables:
+        _write_table(os.path.join(path, table), table, sizes[table], iter_table(table, scale, seed))
+    manifest = {
+        'format': FORMAT_VERSION,
+        'scale': scale,
+        'seed': seed,
+        'chunk_rows': CHUNK_ROWS,
+        'tables': {
+            table: {'rows': sizes[table], 'columns': SCHEMA[table]} for table in tables
+        },
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    # Written last, so a dataset with a manifest is always complete
+    with open(manifest_path, 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Sweet Manager dataset")
+    parser.add_argument('path')
+    parser.add_argument('--scale', type=int, default=100_000, help="number of payments")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--table', action='append', choices=list(SCHEMA), help="only these tables")
+    args = parser.parse_args(argv)
+    manifest = generate_dataset(args.path, args.scale, args.seed, args.table)
+    for table, info in manifest['tables'].items():
+        print(f"{table:<12} {info['rows']:>12,} rows")
+    print(f"Written to {args.path} in {manifest['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""
+Differential testing of the local backend stub against the live API.
+
+``record_stream`` runs the authentication, hotels and rooms scenarios
+against a ``BackendStub`` and records every request their steps send, with
+the answer the stub gave, grouped by scenario. Step modules are loaded into
+an empty step registry and run without behave's runner, so the rest of the
+suite is left out. ``DifferentialRunner`` then replays the scenarios,
+repeated as often as asked, against the stub and the live backend. Scenarios
+run in parallel, but each one sends its requests in the recorded order, and
+ids and tokens the recorder issued are swapped for the ones each backend
+issued earlier in the same replay. It compares each pair of responses by
+status code and by body shape. Volatile fields (ids, timestamps, tokens) are
+normalized first, so only structural differences count as mismatches.
+
+Run it from ``steps/``::
+
+    python -m support.differential --repeat 50 --workers 32 --budget 300
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+import types
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from behave import parser, step_registry
+from behave.runner_util import exec_file
+
+from support.backend_stub import start_backend_stub
+from support.resilience import DEFAULT_TIMEOUT
+
+
+LIVE_BASE_URL = "https://sweetmanager-backend-emergents.onrender.com/api/v1"
+SCENARIO_SETS = ('authentication', 'hotels', 'rooms')
+
+STEPS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURES_DIR = os.path.join(os.path.dirname(STEPS_DIR), 'features')
+
+Exchange = namedtuple('Exchange', 'method path params json headers recorded')
+Observation = namedtuple('Observation', 'status shape seconds')
+Mismatch = namedtuple('Mismatch', 'exchange kind stub live')
+
+_VOLATILE_KEY = re.compile(r'(^id$|Id$|_id$|^(created|updated)At$|token$)', re.IGNORECASE)
+_TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}')
+_JWT = re.compile(r'^[\w-]+\.[\w-]+\.[\w-]+$')
+# Fields whose values a backend issues and later requests send back
+_ISSUED_KEY = re.compile(r'(^id$|Id$|_id$|token$)', re.IGNORECASE)
+_PATH_PART = re.compile(r'[^/?&=]+')
+
+
+def normalize(value):
+    """Replace ids, timestamps and tokens with placeholders"""
+    if isinstance(value, dict):
+        return {
+            key: '<volatile>' if _VOLATILE_KEY.search(key) and not isinstance(item, (dict, list))
+            else normalize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [normalize(item) for item in value]
+    if isinstance(value, str):
+        if _TIMESTAMP.match(value):
+            return '<timestamp>'
+        if _JWT.match(value):
+            return '<token>'
+    return value
+
+
+def shape(value):
+    """Structure of a JSON value with the values themselves left out"""
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        # Item order depends on backend state, so only the distinct shapes count
+        shapes = {repr(item_shape): item_shape for item_shape in map(shape, value)}
+        return [shapes[key] for key in sorted(shapes)]
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    return 'null'
+
+
+def compatible(stub_shape, live_shape):
+    """Whether two shapes agree; a list agrees with one holding at least its item shapes"""
+    if isinstance(stub_shape, list) and isinstance(live_shape, list):
+        # Scenarios replay concurrently, so one backend may already list an item the other has yet
+        # to create; only an item shape that has no counterpart on the other side is a difference
+        fewer, more = sorted((stub_shape, live_shape), key=len)
+        return all(any(compatible(item, other) for other in more) for item in fewer)
+    if isinstance(stub_shape, dict) and isinstance(live_shape, dict):
+        return stub_shape.keys() == live_shape.keys() and all(
+            compatible(stub_shape[key], live_shape[key]) for key in stub_shape
+        )
+    return stub_shape == live_shape
+
+
+def response_shape(response):
+    try:
+        return shape(normalize(response.json()))
+    except ValueError:
+        content_type = response.headers.get('Content-Type', 'text').split(';')[0]
+        return f"<{content_type}>" if response.content else '<empty>'
+
+
+def response_body(response):
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def issued_values(recorded, replayed, issued=None):
+    """Map each id or token in a recorded answer to the one in the replayed answer"""
+    issued = {} if issued is None else issued
+    if isinstance(recorded, dict) and isinstance(replayed, dict):
+        for key in recorded.keys() & replayed.keys():
+            old, new = recorded[key], replayed[key]
+            if _ISSUED_KEY.search(key) and not isinstance(old, (dict, list, type(None))):
+                if not isinstance(new, (dict, list)) and new is not None:
+                    issued[str(old)] = new
+            else:
+                issued_values(old, new, issued)
+    elif isinstance(recorded, list) and isinstance(replayed, list):
+        for old, new in zip(recorded, replayed):
+            issued_values(old, new, issued)
+    return issued
+
+
+def remap(exchange, issued):
+    """The exchange with recorder-issued ids and tokens swapped for ``issued`` ones"""
+    if not issued:
+        return exchange
+
+    def value(old):
+        return issued.get(str(old), old) if not isinstance(old, (dict, list)) else old
+
+    def fields(data):
+        if isinstance(data, dict):
+            return {key: value(item) if _ISSUED_KEY.search(key) else fields(item)
+                    for key, item in data.items()}
+        if isinstance(data, list):
+            return [fields(item) for item in data]
+        return data
+
+    def header(text):
+        for old, new in issued.items():
+            if _JWT.match(old) and old in text:
+                text = text.replace(old, str(new))
+        return text
+
+    return exchange._replace(
+        path=_PATH_PART.sub(lambda part: str(issued.get(part.group(), part.group())), exchange.path),
+        params=fields(exchange.params),
+        json=fields(exchange.json),
+        headers={key: header(text) for key, text in (exchange.headers or {}).items()} or exchange.headers,
+    )
+
+
+def _run_scenario(scenario):
+    """Run a scenario's steps on a bare context until one is missing or fails"""
+    context = types.SimpleNamespace()
+    for step in scenario.all_steps:
+        match = step_registry.registry.find_match(step)
+        if match is None:
+            return 'undefined'
+        args, kwargs = [], {}
+        for argument in match.arguments:
+            if argument.name is not None:
+                kwargs[argument.name] = argument.value
+            else:
+                args.append(argument.value)
+        try:
+            match.func(context, *args, **kwargs)
+        except Exception:
+            return 'failed'
+    return 'passed'
+
+
+def record_stream(stub_url, scenario_sets=SCENARIO_SETS, live_url=LIVE_BASE_URL):
+    """Requests each scenario sends, captured in order while running it against the stub"""
+    scenarios = []
+    outcomes = Counter()
+    send = requests.Session.request
+
+    # Patched on Session so both plain requests calls and support.resilience.http are seen
+    def recording(session, method, url, **kwargs):
+        if not url.startswith(live_url):
+            return send(session, method, url, **kwargs)
+        path = url[len(live_url):]
+        response = send(session, method, stub_url + path, **kwargs)
+        scenarios[-1].append(Exchange(method.upper(), path, kwargs.get('params'), kwargs.get('json'),
+                                      kwargs.get('headers'), response_body(response)))
+        return response
+
+    registry = step_registry.registry
+    saved = registry.steps
+    registry.steps = {step_type: [] for step_type in saved}
+    requests.Session.request = recording
+    try:
+        for name in scenario_sets:
+            exec_file(os.path.join(STEPS_DIR, f"{name}_steps.py"))
+        for name in scenario_sets:
+            feature = parser.parse_file(os.path.join(FEATURES_DIR, f"{name}.feature"))
+            for scenario in feature.walk_scenarios():
+                scenarios.append([])
+                outcomes[_run_scenario(scenario)] += 1
+    finally:
+        requests.Session.request = send
+        registry.steps = saved
+    return [exchanges for exchanges in scenarios if exchanges], outcomes
+
+
+class DifferentialRunner:
+    """Replay recorded scenarios against two backends and compare the answers"""
+
+    def __init__(self, stub_url, live_url=LIVE_BASE_URL, workers=32, timeout=DEFAULT_TIMEOUT):
+        self.targets = {'stub': stub_url, 'live': live_url}
+        self.workers = workers
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def run(self, scenarios, repeat=1, budget=None):
+        """Compare every scenario ``repeat`` times; stop sending after ``budget`` seconds"""
+        started = time.perf_counter()
+        deadline = started + budget if budget else None
+        mismatches = []
+        compared = skipped = 0
+        # Peers send each exchange to the live API while the scenario's own thread sends it to the stub
+        with ThreadPoolExecutor(self.workers) as pool, ThreadPoolExecutor(self.workers) as peers:
+            pending = [
+                pool.submit(self._replay, exchanges, deadline, peers)
+                for _ in range(repeat) for exchanges in scenarios
+            ]
+            for future in pending:
+                for exchange, stub, live in future.result():
+                    if stub is None or live is None:
+                        skipped += 1
+                        continue
+                    compared += 1
+                    if stub.status != live.status:
+                        mismatches.append(Mismatch(exchange, 'status', stub, live))
+                    elif not compatible(stub.shape, live.shape):
+                        mismatches.append(Mismatch(exchange, 'shape', stub, live))
+        elapsed = time.perf_counter() - started
+        return {
+            'compared': compared,
+            'skipped': skipped,
+            'requests': compared * 2,
+            'elapsed': elapsed,
+            'per_minute': compared * 2 * 60 / elapsed if elapsed else 0.0,
+            'mismatches': mismatches,
+        }
+
+    def _session(self, target):
+        sessions = getattr(self._local, 'sessions', None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        if target not in sessions:
+            sessions[target] = requests.Session()
+        return sessions[target]
+
+    def _replay(self, exchanges, deadline, peers):
+        """Send one scenario's exchanges in order, each to both backends at once"""
+        issued = {target: {} for target in self.targets}
+        results = []
+        for exchange in exchanges:
+            live_future = peers.submit(self._send, 'live', remap(exchange, issued['live']), deadline)
+            stub, stub_body = self._send('stub', remap(exchange, issued['stub']), deadline)
+            live, live_body = live_future.result()
+            issued_values(exchange.recorded, stub_body, issued['stub'])
+            issued_values(exchange.recorded, live_body, issued['live'])
+            results.append((exchange, stub, live))
+        return results
+
+    def _send(self, target, exchange, deadline):
+        if deadline is not None and time.perf_counter() > deadline:
+            return None, None
+        started = time.perf_counter()
+        try:
+            response = self._session(target).request(
+                exchange.method, self.targets[target] + exchange.path, params=exchange.params,
+                json=exchange.json, headers=exchange.headers, timeout=self.timeout,
+            )
+        except requests.RequestException as error:
+            return Observation(None, f"<{type(error).__name__}>", time.perf_counter() - started), None
+        seconds = time.perf_counter() - started
+        return Observation(response.status_code, response_shape(response), seconds), response_body(response)
+
+
+def format_report(report):
+    lines = [
+        f"{report['compared']} exchanges compared ({report['requests']} requests, "
+        f"{report['per_minute']:.0f}/min) in {report['elapsed']:.1f}s, {report['skipped']} skipped"
+    ]
+    grouped = {}
+    for mismatch in report['mismatches']:
+        key = (mismatch.exchange.method, mismatch.exchange.path, mismatch.kind)
+        grouped.setdefault(key, []).append(mismatch)
+    for (method, path, kind), found in sorted(grouped.items(), key=lambda item: -len(item[1])):
+        first = found[0]
+        if kind == 'status':
+            detail = f"stub {first.stub.status} vs live {first.live.status}"
+        else:
+            detail = f"stub {first.stub.shape} vs live {first.live.shape}"
+        lines.append(f"  {len(found):>5}x {kind:<6} {method} {path}: {detail}")
+    if not grouped:
+        lines.append("  no mismatches")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description="Compare the local backend stub with the live API")
+    arguments.add_argument('--live', default=os.environ.get('SWEET_MANAGER_LIVE_URL', LIVE_BASE_URL))
+    arguments.add_argument('--repeat', type=int, default=1, help="times to replay every scenario")
+    arguments.add_argument('--workers', type=int, default=32)
+    arguments.add_argument('--budget', type=float, help="stop sending after this many seconds")
+    args = arguments.parse_args(argv)
+
+    recorder, recorder_url = start_backend_stub()
+    try:
+        scenarios, outcomes = record_stream(recorder_url)
+    finally:
+        recorder.shutdown()
+    print(f"Recorded {sum(map(len, scenarios))} requests from {sum(outcomes.values())} scenarios "
+          f"({', '.join(f'{count} {outcome}' for outcome, count in sorted(outcomes.items()))})")
+
+    # Replay against a fresh stub so it sees exactly the stream the live API sees
+    server, stub_url = start_backend_stub()
+    try:
+        runner = DifferentialRunner(stub_url, args.live, args.workers)
+        report = runner.run(scenarios, args.repeat, args.budget)
+    finally:
+        server.shutdown()
+    print(format_report(report))
+    return 1 if report['mismatches'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Memory-mapped access to ``support.datagen`` datasets.
+
+``FixtureStore`` opens a dataset directory and hands out ``FixtureTable``
+objects. A table maps column names to read-only ``numpy.memmap`` views, opened
+on first use. ``row`` and ``rows`` decode single rows into plain Python values
+on demand, so nothing is deserialized up front. Every process mapping the same
+files shares one copy of the data through the page cache, which makes the
+store safe and cheap for parallel workers.
+
+``ensure_dataset`` generates a dataset once into a temporary directory and
+renames it into place. Workers racing to create the same dataset end up
+sharing whichever copy landed first.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping
+from functools import lru_cache
+
+import numpy as np
+
+from support.datagen import FORMAT_VERSION, generate_dataset
+
+
+FIXTURES_ENV = 'SWEET_MANAGER_FIXTURES'
+
+
+class FixtureError(Exception):
+    """The dataset is missing, incomplete or of another format"""
+
+
+def _python(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, np.datetime64):
+        return str(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class FixtureTable(Mapping):
+    """Lazily mapped columns of one table"""
+
+    def __init__(self, directory, name, info):
+        self.directory = directory
+        self.name = name
+        self.rows = info['rows']
+        self.dtypes = info['columns']
+        self._columns = {}
+
+    def __getitem__(self, column):
+        if column not in self.dtypes:
+            raise KeyError(column)
+        if column not in self._columns:
+            self._columns[column] = np.load(
+                os.path.join(self.directory, f"{column}.npy"), mmap_mode='r'
+            )
+        return self._columns[column]
+
+    def __iter__(self):
+        return iter(self.dtypes)
+
+    def __len__(self):
+        return len(self.dtypes)
+
+    def row(self, index):
+        """One row as a dict of Python values"""
+        if not -self.rows <= index < self.rows:
+            raise IndexError(f"{self.name} has {self.rows} rows")
+        return {column: _python(self[column][index]) for column in self.dtypes}
+
+    def rows_between(self, start, stop):
+        """Rows ``start`` to ``stop`` as dicts, reading only that slice"""
+        columns = {column: self[column][start:stop] for column in self.dtypes}
+        return [
+            {column: _python(values[offset]) for column, values in columns.items()}
+            for offset in range(len(columns['id']))
+        ]
+
+    def by_id(self, row_id):
+        """Row with the given ``id``; ids are dense and start at 1"""
+        return self.row(row_id - 1) if 0 < row_id <= self.rows else None
+
+    def __repr__(self):
+        return f"FixtureTable({self.name!r}, rows={self.rows})"
+
+
+class FixtureStore:
+    """Read-only view over a generated dataset directory"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as handle:
+                self.manifest = json.load(handle)
+        except FileNotFoundError:
+            raise FixtureError(f"No complete dataset at {path}")
+        if self.manifest.get('format') != FORMAT_VERSION:
+            raise FixtureError(f"Dataset at {path} has format {self.manifest.get('format')}")
+        self._tables = {}
+
+    @property
+    def scale(self):
+        return self.manifest['scale']
+
+    @property
+    def seed(self):
+        return self.manifest['seed']
+
+    def tables(self):
+        return list(self.manifest['tables'])
+
+    def table(self, name):
+        if name not in self._tables:
+            try:
+                info = self.manifest['tables'][name]
+            except KeyError:
+                raise FixtureError(f"Dataset at {self.path} has no {name!r} table")
+            self._tables[name] = FixtureTable(os.path.join(self.path, name), name, info)
+        return self._tables[name]
+
+
+def dataset_path(scale, seed=0, root=None):
+    root = root or os.environ.get(FIXTURES_ENV) or os.path.join(tempfile.gettempdir(), 'sweet-manager-fixtures')
+    return os.path.join(root, f"v{FORMAT_VERSION}-scale{scale}-seed{seed}")
+
+
+def ensure_dataset(scale, seed=0, root=None):
+    """Path of the dataset for ``(scale, seed)``, generating it if needed"""
+    path = dataset_path(scale, seed, root)
+    if os.path.exists(os.path.join(path, 'manifest.json')):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=os.path.dirname(path))
+    try:
+        generate_dataset(staging, scale, seed)
+        try:
+            os.rename(staging, path)
+        except OSError:
+            # Another worker published the same dataset first
+            if not os.path.exists(os.path.join(path, 'manifest.json')):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return path
+
+
+@lru_cache(maxsize=None)
+def fixture_store(scale, seed=0):
+    """Shared FixtureStore for ``(scale, seed)``, generated on first use"""
+    return FixtureStore(ensure_dataset(scale, seed))
@@ -0,0 +1,120 @@
+"""
+Lazily built step fixtures with declared scopes.
+
+Step modules declare each piece of shared state once, with the factory that
+builds it and the scope it lives in: ``step``, ``scenario``, ``feature`` or
+``run``. ``fixtures.get(context, name)`` builds a fixture the first time a
+step asks for it, so a scenario that never touches the mobile app never
+builds a ``MobileAppContext``. The value is stored in the behave context
+layer that matches its scope, so later steps keep reading it as
+``context.<name>``. Behave drops that layer when the scope ends.
+
+Components of a fixture are declared with dotted names
+(``mobile_ctx.providers_view``). They are built on first use and stored on
+the parent object, which stays the single owner of the component. A step
+can still replace a component by assigning it directly.
+
+The environment hooks call ``fixtures.release(scope)`` at the end of every
+step, scenario, feature and run. Release calls each fixture's teardown in
+reverse build order and drops the registry's references, so objects from one
+scenario never reach the next and memory stays flat on long runs.
+"""
+
+from collections import Counter, namedtuple
+
+
+SCOPES = ('step', 'scenario', 'feature', 'run')
+# Behave's context layer each scope lives in; steps have no layer of their own
+_LAYERS = {'step': 'scenario', 'scenario': 'scenario', 'feature': 'feature', 'run': 'testrun'}
+
+Fixture = namedtuple('Fixture', 'name factory scope teardown')
+
+
+class FixtureRegistry:
+    """Declared fixtures, built on first use and torn down with their scope"""
+
+    def __init__(self):
+        self.definitions = {}
+        self.built = Counter()
+        self.torn_down = Counter()
+        self._live = {scope: [] for scope in SCOPES}
+
+    def define(self, name, factory, scope='scenario', teardown=None):
+        """Declare ``factory(context)`` as the builder of ``name``"""
+        parent = name.partition('.')[0]
+        if '.' in name:
+            if parent not in self.definitions:
+                raise KeyError(f"Component {name!r} declared before its fixture {parent!r}")
+            scope = self.definitions[parent].scope
+        elif scope not in SCOPES:
+            raise ValueError(f"Unknown fixture scope {scope!r}; expected one of {', '.join(SCOPES)}")
+        self.definitions[name] = Fixture(name, factory, scope, teardown)
+
+    def fixture(self, name, scope='scenario', teardown=None):
+        """Decorator form of ``define``"""
+        def register(factory):
+            self.define(name, factory, scope, teardown)
+            return factory
+        return register
+
+    def get(self, context, name):
+        """The fixture's current value, built now if this scope has none yet"""
+        definition = self.definitions[name]
+        parent_name, _, attribute = name.partition('.')
+        if attribute:
+            parent = self.get(context, parent_name)
+            value = getattr(parent, attribute, None)
+            if value is None:
+                value = definition.factory(context)
+                setattr(parent, attribute, value)
+                self.built[name] += 1
+            return value
+
+        layer = _layer(context, definition.scope)
+        if name in layer:
+            value = layer[name]
+        else:
+            value = layer[name] = definition.factory(context)
+            self.built[name] += 1
+        self._track(definition, value)
+        return value
+
+    def provide(self, context, name, value):
+        """Install a value built elsewhere, such as a restored snapshot"""
+        definition = self.definitions[name]
+        _layer(context, definition.scope)[name] = value
+        self._track(definition, value)
+
+    def release(self, scope, context=None):
+        """Tear down the fixtures of a scope that has ended, newest first"""
+        live, self._live[scope] = self._live[scope], []
+        for definition, value in reversed(live):
+            if context is not None and scope == 'step':
+                _layer(context, scope).pop(definition.name, None)
+            if definition.teardown is not None:
+                definition.teardown(value)
+            self.torn_down[definition.name] += 1
+
+    def live(self):
+        return sum(len(values) for values in self._live.values())
+
+    def _track(self, definition, value):
+        live = self._live[definition.scope]
+        if not any(tracked is value for _, tracked in live):
+            live.append((definition, value))
+
+
+def _layer(context, scope):
+    """Attribute dict of the behave context layer a scope stores its fixtures in"""
+    stack = getattr(context, '_stack', None)
+    if stack is None:
+        # Plain objects used as contexts outside behave's runner have no layers
+        return vars(context)
+    name = _LAYERS[scope]
+    for layer in stack:
+        if layer.get('@layer') == name:
+            return layer
+    return stack[0]
+
+
+fixtures = FixtureRegistry()
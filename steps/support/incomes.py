@@ -0,0 +1,146 @@
+"""
+Weekly and monthly income reports over customer and owner payments.
+
+Payments are held column-wise in a ``PaymentLedger`` of NumPy arrays, with
+amounts in integer cents so every total is exact. ``IncomeAggregator`` is the
+reference implementation: a single ``bincount`` over a combined
+(hotel, source, period) key gives every hotel's totals at once.
+``PaymentReportService`` is the local stand-in for the backend's report
+endpoints and deliberately takes a different route to the same numbers: it
+sorts each hotel's payments by time and differences a running sum at the
+period boundaries. The two agreeing on millions of rows is the cross-check.
+``ledger_from_table`` takes the payments table of a ``support.datagen``
+dataset.
+
+Weeks start on Monday and months are calendar months. A report covers every
+period from a hotel's first payment to its last, including empty ones.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from support.local_api import JsonRouteHandler, NotFound, serve
+
+
+CUSTOMER, OWNER = 0, 1
+PERIODS = ('week', 'month')
+
+# Float64 sums of integer cents stay exact below this
+_EXACT_LIMIT = 2 ** 53
+
+PaymentLedger = namedtuple('PaymentLedger', 'hotel_id source amount_cents paid_at')
+
+
+def ledger_from_table(columns):
+    """PaymentLedger over the matching columns of a payments table"""
+    return PaymentLedger(*(columns[field] for field in PaymentLedger._fields))
+
+
+def period_index(paid_at, period):
+    """Integer period number of each timestamp; weeks start on Monday"""
+    if period == 'week':
+        # 1970-01-01 was a Thursday, so shift by three days to land on Mondays
+        days = paid_at.astype('datetime64[D]').astype(np.int64)
+        return (days + 3) // 7
+    if period == 'month':
+        return paid_at.astype('datetime64[M]').astype(np.int64)
+    raise ValueError(f"Unknown period {period!r}")
+
+
+def period_start(index, period):
+    """ISO date of the first day of a period number"""
+    if period == 'week':
+        return str(np.datetime64(int(index) * 7 - 3, 'D'))
+    return str(np.datetime64(int(index), 'M').astype('datetime64[D]'))
+
+
+def income_row(period_index_, period, customer_cents, owner_cents):
+    return {
+        'periodStart': period_start(period_index_, period),
+        'customerIncome': int(customer_cents) / 100,
+        'ownerIncome': int(owner_cents) / 100,
+        'totalIncome': int(customer_cents + owner_cents) / 100,
+    }
+
+
+class IncomeAggregator:
+    """Reference totals per hotel, source and period, computed in one pass"""
+
+    def __init__(self, ledger, period):
+        if int(ledger.amount_cents.sum()) >= _EXACT_LIMIT:
+            raise ValueError("Ledger total too large for exact float64 sums")
+        self.period = period
+        index = period_index(ledger.paid_at, period)
+        self.first = int(index.min())
+        periods = int(index.max()) - self.first + 1
+        hotels = int(ledger.hotel_id.max()) + 1
+        key = (ledger.hotel_id.astype(np.int64) * 2 + ledger.source) * periods + (index - self.first)
+        totals = np.bincount(key, weights=ledger.amount_cents, minlength=hotels * 2 * periods)
+        self.totals = np.rint(totals).astype(np.int64).reshape(hotels, 2, periods)
+
+    def report(self, hotel_id):
+        """Income rows for one hotel, oldest period first"""
+        if not 0 <= hotel_id < len(self.totals):
+            return []
+        customer, owner = self.totals[hotel_id]
+        active = np.flatnonzero(customer + owner)
+        if not len(active):
+            return []
+        return [
+            income_row(self.first + offset, self.period, customer[offset], owner[offset])
+            for offset in range(active[0], active[-1] + 1)
+        ]
+
+
+class PaymentReportService:
+    """Local stand-in for the income report endpoints"""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        order = np.lexsort((ledger.paid_at, ledger.hotel_id))
+        self._hotel_id = ledger.hotel_id[order]
+        self._source = ledger.source[order]
+        self._amount_cents = ledger.amount_cents[order]
+        self._paid_at = ledger.paid_at[order]
+
+    def incomes(self, hotel_id, period):
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period {period!r}")
+        lo, hi = np.searchsorted(self._hotel_id, [hotel_id, hotel_id + 1])
+        if lo == hi:
+            raise NotFound(f"No payments for hotel {hotel_id}")
+        paid_at = self._paid_at[lo:hi]
+        first, last = period_index(paid_at[[0, -1]], period)
+        boundaries = np.array(
+            [period_start(index, period) for index in range(first, last + 2)], dtype='datetime64[s]'
+        )
+        cuts = np.searchsorted(paid_at, boundaries)
+        totals = []
+        for source in (CUSTOMER, OWNER):
+            amounts = np.where(self._source[lo:hi] == source, self._amount_cents[lo:hi], 0)
+            running = np.concatenate(([0], np.cumsum(amounts)))
+            totals.append(np.diff(running[cuts]))
+        return [
+            income_row(first + offset, period, totals[CUSTOMER][offset], totals[OWNER][offset])
+            for offset in range(last - first + 1)
+        ]
+
+
+class PaymentReportHandler(JsonRouteHandler):
+    """JSON routes over a PaymentReportService"""
+
+    def routes(self, method):
+        if method != 'GET':
+            return {}
+        return {
+            'payment/get-weekly-incomes': lambda query, body: (
+                200, self.service.incomes(int(query['hotelId']), 'week')),
+            'payment/get-monthly-incomes': lambda query, body: (
+                200, self.service.incomes(int(query['hotelId']), 'month')),
+        }
+
+
+def start_payment_report_service(service, port=0):
+    """Serve a PaymentReportService on localhost; return (server, base url)"""
+    return serve(PaymentReportHandler, service, port)
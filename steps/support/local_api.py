@@ -0,0 +1,109 @@
+"""
+Plumbing for the local stand-ins of backend endpoints.
+
+``JsonRouteHandler`` maps ``/api/v1/<prefix>/<route>`` onto methods of an
+in-memory service and speaks JSON over keep-alive HTTP/1.1. Routes may hold
+``{name}`` path segments, which are passed on with the query parameters.
+``serve`` binds a handler subclass to a service instance and runs it on a
+localhost port, so step modules exercise the stand-in with ``requests``
+exactly as they would the real API.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class NotFound(Exception):
+    """The requested resource does not exist; answered with a 404"""
+
+
+class JsonRouteHandler(BaseHTTPRequestHandler):
+    """Dispatch JSON requests to ``routes(method)`` under ``prefix``"""
+
+    prefix = '/api/v1'
+    service = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def routes(self, method):
+        """Map of route name to ``callable(query, body) -> (status, payload)``"""
+        return {}
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method):
+        # Always drain the body so the keep-alive connection stays in sync
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        url = urlparse(self.path)
+        route, query = None, {}
+        if url.path.startswith(self.prefix + '/'):
+            route, query = _match(self.routes(method), url.path[len(self.prefix) + 1:])
+        if route is None:
+            return self.reply(404, {'message': 'Not found'})
+        query.update((key, values[0]) for key, values in parse_qs(url.query).items())
+        try:
+            body = json.loads(raw) if raw else {}
+            status, payload = route(query, body)
+        except NotFound as error:
+            status, payload = 404, {'message': str(error)}
+        except (KeyError, ValueError) as error:
+            status, payload = 400, {'message': f"Invalid request: {error}"}
+        except Exception as error:
+            # Answer instead of dropping the connection, so the client sees why
+            status, payload = 500, {'message': f"{type(error).__name__}: {error}"}
+        self.reply(status, payload)
+
+    def reply(self, status, payload):
+        raw = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+def _match(routes, path):
+    """Route for ``path`` and the values of its ``{name}`` segments"""
+    if path in routes:
+        return routes[path], {}
+    segments = path.split('/')
+    for template, route in routes.items():
+        parts = template.split('/')
+        if '{' not in template or len(parts) != len(segments):
+            continue
+        values = {}
+        for part, segment in zip(parts, segments):
+            if part.startswith('{') and part.endswith('}'):
+                values[part[1:-1]] = segment
+            elif part != segment:
+                break
+        else:
+            return route, values
+    return None, {}
+
+
+def serve(handler, service, port=0):
+    """Serve ``service`` through ``handler`` on localhost; return (server, base url)"""
+    bound = type(f"Bound{handler.__name__}", (handler,), {'service': service})
+    server = ThreadingHTTPServer(('127.0.0.1', port), bound)
+    server.daemon_threads = True
+    server.service = service
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/api/v1"
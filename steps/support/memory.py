@@ -0,0 +1,205 @@
+"""
+Opt-in report of the memory each feature and scenario leaves behind.
+
+``MemoryTracker`` runs the suite under ``tracemalloc`` and takes a snapshot,
+after a full garbage collection, when each feature and scenario starts. The
+next snapshot is taken when the following scenario or feature starts, after
+behave has dropped the finished one's context layer and the fixture registry
+has torn down its fixtures. The difference between the two is what that
+feature or scenario retained. Each piece of growth is charged to the most
+recent frame of its traceback that lies inside the suite, so the report
+points at step code such as the ``json.dumps`` in ``save_conversation`` rather
+than at the encoder internals underneath it. The profiler, the timing ledger
+and this module are left out of the traces.
+
+A leak shows up as growth that repeats, so this mode runs every feature
+``memory_iterations`` times. The first iteration warms up caches and lazy
+imports and is reported but not judged. A scenario that retains more than
+``memory_threshold`` KiB in every later iteration fails the run, and the
+largest allocation sites behind it are listed.
+
+Enable it with ``-D memory`` or ``SWEET_MANAGER_MEMORY=1``. Tune it with
+``-D memory_iterations=3``, ``-D memory_threshold=64`` (KiB),
+``-D memory_top=10`` and ``-D memory_frames=10``.
+"""
+
+import gc
+import linecache
+import os
+import sys
+import tracemalloc
+from collections import Counter, defaultdict, namedtuple
+
+from behave import parser
+
+
+MEMORY_ENV = 'SWEET_MANAGER_MEMORY'
+SUITE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Bookkeeping of the run itself grows by design and would drown the real sites
+_HARNESS = frozenset(
+    [tracemalloc.__file__]
+    + [os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+       for name in ('memory.py', 'profiling.py', 'timings.py')]
+)
+
+Growth = namedtuple('Growth', 'label iteration retained sites')
+MemorySettings = namedtuple('MemorySettings', 'iterations threshold top frames')
+
+
+class MemoryGrowthExceeded(Exception):
+    """A scenario kept retaining memory on every repeat"""
+
+
+def memory_settings(userdata=None):
+    """Settings of the memory mode, or None when it is off"""
+    userdata = userdata or {}
+    value = userdata.get('memory', os.environ.get(MEMORY_ENV))
+    if value is None or value.lower() in ('0', 'false', 'no', 'off'):
+        return None
+    return MemorySettings(
+        iterations=int(userdata.get('memory_iterations', 3)),
+        threshold=float(userdata.get('memory_threshold', 64)) * 1024,
+        top=int(userdata.get('memory_top', 10)),
+        frames=int(userdata.get('memory_frames', 10)),
+    )
+
+
+def repeat_features(runner, iterations, language=None):
+    """Queue fresh copies of every feature so the run goes through them again"""
+    # run_model iterates this very list, so appended features run after the first pass
+    originals = list(runner.features)
+    for _ in range(iterations - 1):
+        runner.features.extend(parser.parse_file(feature.filename, language=language) for feature in originals)
+
+
+def _size(size):
+    if abs(size) < 1024:
+        return f"{int(size):+d} B"
+    if abs(size) < 1024 ** 2:
+        return f"{size / 1024:+.1f} KiB"
+    return f"{size / 1024 ** 2:+.1f} MiB"
+
+
+def _site(traceback, paths):
+    """Most recent suite frame of a traceback; None for allocations of the harness"""
+    site = None
+    for frame in reversed(traceback):
+        if frame.filename not in paths:
+            # behave compiles step modules under their path relative to the working directory
+            paths[frame.filename] = os.path.abspath(frame.filename)
+        path = paths[frame.filename]
+        if path in _HARNESS:
+            return None
+        if site is None and path.startswith(SUITE_DIR):
+            site = (path, frame.lineno)
+    return site
+
+
+class MemoryTracker:
+    """Snapshot the heap around features and scenarios and charge growth to suite code"""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.features = []
+        self.scenarios = defaultdict(list)
+        self._iterations = Counter()
+        self._open = {}
+        self._sites = {}
+        self._paths = {}
+        tracemalloc.start(settings.frames)
+
+    def start_feature(self, feature):
+        sizes = self._measure()
+        self._close('scenario', sizes)
+        self._close('feature', sizes)
+        self._iterations[feature.filename] += 1
+        self._open['feature'] = (feature.name, self._iterations[feature.filename], sizes)
+
+    def start_scenario(self, scenario):
+        sizes = self._measure()
+        self._close('scenario', sizes)
+        label = f"{scenario.feature.filename}:{scenario.line} {scenario.name}"
+        self._open['scenario'] = (label, self._iterations[scenario.feature.filename], sizes)
+
+    def finish(self, out=None):
+        """Close the last measurements, print the report and judge the repeats"""
+        sizes = self._measure()
+        self._close('scenario', sizes)
+        self._close('feature', sizes)
+        tracemalloc.stop()
+        report, leaking = self.report()
+        print(report, file=out or sys.stdout)
+        if leaking:
+            raise MemoryGrowthExceeded(
+                f"{len(leaking)} scenarios retained more than {_size(self.settings.threshold)} "
+                f"on every repeat: {', '.join(growth[0].label for growth in leaking)}"
+            )
+
+    def leaking(self):
+        """Scenarios whose every iteration after the first grew past the threshold"""
+        found = []
+        for label, growths in self.scenarios.items():
+            repeats = [growth for growth in growths if growth.iteration > 1]
+            if repeats and min(growth.retained for growth in repeats) > self.settings.threshold:
+                found.append(repeats)
+        return sorted(found, key=lambda repeats: -min(growth.retained for growth in repeats))
+
+    def report(self):
+        top = self.settings.top
+        lines = ["Memory retained per feature (after GC, suite allocations only):"]
+        for growth in self.features:
+            lines.append(f"  {_size(growth.retained):>12}  {growth.label} (iteration {growth.iteration})")
+
+        sites = Counter()
+        for growths in self.scenarios.values():
+            for growth in growths:
+                if growth.iteration > 1:
+                    sites.update(growth.sites)
+        lines.append(f"Top {top} allocation sites by growth retained after the first iteration:")
+        lines.extend(self._format_sites(sites, top) or ["  none"])
+
+        leaking = self.leaking()
+        lines.append(f"Scenarios retaining more than {_size(self.settings.threshold)} on every repeat:")
+        for repeats in leaking:
+            lines.append(f"  {repeats[0].label}: " + ', '.join(_size(growth.retained) for growth in repeats))
+            merged = Counter()
+            for growth in repeats:
+                merged.update(growth.sites)
+            lines.extend('    ' + line for line in self._format_sites(merged, 3))
+        if not leaking:
+            lines.append("  none")
+        return '\n'.join(lines), leaking
+
+    def _measure(self):
+        """Live traced bytes per suite allocation site, after a full collection"""
+        gc.collect()
+        sizes = Counter()
+        for stat in tracemalloc.take_snapshot().statistics('traceback'):
+            if stat.traceback not in self._sites:
+                self._sites[stat.traceback] = _site(stat.traceback, self._paths)
+            site = self._sites[stat.traceback]
+            if site is not None:
+                sizes[site] += stat.size
+        return sizes
+
+    def _close(self, level, sizes):
+        if level not in self._open:
+            return
+        label, iteration, before = self._open.pop(level)
+        sites = Counter({site: sizes[site] - before[site] for site in sizes.keys() | before.keys()})
+        sites = Counter({site: size for site, size in sites.items() if size})
+        growth = Growth(label, iteration, sum(sites.values()), sites)
+        if level == 'feature':
+            self.features.append(growth)
+        else:
+            self.scenarios[label].append(growth)
+
+    @staticmethod
+    def _format_sites(sites, top):
+        lines = []
+        for (filename, lineno), size in sites.most_common(top):
+            if size <= 0:
+                break
+            source = linecache.getline(filename, lineno).strip()
+            lines.append(f"  {_size(size):>12}  {os.path.relpath(filename, SUITE_DIR)}:{lineno}  {source}")
+        return lines
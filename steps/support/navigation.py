@@ -0,0 +1,129 @@
+"""
+Navigation engine for the mobile app mocks.
+
+``Navigator`` owns the back-stack of a Flutter ``Navigator`` stand-in: a
+fixed set of named routes, ``push``/``pop``/``replace``/``reset``
+transitions and a bounded stack that forgets the oldest screens first.
+Every transition is timed, including building the new screen, and can
+optionally measure the memory the new screen retains. Listeners receive
+each ``Transition`` as it happens.
+"""
+
+import time
+import tracemalloc
+from collections import deque, namedtuple
+
+
+Transition = namedtuple('Transition', 'kind source target seconds retained_bytes')
+
+
+class NavigationError(Exception):
+    """Unknown route, or popping the last screen"""
+
+
+class StackEntry:
+    """A screen on the back-stack"""
+
+    def __init__(self, route, screen=None, retained_bytes=None):
+        self.route = route
+        self.screen = screen
+        self.retained_bytes = retained_bytes
+
+    def __repr__(self):
+        return f"StackEntry({self.route!r})"
+
+
+class Navigator:
+    """Named-route back-stack with transition timing and memory hooks"""
+
+    def __init__(self, routes, initial, max_depth=20, track_memory=False):
+        self.routes = frozenset(routes)
+        self.max_depth = max_depth
+        self.track_memory = track_memory
+        self.transitions = []
+        self.dropped = 0
+        self._listeners = []
+        self._stack = deque([StackEntry(self._check(initial))])
+
+    @property
+    def current(self):
+        return self._stack[-1]
+
+    @property
+    def previous(self):
+        return self._stack[-2] if len(self._stack) > 1 else None
+
+    @property
+    def depth(self):
+        return len(self._stack)
+
+    def routes_on_stack(self):
+        return [entry.route for entry in self._stack]
+
+    def retained_bytes(self):
+        """Memory held by the screens still on the stack, when tracked"""
+        return sum(entry.retained_bytes or 0 for entry in self._stack)
+
+    def add_listener(self, callback):
+        """Call ``callback(transition)`` after every transition"""
+        self._listeners.append(callback)
+
+    def push(self, route, build=None):
+        """Show a new screen on top of the current one"""
+        return self._transition('push', route, build)
+
+    def replace(self, route, build=None):
+        """Swap the current screen for a new one"""
+        return self._transition('replace', route, build)
+
+    def reset(self, route, build=None):
+        """Clear the stack and show a single screen"""
+        return self._transition('reset', route, build)
+
+    def pop(self):
+        """Go back, discarding the current screen"""
+        if len(self._stack) == 1:
+            raise NavigationError(f"Cannot pop the root screen {self.current.route!r}")
+        started = time.perf_counter()
+        popped = self._stack.pop()
+        self._record('pop', popped.route, self.current.route, time.perf_counter() - started, None)
+        return popped
+
+    def _transition(self, kind, route, build):
+        self._check(route)
+        source = self.current.route
+        tracing = self.track_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0] if self.track_memory else 0
+            started = time.perf_counter()
+            screen = build() if build is not None else None
+            entry = StackEntry(route, screen)
+            if kind == 'reset':
+                self._stack.clear()
+            elif kind == 'replace':
+                self._stack.pop()
+            self._stack.append(entry)
+            while len(self._stack) > self.max_depth:
+                self._stack.popleft()
+                self.dropped += 1
+            seconds = time.perf_counter() - started
+            if self.track_memory:
+                entry.retained_bytes = max(tracemalloc.get_traced_memory()[0] - before, 0)
+        finally:
+            if tracing:
+                tracemalloc.stop()
+        self._record(kind, source, route, seconds, entry.retained_bytes)
+        return entry
+
+    def _record(self, kind, source, target, seconds, retained_bytes):
+        transition = Transition(kind, source, target, seconds, retained_bytes)
+        self.transitions.append(transition)
+        for listener in self._listeners:
+            listener(transition)
+
+    def _check(self, route):
+        if route not in self.routes:
+            raise NavigationError(f"Unknown route {route!r}")
+        return route
@@ -0,0 +1,268 @@
+"""
+Duration-aware parallel runs of the suite.
+
+Scenarios, not feature files, are the unit of work: splitting the eleven
+features round-robin leaves most workers idle while one works through
+``mobile_user_profile.feature`` or the network-bound rooms scenarios. Each
+scenario is estimated by its median duration in the timing ledger
+(``support.timings``). Scenarios the ledger has not seen yet get the median
+estimate of their pool.
+
+Scenarios tagged ``@network``, and those pointed at a real backend through
+``support.budget.BACKEND_OVERRIDES``, spend their time waiting on the backend
+and the rest spend it on the CPU, so the two run in separate pools sized
+independently. Within a pool, ``lpt_assign`` deals scenarios out longest
+first, each to the worker with the least estimated work so far (LPT, within
+4/3 of the optimal makespan). Estimates are never exact, so a worker that
+runs out of work steals the shortest remaining scenarios from whichever
+worker has the most left. The straggler's tail is spread over whoever is
+free.
+
+Every worker runs its scenarios in behave subprocesses, in batches of about
+``--batch-seconds`` of estimated work so that behave's start-up is paid once
+per batch rather than once per scenario. Each batch writes its timings to a
+scratch ledger. They are merged into the shared ledger as a single run at the
+end, so the next run is scheduled from fresh data. Run from ``steps/``::
+
+    python -m support.parallel --cpu-workers 4 --network-workers 8 -- --format progress
+"""
+
+import argparse
+import heapq
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque, namedtuple
+from statistics import median
+
+from behave import parser
+
+from support.budget import BUDGET_ENV, NETWORK_TAG, RunBudget, needs_network
+from support.timings import (
+    TIMINGS_ENV, TimingRecorder, connect, read_rows, scenario_estimates, timings_settings,
+)
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_ESTIMATE = 1.0
+CPU_COUNT = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+Unit = namedtuple('Unit', 'location feature scenario pool estimate')
+Batch = namedtuple('Batch', 'worker units stolen seconds returncode output')
+
+
+def feature_files(paths):
+    """Feature files under the given files and directories, relative to the repository"""
+    found = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if os.path.isdir(path):
+            for directory, _, names in sorted(os.walk(path)):
+                found.extend(os.path.join(directory, name) for name in sorted(names) if name.endswith('.feature'))
+        else:
+            found.append(path)
+    return [os.path.relpath(path, ROOT_DIR) for path in found]
+
+
+def collect_units(paths, estimates=None):
+    """One unit per scenario and outline row, estimated from the ledger"""
+    estimates = estimates or {}
+    scenarios = []
+    for filename in feature_files(paths):
+        feature = parser.parse_file(os.path.join(ROOT_DIR, filename))
+        if feature is None:
+            continue
+        for scenario in feature.walk_scenarios():
+            pool = NETWORK_TAG if needs_network(scenario.effective_tags) else 'cpu'
+            scenarios.append((f"{filename}:{scenario.line}", feature.name, scenario.name, pool))
+
+    # Unknown scenarios cost what a typical scenario of their pool costs
+    fallback = {}
+    for pool in {scenario[3] for scenario in scenarios}:
+        known = [estimates[feature, name] for _, feature, name, unit_pool in scenarios
+                 if unit_pool == pool and (feature, name) in estimates]
+        fallback[pool] = median(known) if known else DEFAULT_ESTIMATE
+    return [Unit(*scenario, estimates.get(scenario[1:3], fallback[scenario[3]])) for scenario in scenarios]
+
+
+def lpt_assign(units, workers):
+    """Longest processing time first: each unit goes to the least loaded worker"""
+    queues = [deque() for _ in range(workers)]
+    loads = [(0.0, index) for index in range(workers)]
+    for unit in sorted(units, key=lambda unit: unit.estimate, reverse=True):
+        load, index = heapq.heappop(loads)
+        queues[index].append(unit)
+        heapq.heappush(loads, (load + unit.estimate, index))
+    return queues
+
+
+class WorkStealingPool:
+    """Workers that drain their own LPT queue, then steal from the busiest one"""
+
+    def __init__(self, name, units, workers, run_batch, batch_seconds=5.0):
+        self.name = name
+        self.queues = lpt_assign(units, workers)
+        self.predicted = max((sum(unit.estimate for unit in queue) for queue in self.queues), default=0.0)
+        self.lower_bound = max(sum(unit.estimate for unit in units) / workers,
+                               max((unit.estimate for unit in units), default=0.0))
+        self.run_batch = run_batch
+        self.batch_seconds = batch_seconds
+        self.batches = []
+        self.busy = [0.0] * workers
+        self.makespan = 0.0
+        self._lock = threading.Lock()
+
+    def next_batch(self, worker):
+        """Units to run next: from the worker's own queue, else stolen; empty when done"""
+        with self._lock:
+            own = self.queues[worker]
+            if own:
+                return self._take(own, True, self.batch_seconds), False
+            victim = max(self.queues, key=self._remaining)
+            if not victim:
+                return [], False
+            # The tail holds the victim's shortest scenarios, the finest grain to balance
+            # with, and taking at most half its work leaves the victim busy too
+            return self._take(victim, False, min(self.batch_seconds, self._remaining(victim) / 2)), True
+
+    @staticmethod
+    def _remaining(queue):
+        return sum(unit.estimate for unit in queue)
+
+    @staticmethod
+    def _take(queue, from_front, seconds):
+        units, taken = [], 0.0
+        while queue:
+            unit = queue[0] if from_front else queue[-1]
+            if units and taken + unit.estimate > seconds:
+                break
+            units.append(queue.popleft() if from_front else queue.pop())
+            taken += unit.estimate
+        return units
+
+    def run(self):
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._work, args=(worker,), name=f"{self.name}-{worker}")
+                   for worker in range(len(self.queues))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.makespan = time.perf_counter() - started
+        return self.batches
+
+    def _work(self, worker):
+        while True:
+            units, stolen = self.next_batch(worker)
+            if not units:
+                return
+            batch_started = time.perf_counter()
+            returncode, output = self.run_batch(units)
+            seconds = time.perf_counter() - batch_started
+            with self._lock:
+                self.busy[worker] += seconds
+                self.batches.append(Batch(worker, units, stolen, seconds, returncode, output))
+
+
+class BehaveBatchRunner:
+    """Run a batch of scenarios in one behave subprocess"""
+
+    def __init__(self, command, behave_args, scratch_dir, budget):
+        self.command = command
+        self.behave_args = behave_args
+        self.scratch_dir = scratch_dir
+        self.budget = budget
+        self.ledgers = []
+        self.print_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def __call__(self, units):
+        with self._lock:
+            ledger = os.path.join(self.scratch_dir, f"batch-{len(self.ledgers)}.sqlite")
+            self.ledgers.append(ledger)
+        env = dict(os.environ, **{TIMINGS_ENV: ledger})
+        if self.budget.seconds is not None:
+            # Every batch gets what is left of the run's budget, not a fresh one
+            env[BUDGET_ENV] = f"{max(self.budget.remaining(), 0.001):.3f}"
+        result = subprocess.run(
+            self.command + self.behave_args + [unit.location for unit in units],
+            cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        with self.print_lock:
+            sys.stdout.write(result.stdout)
+            sys.stdout.flush()
+        return result.returncode, result.stdout
+
+
+def format_summary(pools):
+    lines = []
+    for pool in pools:
+        stolen = sum(len(batch.units) for batch in pool.batches if batch.stolen)
+        lines.append(
+            f"{pool.name}: {len(pool.queues)} workers, {sum(len(batch.units) for batch in pool.batches)} "
+            f"scenarios in {len(pool.batches)} batches, {stolen} stolen; makespan {pool.makespan:.1f}s "
+            f"(predicted {pool.predicted:.1f}s, lower bound {pool.lower_bound:.1f}s)"
+        )
+        lines.append("  busy per worker: " + ', '.join(f"{seconds:.1f}s" for seconds in pool.busy))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(
+        description="Run the suite across workers, longest scenarios first",
+        epilog="Arguments after -- are passed to behave.",
+    )
+    arguments.add_argument('paths', nargs='*', default=[os.path.join(ROOT_DIR, 'features')])
+    arguments.add_argument('--cpu-workers', type=int, default=CPU_COUNT)
+    arguments.add_argument('--network-workers', type=int, default=8)
+    arguments.add_argument('--batch-seconds', type=float, default=5.0,
+                           help="estimated work per behave process")
+    arguments.add_argument('--last', type=int, default=20, help="runs the estimates are taken from")
+    arguments.add_argument('--behave', default=f"{shlex.quote(sys.executable)} -m behave",
+                           help="command that runs behave")
+    argv = sys.argv[1:] if argv is None else argv
+    behave_args = argv[argv.index('--') + 1:] if '--' in argv else []
+    args = arguments.parse_args(argv[:argv.index('--')] if '--' in argv else argv)
+
+    settings = timings_settings()
+    estimates = {}
+    if settings and os.path.exists(settings[0]):
+        connection = connect(settings[0])
+        try:
+            estimates = scenario_estimates(connection, args.last, settings[1])
+        finally:
+            connection.close()
+    units = collect_units(args.paths, estimates)
+
+    with tempfile.TemporaryDirectory(prefix='sweet-manager-parallel-') as scratch_dir:
+        runner = BehaveBatchRunner(shlex.split(args.behave), behave_args, scratch_dir, RunBudget.from_config())
+        pools = [
+            WorkStealingPool(name, [unit for unit in units if unit.pool == name], workers, runner, args.batch_seconds)
+            for name, workers in (('cpu', args.cpu_workers), (NETWORK_TAG, args.network_workers))
+            if any(unit.pool == name for unit in units)
+        ]
+        threads = [threading.Thread(target=pool.run) for pool in pools]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if settings:
+            recorder = TimingRecorder(*settings)
+            for ledger in runner.ledgers:
+                if os.path.exists(ledger):
+                    recorder.rows.extend(read_rows(ledger))
+            run_id = recorder.save()
+            if run_id is not None:
+                print(f"Timings of run #{run_id} appended to {recorder.path}")
+
+    print(format_summary(pools))
+    return max((batch.returncode for pool in pools for batch in pool.batches), default=0)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Queue-backed checkout pipeline for the payment screen mocks.
+
+Submissions carry an idempotency key built from the owner, the plan and a
+nonce drawn when the checkout opens; card data never goes into it. While a
+key is queued, processing or recently paid, submitting it again returns the
+same ticket instead of queueing a second payment, so a burst of taps on the
+submit button still charges once. Only the last ``max_completed`` paid keys
+are remembered. A pool of worker threads drains the queue and runs each
+ticket through the checkout stages: contract creation on
+``MockContractOwnerService`` and then payment recording on
+``MockPaymentService``. A failed ticket releases its key so the user can retry.
+"""
+
+import hashlib
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+
+class PaymentServiceError(Exception):
+    """Raised by a checkout stage when the backend rejects the request"""
+
+
+def idempotency_key(*parts):
+    """Stable key for one logical payment attempt"""
+    raw = '\x1f'.join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class MockContractOwnerService:
+    """Mock of the ContractOwnerService used after checkout"""
+
+    def __init__(self):
+        self.contracts = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create_contract(self, owner_id, plan_identifier):
+        with self._lock:
+            contract = {
+                'id': next(self._ids),
+                'owner_id': owner_id,
+                'subscription_id': plan_identifier,
+                'status': 'ACTIVE',
+            }
+            self.contracts[contract['id']] = contract
+            return contract
+
+    def cancel_contract(self, contract_id):
+        with self._lock:
+            self.contracts[contract_id]['status'] = 'CANCELLED'
+
+    def active_contracts(self, owner_id=None):
+        return [
+            contract for contract in self.contracts.values()
+            if contract['status'] == 'ACTIVE'
+            and (owner_id is None or contract['owner_id'] == owner_id)
+        ]
+
+
+class MockPaymentService:
+    """Mock of the PaymentService that records charges
+
+    ``latency`` is real time spent per call, standing in for the network round
+    trip the workers overlap. ``fail_with`` makes the next calls raise
+    ``PaymentServiceError`` with the given reason.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.failure = None
+        self.payments = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def fail_with(self, reason):
+        self.failure = reason
+
+    def recover(self):
+        self.failure = None
+
+    def record_payment(self, owner_id, contract_id, card_last4):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.failure:
+            raise PaymentServiceError(self.failure)
+        with self._lock:
+            payment = {
+                'id': next(self._ids),
+                'owner_id': owner_id,
+                'contract_id': contract_id,
+                'card_last4': card_last4,
+            }
+            self.payments.append(payment)
+            return payment
+
+
+class PaymentTicket:
+    """One queued payment, shared by every duplicate submission of its key"""
+
+    def __init__(self, key, payload):
+        self.key = key
+        self.payload = payload
+        self.status = 'queued'
+        self.contract = None
+        self.payment = None
+        self.error = None
+        self.submissions = 1
+        self._done = threading.Event()
+
+    @property
+    def pending(self):
+        return not self._done.is_set()
+
+    def wait(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Payment {self.key[:8]} still {self.status}")
+        return self
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        self._done.set()
+
+
+class PaymentPipeline:
+    """Idempotent work queue drained by a pool of checkout workers"""
+
+    def __init__(self, contract_service=None, payment_service=None, workers=4, max_completed=1024):
+        self.contract_service = contract_service or MockContractOwnerService()
+        self.payment_service = payment_service or MockPaymentService()
+        self.worker_count = workers
+        self.max_completed = max_completed
+        self.tickets = {}               # key -> ticket still queued or processing
+        self.completed = OrderedDict()  # key -> recently paid ticket, oldest first
+        self.submitted = 0
+        self.duplicates_suppressed = 0
+        self.processed = 0
+        self.failed = 0
+        self.stages = (self._create_contract, self._record_payment)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._started_at = None
+        self._finished_at = None
+
+    def submit(self, key, payload):
+        """Queue a payment, or return the ticket already holding this key"""
+        with self._lock:
+            self.submitted += 1
+            ticket = self.tickets.get(key) or self.completed.get(key)
+            if ticket is not None:
+                ticket.submissions += 1
+                self.duplicates_suppressed += 1
+                return ticket
+            ticket = PaymentTicket(key, payload)
+            self.tickets[key] = ticket
+            if self._started_at is None:
+                self._started_at = time.perf_counter()
+            self._ensure_workers()
+        self._queue.put(ticket)
+        return ticket
+
+    def join(self):
+        """Block until every queued ticket has been processed"""
+        self._queue.join()
+
+    def close(self):
+        """Stop the workers once the queue is drained"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def stats(self):
+        elapsed = 0.0
+        if self._started_at is not None and self._finished_at is not None:
+            elapsed = self._finished_at - self._started_at
+        completed = self.processed + self.failed
+        return {
+            'submitted': self.submitted,
+            'duplicates_suppressed': self.duplicates_suppressed,
+            'processed': self.processed,
+            'failed': self.failed,
+            'elapsed': elapsed,
+            'throughput': completed / elapsed if elapsed else 0.0,
+        }
+
+    def _ensure_workers(self):
+        while len(self._workers) < self.worker_count:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            ticket = self._queue.get()
+            try:
+                if ticket is None:
+                    return
+                self._process(ticket)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, ticket):
+        ticket.status = 'processing'
+        try:
+            for stage in self.stages:
+                stage(ticket)
+        except Exception as error:
+            # Unexpected errors must still finish the ticket, or its key stays suppressed forever
+            reason = str(error) if isinstance(error, PaymentServiceError) else f"{type(error).__name__}: {error}"
+            if ticket.contract is not None:
+                try:
+                    self.contract_service.cancel_contract(ticket.contract['id'])
+                except Exception as cancel_error:
+                    reason += f" (cancelling contract {ticket.contract['id']} failed: {cancel_error})"
+            with self._lock:
+                self.failed += 1
+                self._finished_at = time.perf_counter()
+                del self.tickets[ticket.key]
+            ticket._finish('failed', reason)
+            return
+        with self._lock:
+            self.processed += 1
+            self._finished_at = time.perf_counter()
+            self.completed[ticket.key] = self.tickets.pop(ticket.key)
+            if len(self.completed) > self.max_completed:
+                self.completed.popitem(last=False)
+        ticket._finish('succeeded')
+
+    def _create_contract(self, ticket):
+        ticket.contract = self.contract_service.create_contract(
+            ticket.payload['owner_id'], ticket.payload['plan_identifier']
+        )
+
+    def _record_payment(self, ticket):
+        ticket.payment = self.payment_service.record_payment(
+            ticket.payload['owner_id'], ticket.contract['id'], ticket.payload['card_last4']
+        )
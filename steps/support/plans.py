@@ -0,0 +1,145 @@
+"""
+Subscription plan catalog for the subscription plans screen mocks.
+
+The catalog is loaded once from ``data/subscription_plans.json`` and shared by
+every screen. Plans are read-only mappings with the display price parsed to a
+``Decimal`` and the features precomputed as a frozenset, and they are indexed
+by region and title, by identifier and by price order. Lookups, price
+comparisons and feature superset checks are then constant time regardless of
+how many regions or plans the catalog holds.
+"""
+
+import json
+import os
+import random
+import re
+from decimal import Decimal
+from functools import lru_cache
+from types import MappingProxyType
+
+
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'data', 'subscription_plans.json')
+
+PRICE_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def parse_price(price):
+    """Amount of a display price such as '$29.99 al mes'"""
+    match = PRICE_PATTERN.search(price)
+    if not match:
+        raise ValueError(f"No amount in price {price!r}")
+    return Decimal(match.group().replace(',', ''))
+
+
+def _freeze(raw, default_region):
+    features = tuple(raw['features'])
+    return MappingProxyType({
+        'region': raw.get('region', default_region),
+        'identifier': raw['identifier'],
+        'title': raw['title'],
+        'price': raw['price'],
+        'amount': parse_price(raw['price']),
+        'icon': raw['icon'],
+        'features': features,
+        'feature_set': frozenset(features),
+    })
+
+
+class PlanCatalog:
+    """Immutable, indexed set of subscription plans"""
+
+    def __init__(self, plans, default_region='default'):
+        self.default_region = default_region
+        self._by_title = {}
+        self._by_identifier = {}
+        regions = {}
+        for raw in plans:
+            plan = _freeze(raw, default_region)
+            key = (plan['region'], plan['title'])
+            if key in self._by_title:
+                raise ValueError(f"Duplicate plan {plan['title']!r} in region {plan['region']!r}")
+            if plan['identifier'] in self._by_identifier:
+                raise ValueError(f"Duplicate plan identifier {plan['identifier']}")
+            self._by_title[key] = plan
+            self._by_identifier[plan['identifier']] = plan
+            regions.setdefault(plan['region'], []).append(plan)
+
+        self._regions = {}
+        self._rank = {}
+        for region, region_plans in regions.items():
+            ordered = tuple(sorted(region_plans, key=lambda p: (p['amount'], p['identifier'])))
+            self._regions[region] = ordered
+            for rank, plan in enumerate(ordered):
+                self._rank[plan['identifier']] = rank
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        with open(path, encoding='utf-8') as handle:
+            data = json.load(handle)
+        return cls(data['plans'], data.get('default_region', 'default'))
+
+    def __len__(self):
+        return len(self._by_identifier)
+
+    def __deepcopy__(self, memo):
+        # Immutable, so Background snapshots share it instead of copying it
+        return self
+
+    @property
+    def regions(self):
+        return tuple(self._regions)
+
+    def plans(self, region=None):
+        """Plans of a region, cheapest first"""
+        return self._regions.get(region or self.default_region, ())
+
+    def get(self, title, region=None):
+        return self._by_title.get((region or self.default_region, title))
+
+    def by_identifier(self, identifier):
+        return self._by_identifier.get(identifier)
+
+    def cheapest(self, region=None):
+        return self.plans(region)[0]
+
+    def most_expensive(self, region=None):
+        return self.plans(region)[-1]
+
+    def price_rank(self, plan):
+        """Position of a plan in its region's price order, 0 being the cheapest"""
+        return self._rank[plan['identifier']]
+
+    def includes(self, plan, other):
+        """True when ``plan`` offers every feature of ``other`` and more"""
+        return plan['feature_set'] > other['feature_set']
+
+
+@lru_cache(maxsize=None)
+def default_plan_catalog():
+    """The catalog shipped with the suite, loaded on first use"""
+    return PlanCatalog.load()
+
+
+def generate_plans(regions, plans_per_region, seed=42):
+    """Raw plan records for a large region-specific catalog"""
+    rng = random.Random(seed)
+    base = default_plan_catalog().plans()
+    feature_pool = [f"Feature {n}" for n in range(plans_per_region)]
+    identifier = 0
+    plans = []
+    for region_index in range(regions):
+        region = f"region-{region_index:04d}"
+        cents = 0
+        for tier in range(plans_per_region):
+            identifier += 1
+            cents += rng.randint(100, 5000)
+            template = base[tier % len(base)]
+            plans.append({
+                'region': region,
+                'identifier': identifier,
+                'title': f"PLAN {tier:05d}",
+                'price': f"${cents // 100:,}.{cents % 100:02d} al mes",
+                'icon': template['icon'],
+                'features': feature_pool[:tier + 1],
+            })
+    return plans
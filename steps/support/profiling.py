@@ -0,0 +1,182 @@
+"""
+Opt-in profiling of scenarios and steps.
+
+``SuiteProfiler`` is driven by the environment hooks. Each step runs under
+its own ``cProfile`` profile, and the step profiles are merged into one
+``.prof`` file per scenario, which ``pstats`` or snakeviz can open. At the
+same time a ``StackSampler`` thread takes a sample of the runner thread's
+Python stack every few milliseconds. Samples are rooted at
+feature, scenario and step names and written in the collapsed-stack format
+that ``flamegraph.pl`` and speedscope read. This is where network waits,
+JSON parsing and mock bookkeeping show up side by side. At the end of the
+run it prints the slowest steps, each with the function that used most of
+its own time.
+
+Enable it with ``-D profile`` (output in ``reports/profile``), ``-D
+profile=DIR`` or ``SWEET_MANAGER_PROFILE=DIR``, and tune the sampling with
+``-D profile_interval=SECONDS``.
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+
+import behave
+
+
+PROFILE_ENV = 'SWEET_MANAGER_PROFILE'
+DEFAULT_OUTPUT = os.path.join('reports', 'profile')
+_BEHAVE_DIR = os.path.dirname(behave.__file__)
+
+StepTiming = namedtuple('StepTiming', 'feature scenario step seconds hotspot')
+
+
+def profile_settings(userdata=None):
+    """Output directory and sampling interval, or None when profiling is off"""
+    userdata = userdata or {}
+    value = userdata.get('profile', os.environ.get(PROFILE_ENV))
+    if value is None or value.lower() in ('', '0', 'false', 'no', 'off'):
+        return None
+    output = DEFAULT_OUTPUT if value.lower() in ('1', 'true', 'yes', 'on') else value
+    return output, float(userdata.get('profile_interval', 0.005))
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_')[:80] or 'unnamed'
+
+
+def _frame_label(code):
+    # ';' separates frames in the collapsed format and must not appear inside one
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+
+class StackSampler:
+    """Sample one thread's Python stack at a fixed interval"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.prefix = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            prefix = self.prefix
+            frame = sys._current_frames().get(self.thread_id)
+            if prefix is None or frame is None:
+                continue
+            stack = []
+            # Stop at behave's runner so stacks start at the step or hook function
+            while frame is not None and not frame.f_code.co_filename.startswith(_BEHAVE_DIR):
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.samples[';'.join([prefix] + stack[::-1])] += 1
+
+    def take(self):
+        """Samples collected so far; resets the counter"""
+        samples, self.samples = self.samples, Counter()
+        return samples
+
+
+def write_collapsed(path, samples):
+    with open(path, 'w', encoding='utf-8') as handle:
+        for stack, count in sorted(samples.items()):
+            handle.write(f"{stack} {count}\n")
+
+
+class SuiteProfiler:
+    """Profile every scenario and step of a run"""
+
+    def __init__(self, output_dir, interval=0.005):
+        self.output_dir = output_dir
+        self.timings = []
+        self.all_samples = Counter()
+        self.sampler = StackSampler(threading.get_ident(), interval)
+        self._scenario_stats = None
+        self._step_profile = None
+        self._step_started = None
+        self._feature = None
+        self._scenario = None
+        os.makedirs(output_dir, exist_ok=True)
+        self.sampler.start()
+
+    def start_scenario(self, scenario):
+        self._feature = scenario.feature.name
+        self._scenario = scenario.name
+        self._scenario_stats = None
+        self.sampler.prefix = ';'.join(_slug(part) for part in (self._feature, self._scenario))
+
+    def start_step(self, step):
+        self.sampler.prefix = ';'.join(
+            _slug(part) for part in (self._feature, self._scenario, f"{step.keyword} {step.name}")
+        )
+        self._step_profile = cProfile.Profile()
+        self._step_started = time.perf_counter()
+        self._step_profile.enable()
+
+    def end_step(self, step):
+        self._step_profile.disable()
+        seconds = time.perf_counter() - self._step_started
+        stats = pstats.Stats(self._step_profile)
+        self.timings.append(StepTiming(self._feature, self._scenario, f"{step.keyword} {step.name}",
+                                       seconds, self._hotspot(stats)))
+        if self._scenario_stats is None:
+            self._scenario_stats = stats
+        else:
+            self._scenario_stats.add(stats)
+        self.sampler.prefix = ';'.join(_slug(part) for part in (self._feature, self._scenario))
+
+    def end_scenario(self, scenario):
+        self.sampler.prefix = None
+        name = f"{_slug(self._feature)}__{_slug(self._scenario)}"
+        if self._scenario_stats is not None:
+            self._scenario_stats.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+        samples = self.sampler.take()
+        if samples:
+            write_collapsed(os.path.join(self.output_dir, f"{name}.folded"), samples)
+            self.all_samples.update(samples)
+
+    def finish(self, out=None, top=20):
+        """Stop sampling, write the run's collapsed stacks and print the slowest steps"""
+        self.sampler.stop()
+        self.all_samples.update(self.sampler.take())
+        write_collapsed(os.path.join(self.output_dir, 'all.folded'), self.all_samples)
+        print(self.slowest_table(top), file=out or sys.stdout)
+
+    def slowest_table(self, top=20):
+        slowest = sorted(self.timings, key=lambda timing: timing.seconds, reverse=True)[:top]
+        lines = [f"Slowest {len(slowest)} steps (profiles in {self.output_dir})",
+                 f"{'seconds':>9}  {'step':<60}  {'scenario':<40}  hotspot"]
+        for timing in slowest:
+            lines.append(f"{timing.seconds:>9.3f}  {timing.step[:60]:<60}  "
+                         f"{timing.scenario[:40]:<40}  {timing.hotspot}")
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _hotspot(stats):
+        """Function with the most own time in a step, ignoring the profiler itself"""
+        best, best_time = None, 0.0
+        for (filename, line, name), (_, _, own_time, _, _) in stats.stats.items():
+            if own_time > best_time and 'disable' not in name:
+                best, best_time = (filename, line, name), own_time
+        if best is None:
+            return '-'
+        filename, line, name = best
+        where = f"{os.path.basename(filename)}:{line}" if filename != '~' else 'builtin'
+        return f"{name} ({where}) {best_time * 1000:.1f}ms"
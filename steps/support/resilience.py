@@ -0,0 +1,206 @@
+"""
+Retries and circuit breaking for the steps that talk to real services.
+
+``CircuitBreaker`` counts consecutive failures of one dependency. After
+``failure_threshold`` failures it opens, and every call is rejected at once
+with ``CircuitOpen`` until ``reset_timeout`` has passed. It then lets a
+single trial call through: success closes the breaker, failure opens it for
+another round.
+
+``ResilientSession`` is a ``requests.Session`` with one breaker per host.
+Idempotent requests are retried on connection errors, timeouts and gateway
+errors, sleeping between attempts with jittered exponential backoff. Every
+request gets connect and read timeouts, ``SWEET_MANAGER_CONNECT_TIMEOUT`` and
+``SWEET_MANAGER_READ_TIMEOUT`` seconds unless the caller passes its own, and
+never more than what is left of the session's ``RunBudget`` when the host is
+remote. ``http`` is the session shared by the step modules, so once the
+backend is known to be down, the remaining scenarios fail in milliseconds
+instead of each waiting on its own.
+"""
+
+import os
+import random
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+from support.clock import SystemClock
+
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({502, 503, 504})
+LOCAL_HOSTS = frozenset({'localhost', '127.0.0.1', '::1'})
+DEFAULT_TIMEOUT = (
+    float(os.environ.get('SWEET_MANAGER_CONNECT_TIMEOUT', 3.05)),
+    float(os.environ.get('SWEET_MANAGER_READ_TIMEOUT', 15)),
+)
+
+
+class CircuitOpen(requests.exceptions.ConnectionError):
+    """A dependency is known to be down; the call was not attempted"""
+
+    def __init__(self, name, failures, retry_in, last_error):
+        super().__init__(
+            f"{name} circuit open after {failures} consecutive failures, "
+            f"next attempt in {retry_in:.1f}s (last error: {last_error})"
+        )
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Fail fast once a dependency has failed too many times in a row"""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30.0, clock=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock or SystemClock()
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_error = None
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self.clock.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self):
+        """Raise ``CircuitOpen`` unless a call may go ahead"""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            self.rejected += 1
+            retry_in = max(self._opened_at + self.reset_timeout - self.clock.monotonic(), 0.0)
+            raise CircuitOpen(self.name, self.failures, retry_in, self.last_error)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_running:
+                    self.times_opened += 1
+                self._opened_at = self.clock.monotonic()
+                self._trial_running = False
+
+    def call(self, func, *args, **kwargs):
+        """Run ``func`` through the breaker"""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as error:
+            self.record_failure(error)
+            raise
+        self.record_success()
+        return result
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for idempotent requests"""
+
+    def __init__(self, attempts=3, base_delay=0.25, max_delay=2.0, rng=None):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delays(self):
+        """Sleep before each retry: uniform in [0, base * 2**n], capped"""
+        for retry in range(self.attempts - 1):
+            yield self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class ResilientSession(requests.Session):
+    """Session with per-host circuit breakers and retries for idempotent calls"""
+
+    def __init__(self, retry=None, clock=None, failure_threshold=3, reset_timeout=30.0,
+                 timeout=DEFAULT_TIMEOUT, budget=None):
+        super().__init__()
+        self.retry = retry or RetryPolicy()
+        self.clock = clock or SystemClock()
+        self.timeout = timeout
+        self.budget = budget
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(
+                    host, self.failure_threshold, self.reset_timeout, self.clock
+                )
+            return self.breakers[host]
+
+    def request(self, method, url, *args, **kwargs):
+        breaker = self.breaker(url)
+        delays = self.retry.delays() if method.upper() in IDEMPOTENT_METHODS else iter(())
+        timeout = kwargs.pop('timeout', None) or self.timeout
+        while True:
+            attempt_timeout = self._clamp(url, timeout)
+            breaker.before_call()
+            try:
+                response = super().request(method, url, *args, timeout=attempt_timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as error:
+                breaker.record_failure(f"{type(error).__name__}")
+                response, failure = None, error
+            except Exception as error:
+                # Anything else is not retried, but it still settles a half-open trial
+                breaker.record_failure(f"{type(error).__name__}")
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure(f"HTTP {response.status_code}")
+            delay = next(delays, None)
+            if delay is not None and self._budgeted(url) and delay >= self.budget.remaining():
+                delay = None
+            if delay is None:
+                if response is not None:
+                    return response
+                raise failure
+            if response is not None:
+                # Hand the connection back to the pool before the next attempt
+                response.close()
+            self.clock.sleep(delay)
+
+    def _budgeted(self, url):
+        """Local stand-ins keep running after the budget; remote hosts do not"""
+        return self.budget is not None and urlsplit(url).hostname not in LOCAL_HOSTS
+
+    def _clamp(self, url, timeout):
+        """Shrink ``(connect, read)`` timeouts to the time left in the run budget"""
+        if not self._budgeted(url):
+            return timeout
+        self.budget.check()
+        remaining = self.budget.remaining()
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+
+http = ResilientSession()
@@ -0,0 +1,161 @@
+"""
+Local stand-in for the backend's smoke sensor endpoints.
+
+``SmokeSensorService`` keeps sensors in memory and applies the fire-safety
+rule: a reading at or above a sensor's ``thresholdTemperature`` puts it in
+``ALARM`` and raises one alert, and the sensor re-arms once it cools down
+below the threshold. ``start_sensor_service`` serves it over HTTP on
+localhost so the smoke sensor steps exercise it the same way they would the
+real API, including a batched ``telemetry`` ingest endpoint for gateways.
+"""
+
+import itertools
+import threading
+import time
+
+from support.local_api import JsonRouteHandler, NotFound, serve
+
+
+CRITICAL_TEMPERATURE = 57.0
+PREFIX = '/api/v1/smoke-sensor'
+
+
+class SensorNotFound(NotFound):
+    """No sensor with the requested id"""
+
+
+class SmokeSensorService:
+    """In-memory smoke sensors with threshold alerting"""
+
+    def __init__(self):
+        self.sensors = {}
+        self.alerts = []
+        self.readings_ingested = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create(self, data):
+        with self._lock:
+            sensor = {
+                'id': next(self._ids),
+                'roomId': data.get('roomId'),
+                'hotelId': data.get('hotelId'),
+                'state': data.get('state', 'ACTIVE'),
+                'temperature': float(data.get('temperature', 21.0)),
+                'thresholdTemperature': float(data.get('thresholdTemperature', CRITICAL_TEMPERATURE)),
+                'samplingIntervalSeconds': int(data.get('samplingIntervalSeconds', 60)),
+            }
+            self.sensors[sensor['id']] = sensor
+            return dict(sensor)
+
+    def get(self, sensor_id):
+        with self._lock:
+            return dict(self._sensor(sensor_id))
+
+    def all(self):
+        with self._lock:
+            return [dict(sensor) for sensor in self.sensors.values()]
+
+    def update_state(self, sensor_id, data):
+        """Set the state and, optionally, a new temperature reading"""
+        with self._lock:
+            sensor = self._sensor(sensor_id)
+            sensor['state'] = data.get('state', sensor['state'])
+            alert = None
+            if 'temperature' in data:
+                alert = self._read(sensor, float(data['temperature']), data.get('emittedAt'))
+            return dict(sensor), alert
+
+    def update_temperature(self, sensor_id, temperature, emitted_at=None):
+        with self._lock:
+            sensor = self._sensor(sensor_id)
+            alert = self._read(sensor, float(temperature), emitted_at)
+            return dict(sensor), alert
+
+    def configure(self, sensor_id, data):
+        with self._lock:
+            sensor = self._sensor(sensor_id)
+            for field in ('roomId', 'thresholdTemperature', 'samplingIntervalSeconds'):
+                if field in data:
+                    sensor[field] = data[field]
+            return dict(sensor)
+
+    def ingest(self, readings):
+        """Apply a gateway batch of readings; return the alerts it raised"""
+        alerts = []
+        with self._lock:
+            for reading in readings:
+                sensor = self.sensors.get(reading['sensorId'])
+                if sensor is None:
+                    continue
+                alert = self._read(sensor, float(reading['temperature']), reading.get('emittedAt'))
+                if alert is not None:
+                    alerts.append(alert)
+            self.readings_ingested += len(readings)
+        return alerts
+
+    def _sensor(self, sensor_id):
+        try:
+            return self.sensors[int(sensor_id)]
+        except (KeyError, TypeError, ValueError):
+            raise SensorNotFound(f"Smoke sensor {sensor_id} not found")
+
+    def _read(self, sensor, temperature, emitted_at):
+        """Record a reading; raise an alert when it crosses the threshold"""
+        sensor['temperature'] = temperature
+        if temperature < sensor['thresholdTemperature']:
+            if sensor['state'] == 'ALARM':
+                sensor['state'] = 'ACTIVE'
+            return None
+        if sensor['state'] == 'ALARM':
+            return None
+        sensor['state'] = 'ALARM'
+        alert = {
+            'sensorId': sensor['id'],
+            'roomId': sensor['roomId'],
+            'temperature': temperature,
+            'emittedAt': emitted_at,
+            'decidedAt': time.perf_counter(),
+        }
+        self.alerts.append(alert)
+        return alert
+
+
+class SensorServiceHandler(JsonRouteHandler):
+    """JSON routes over a SmokeSensorService"""
+
+    prefix = PREFIX
+
+    def routes(self, method):
+        return {
+            'GET': {
+                'get-all-smoke-sensors': lambda query, body: (200, self.service.all()),
+                'get-smoke-sensor-by-id': lambda query, body: (200, self.service.get(query['id'])),
+            },
+            'POST': {
+                'create-smoke-sensor': lambda query, body: (201, self.service.create(body)),
+                'telemetry': self._telemetry,
+            },
+            'PUT': {
+                'update-smoke-sensor-state': self._update_state,
+                'update-smoke-sensor-temperature': self._update_temperature,
+                'update-smoke-sensor': lambda query, body: (200, self.service.configure(query['id'], body)),
+            },
+        }.get(method, {})
+
+    def _update_state(self, query, body):
+        sensor, alert = self.service.update_state(query['id'], body)
+        return 200, {**sensor, 'alert': alert}
+
+    def _update_temperature(self, query, body):
+        sensor, alert = self.service.update_temperature(query['id'], body['temperature'])
+        return 200, {**sensor, 'alert': alert}
+
+    def _telemetry(self, query, body):
+        alerts = self.service.ingest(body)
+        return 202, {'accepted': len(body), 'alerts': alerts}
+
+
+def start_sensor_service(service=None, port=0):
+    """Serve a SmokeSensorService on localhost; return (server, base url)"""
+    return serve(SensorServiceHandler, service or SmokeSensorService(), port)
@@ -0,0 +1,153 @@
+"""
+Run a feature's Background once and clone its result into every scenario.
+
+When snapshots are enabled, the first scenario of a feature tagged
+``@snapshot_background`` runs the Background steps as usual. When the last
+one passes, ``BackgroundSnapshots`` records the context attributes the Background created (``chatbot_ctx``,
+``mobile_ctx``, ...) and keeps a deep copy of them. Each later scenario of
+the feature starts from its own deep copy of that snapshot, and its
+Background steps are dropped, so setting up a scenario costs one copy
+instead of a round of step matching and mock construction. Scenarios mutate
+their own copies, never the snapshot, so they stay as isolated as before.
+
+Only the scenario's context layer is captured. Side effects of the Background
+anywhere else, such as module globals or calls to an external service,
+happen once per feature instead of once per scenario. Background steps that
+give each scenario its own identity, like a fresh conversation UUID, are
+marked with ``@per_scenario`` and still run after every restore.
+
+Objects with nothing to mutate can skip the copy by returning themselves
+from ``__deepcopy__``, as ``PlanCatalog`` does. Locks and conditions are
+recreated unlocked in the copy. A Background that leaves a running thread, or anything else
+``copy.deepcopy`` refuses, is not snapshotted. That feature keeps running
+its Background for every scenario, and the reason is printed at the end of
+the run.
+
+Snapshots are off by default; enable them with ``-D background_snapshots=on``.
+Dropping Background steps relies on behave 1.2.6 internals, the version
+pinned in ``requirements.txt``. Other versions run every Background as usual.
+"""
+
+import copy
+import copyreg
+import threading
+import warnings
+from contextlib import contextmanager
+from types import MappingProxyType
+
+import behave
+
+from support.fixtures import fixtures
+
+
+SNAPSHOT_TAG = 'snapshot_background'
+# Set by behave itself in the scenario layer; they belong to the running scenario
+BEHAVE_ATTRIBUTES = frozenset({'stdout_capture', 'stderr_capture', 'log_capture', 'text', 'table'})
+# Scenario._background_steps, the lazily copied Background, is private to this release
+SUPPORTED_BEHAVE = '1.2.6'
+_LOCK_FACTORIES = {type(threading.Lock()): threading.Lock, type(threading.RLock()): threading.RLock}
+
+
+def snapshots_enabled(userdata=None):
+    value = (userdata or {}).get('background_snapshots', 'off')
+    if value.lower() in ('', '0', 'false', 'no', 'off'):
+        return False
+    if behave.__version__ != SUPPORTED_BEHAVE:
+        warnings.warn(f"Background snapshots need behave {SUPPORTED_BEHAVE}, found {behave.__version__}; "
+                      "running every Background instead")
+        return False
+    return True
+
+
+def per_scenario(step_function):
+    """Mark a Background step that must run again in every scenario restored from a snapshot"""
+    step_function.per_scenario = True
+    return step_function
+
+
+def _runs_per_scenario(context, step):
+    # The registry the runner loaded the step modules into, as behave's own step lookup uses
+    match = context._runner.step_registry.find_match(step)
+    return match is not None and getattr(match.func, 'per_scenario', False)
+
+
+def _refuse_thread(thread):
+    raise TypeError(f"background left thread {thread.name!r} behind")
+
+
+@contextmanager
+def _thread_aware_copies():
+    """Let ``copy.deepcopy`` recreate locks, conditions and read-only mappings while cloning"""
+    reducers = {
+        lock_type: lambda lock, factory=factory: (factory, ()) for lock_type, factory in _LOCK_FACTORIES.items()
+    }
+    # The lock goes through the memo, so a Queue's conditions keep sharing its new mutex
+    reducers[threading.Condition] = lambda condition: (threading.Condition, (condition._lock,))
+    reducers[MappingProxyType] = lambda proxy: (MappingProxyType, (dict(proxy),))
+    reducers[threading.Thread] = _refuse_thread
+    saved = {cls: copyreg.dispatch_table.get(cls) for cls in reducers}
+    copyreg.dispatch_table.update(reducers)
+    try:
+        yield
+    finally:
+        for cls, reducer in saved.items():
+            if reducer is None:
+                copyreg.dispatch_table.pop(cls, None)
+            else:
+                copyreg.dispatch_table[cls] = reducer
+
+
+def clone(state):
+    """Independent deep copy of a Background's context attributes"""
+    with _thread_aware_copies():
+        return copy.deepcopy(state)
+
+
+class BackgroundSnapshots:
+    """Capture each tagged feature's Background once and restore clones of it"""
+
+    def __init__(self):
+        self.snapshots = {}
+        self.refused = {}
+        self.restored = 0
+        self._capture = None
+
+    def before_scenario(self, context, scenario):
+        self._capture = None
+        if scenario.feature.background is None or SNAPSHOT_TAG not in scenario.feature.tags:
+            return
+        key = scenario.feature.filename
+        if key in self.snapshots:
+            for name, value in clone(self.snapshots[key]).items():
+                if name in fixtures.definitions:
+                    fixtures.provide(context, name, value)
+                else:
+                    setattr(context, name, value)
+            # Background steps are copied per scenario on first access; a filtered copy skips the rest
+            scenario._background_steps = [step for step in scenario.background_steps if _runs_per_scenario(context, step)]
+            self.restored += 1
+        elif key not in self.refused:
+            # context._stack[0] is the scenario layer; the Background's attributes land there
+            self._capture = (key, scenario.background_steps[-1], set(context._stack[0]) | BEHAVE_ATTRIBUTES)
+
+    def after_step(self, context, step):
+        if self._capture is None:
+            return
+        key, last_step, existing = self._capture
+        if step.status.name != 'passed':
+            self._capture = None
+        elif step is last_step:
+            self._capture = None
+            state = {name: value for name, value in context._stack[0].items() if name not in existing}
+            try:
+                self.snapshots[key] = clone(state)
+            except Exception as error:
+                self.refused[key] = f"{type(error).__name__}: {error}"
+
+    def summary(self):
+        lines = []
+        if self.restored:
+            lines.append(f"Background snapshots restored for {self.restored} scenarios")
+        lines.extend(f"Background of {feature} not snapshotted: {reason}"
+                     for feature, reason in sorted(self.refused.items()))
+        return '\n'.join(lines)
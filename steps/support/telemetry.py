@@ -0,0 +1,135 @@
+"""
+Telemetry simulator for the smoke sensor ingest endpoint.
+
+Virtual sensors are spread over a few gateway threads. On every tick each
+gateway posts one batch holding the readings that are due, stamped with the
+time they were emitted, so the simulated fleet reports at a steady rate. Most
+sensors hover around room temperature; the overheating ones ramp past the
+critical temperature halfway through the run. The report gives ingest
+throughput and the end-to-end alert latency, from a reading leaving its
+gateway to the gateway receiving the alert decision.
+"""
+
+import random
+import statistics
+import threading
+import time
+
+import requests
+
+from support.resilience import DEFAULT_TIMEOUT
+
+
+class TelemetrySimulator:
+    """Stream readings from many virtual sensors at a fixed rate"""
+
+    def __init__(self, base_url, sensor_ids, interval=1.0, overheating=(),
+                 gateways=4, tick=0.05, seed=7, critical=57.0, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url
+        self.sensor_ids = list(sensor_ids)
+        self.interval = interval
+        self.overheating = set(overheating)
+        self.gateways = gateways
+        self.tick = tick
+        self.seed = seed
+        self.critical = critical
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    @property
+    def target_rate(self):
+        """Readings per second the fleet should produce"""
+        return len(self.sensor_ids) / self.interval
+
+    def run(self, duration):
+        """Stream for ``duration`` seconds and return the measurements"""
+        self._sent = 0
+        self._accepted = 0
+        self._alerts = []
+        self._errors = []
+        shards = [self.sensor_ids[i::self.gateways] for i in range(self.gateways)]
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._gateway, args=(index, shard, started, duration))
+            for index, shard in enumerate(shards) if shard
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in self._alerts)
+        return {
+            'sensors': len(self.sensor_ids),
+            'target_rate': self.target_rate,
+            'sent': self._sent,
+            'accepted': self._accepted,
+            'elapsed': elapsed,
+            'throughput': self._accepted / elapsed,
+            'alerts': list(self._alerts),
+            'errors': list(self._errors),
+            'latency_p50': statistics.median(latencies) if latencies else None,
+            'latency_p95': latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+            'latency_max': latencies[-1] if latencies else None,
+        }
+
+    def _temperature(self, rng, sensor_id, progress):
+        if sensor_id in self.overheating:
+            # Crosses the critical temperature at the middle of the run
+            return round(self.critical - 27 + 54 * progress, 1)
+        return round(rng.gauss(22.0, 1.5), 1)
+
+    def _gateway(self, index, shard, started, duration):
+        rng = random.Random(self.seed + index)
+        session = requests.Session()
+        per_tick = len(shard) * self.tick / self.interval
+        due = 0.0
+        cursor = 0
+        next_tick = started
+        try:
+            while True:
+                now = time.perf_counter()
+                if now - started >= duration:
+                    return
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                next_tick += self.tick
+
+                due += per_tick
+                count, due = int(due), due - int(due)
+                if not count:
+                    continue
+                progress = (time.perf_counter() - started) / duration
+                emitted_at = time.perf_counter()
+                batch = []
+                for _ in range(count):
+                    sensor_id = shard[cursor]
+                    cursor = (cursor + 1) % len(shard)
+                    batch.append({
+                        'sensorId': sensor_id,
+                        'temperature': self._temperature(rng, sensor_id, progress),
+                        'emittedAt': emitted_at,
+                    })
+                self._post(session, batch, emitted_at)
+        finally:
+            session.close()
+
+    def _post(self, session, batch, emitted_at):
+        try:
+            response = session.post(f"{self.base_url}/smoke-sensor/telemetry", json=batch,
+                                    timeout=self.timeout)
+            received_at = time.perf_counter()
+            response.raise_for_status()
+            result = response.json()
+        except requests.RequestException as error:
+            with self._lock:
+                self._sent += len(batch)
+                self._errors.append(str(error))
+            return
+        with self._lock:
+            self._sent += len(batch)
+            self._accepted += result['accepted']
+            self._alerts.extend(
+                (alert['sensorId'], received_at - emitted_at) for alert in result['alerts']
+            )
@@ -0,0 +1,265 @@
+"""
+Historical step and scenario timings, kept in a local SQLite ledger.
+
+Every run appends one row to ``runs`` (start time, git SHA, target backend)
+and one row per executed step and scenario to ``timings``. Rows are
+collected in memory by ``TimingRecorder`` and written in a single transaction
+at the end of the run, so recording costs nothing while steps execute.
+
+``regressions`` compares the latest run with the previous ``N`` runs against
+the same target. A step or scenario is flagged when its median duration in
+the latest run is more than ``threshold`` times its median over those runs,
+and at least ``min_seconds`` slower, so microsecond steps do not flag on
+noise. Only passed steps count: a failed step stops early or times out, and
+neither says anything about speed. The queries only read the runs being
+compared, through the ``(run_id, ...)`` index, so a ledger with hundreds of
+thousands of rows reports as quickly as a fresh one.
+
+The ledger is ``reports/timings.sqlite`` unless ``-D timings=PATH`` or
+``SWEET_MANAGER_TIMINGS`` says otherwise; ``-D timings=off`` disables it.
+The target defaults to the live API and can be named with ``-D target=...``
+or ``SWEET_MANAGER_TARGET``. Report from ``steps/``::
+
+    python -m support.timings report --last 20 --threshold 1.5
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+from collections import defaultdict, namedtuple
+from datetime import datetime, timezone
+
+
+TIMINGS_ENV = 'SWEET_MANAGER_TIMINGS'
+TARGET_ENV = 'SWEET_MANAGER_TARGET'
+# Anchored to the repository so the report command finds it from steps/ too
+DEFAULT_LEDGER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'reports', 'timings.sqlite'
+)
+DEFAULT_TARGET = "https://sweetmanager-backend-emergents.onrender.com/api/v1"
+RECORDED_STATUSES = ('passed', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    git_sha TEXT,
+    target TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    kind TEXT NOT NULL CHECK (kind IN ('step', 'scenario')),
+    feature TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_target ON runs(target, id);
+CREATE INDEX IF NOT EXISTS timings_by_run_scenario
+    ON timings(run_id, status, kind, feature, scenario, name, seconds);
+"""
+
+Regression = namedtuple('Regression', 'kind feature scenario name current baseline ratio runs')
+
+
+def timings_settings(userdata=None):
+    """Ledger path and target name, or None when recording is off"""
+    userdata = userdata or {}
+    path = userdata.get('timings', os.environ.get(TIMINGS_ENV, DEFAULT_LEDGER))
+    if path.lower() in ('', '0', 'false', 'no', 'off'):
+        return None
+    return path, userdata.get('target', os.environ.get(TARGET_ENV, DEFAULT_TARGET))
+
+
+def git_sha(cwd=None):
+    """Commit being tested, or None outside a git checkout"""
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True,
+                                text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return os.environ.get('GITHUB_SHA')
+    return result.stdout.strip() or os.environ.get('GITHUB_SHA')
+
+
+def connect(path):
+    """Open a ledger, creating it and its schema when missing"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class TimingRecorder:
+    """Collect a run's step and scenario durations and append them to the ledger"""
+
+    def __init__(self, path, target=DEFAULT_TARGET, sha=None):
+        self.path = path
+        self.target = target
+        self.sha = sha if sha is not None else git_sha()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        self.rows = []
+
+    def step(self, scenario, step):
+        self._add('step', scenario, f"{step.keyword} {step.name}", step)
+
+    def scenario(self, scenario):
+        self._add('scenario', scenario, scenario.name, scenario)
+
+    def _add(self, kind, scenario, name, model):
+        status = model.status.name
+        if status in RECORDED_STATUSES:
+            self.rows.append((kind, scenario.feature.name, scenario.name, name, status, model.duration))
+
+    def save(self):
+        """Write the run; returns its id, or None when nothing ran"""
+        if not self.rows:
+            return None
+        connection = connect(self.path)
+        try:
+            with connection:
+                run_id = connection.execute(
+                    "INSERT INTO runs (started_at, git_sha, target) VALUES (?, ?, ?)",
+                    (self.started_at, self.sha, self.target),
+                ).lastrowid
+                connection.executemany(
+                    "INSERT INTO timings (run_id, kind, feature, scenario, name, status, seconds) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    ((run_id,) + row for row in self.rows),
+                )
+        finally:
+            connection.close()
+        return run_id
+
+
+def _medians(connection, run_ids):
+    """Median passed duration of every step and scenario over the given runs
+
+    Steps are keyed by their scenario too, so shared step text such as
+    "Given the API is available" is compared per scenario, not pooled.
+    """
+    durations = defaultdict(list)
+    marks = ','.join('?' * len(run_ids))
+    query = (f"SELECT kind, feature, scenario, name, seconds FROM timings "
+             f"WHERE run_id IN ({marks}) AND status = 'passed'")
+    for kind, feature, scenario, name, seconds in connection.execute(query, run_ids):
+        durations[kind, feature, scenario, name].append(seconds)
+    return {key: statistics.median(values) for key, values in durations.items()}
+
+
+def _recent_runs(connection, last, target=None):
+    where, params = ("WHERE target = ?", (target,)) if target else ("", ())
+    return [row[0] for row in connection.execute(
+        f"SELECT id FROM runs {where} ORDER BY id DESC LIMIT ?", params + (last,))]
+
+
+def scenario_estimates(connection, last=20, target=None):
+    """Median duration of every scenario over the last runs, failures included
+
+    A scenario that fails by timing out still occupies a worker for as long as
+    it ran, so the scheduler counts those durations too.
+    """
+    run_ids = _recent_runs(connection, last, target)
+    if not run_ids:
+        return {}
+    durations = defaultdict(list)
+    marks = ','.join('?' * len(run_ids))
+    query = (f"SELECT feature, name, seconds FROM timings "
+             f"WHERE run_id IN ({marks}) AND status IN ('passed', 'failed') AND kind = 'scenario'")
+    for feature, name, seconds in connection.execute(query, run_ids):
+        durations[feature, name].append(seconds)
+    return {key: statistics.median(values) for key, values in durations.items()}
+
+
+def read_rows(path):
+    """Timing rows of every run in a ledger, in ``TimingRecorder.rows`` form"""
+    connection = connect(path)
+    try:
+        return connection.execute(
+            "SELECT kind, feature, scenario, name, status, seconds FROM timings ORDER BY rowid"
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def regressions(connection, last=20, threshold=1.5, min_seconds=0.05, target=None, run_id=None):
+    """Steps and scenarios of a run that got slower than over the runs before it
+
+    Returns ``(run, baseline run ids, regressions)``, worst first.
+    """
+    if run_id is None:
+        run_id = next(iter(_recent_runs(connection, 1, target)), None)
+    run = connection.execute("SELECT id, started_at, git_sha, target FROM runs WHERE id = ?",
+                             (run_id,)).fetchone()
+    if run is None:
+        return None, [], []
+    baseline_ids = [row[0] for row in connection.execute(
+        "SELECT id FROM runs WHERE target = ? AND id < ? ORDER BY id DESC LIMIT ?",
+        (run[3], run[0], last),
+    )]
+    if not baseline_ids:
+        return run, [], []
+    current = _medians(connection, [run[0]])
+    baseline = _medians(connection, baseline_ids)
+    found = []
+    for key, seconds in current.items():
+        before = baseline.get(key)
+        if before is None or seconds - before < min_seconds:
+            continue
+        if before == 0 or seconds / before > threshold:
+            ratio = seconds / before if before else float('inf')
+            found.append(Regression(*key, seconds, before, ratio, len(baseline_ids)))
+    found.sort(key=lambda regression: regression.ratio, reverse=True)
+    return run, baseline_ids, found
+
+
+def format_regressions(run, baseline_ids, found, threshold):
+    if run is None:
+        return "No runs recorded"
+    run_id, started_at, sha, target = run
+    header = f"Run #{run_id} ({started_at}, {(sha or 'unknown')[:10]}) against {target}"
+    if not baseline_ids:
+        return f"{header}: no earlier runs to compare with"
+    lines = [f"{header} vs median of the previous {len(baseline_ids)} runs: "
+             f"{len(found)} regressions over {threshold:g}x"]
+    for regression in found:
+        where = f"{regression.feature}: {regression.scenario}"
+        if regression.kind == 'step':
+            where += f": {regression.name}"
+        lines.append(f"  {regression.ratio:>6.1f}x  {regression.baseline:>8.3f}s -> {regression.current:>8.3f}s  "
+                     f"{regression.kind:<8}  {where}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    arguments = argparse.ArgumentParser(description="Step timing ledger")
+    commands = arguments.add_subparsers(dest='command', required=True)
+    report = commands.add_parser('report', help="flag steps that got slower than in the previous runs")
+    report.add_argument('--db', default=os.environ.get(TIMINGS_ENV, DEFAULT_LEDGER))
+    report.add_argument('--last', type=int, default=20, help="number of earlier runs to compare with")
+    report.add_argument('--threshold', type=float, default=1.5, help="slowdown factor that counts as a regression")
+    report.add_argument('--min-seconds', type=float, default=0.05, help="ignore slowdowns smaller than this")
+    report.add_argument('--target', help="only compare runs against this target")
+    report.add_argument('--run', type=int, help="run to check instead of the latest")
+    args = arguments.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"No timing ledger at {args.db}", file=sys.stderr)
+        return 2
+    connection = connect(args.db)
+    try:
+        run, baseline_ids, found = regressions(connection, args.last, args.threshold, args.min_seconds,
+                                               args.target, args.run)
+    finally:
+        connection.close()
+    print(format_regressions(run, baseline_ids, found, args.threshold))
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+JWT helper for the mobile mocks, standing in for the app's TokenHelper.
+
+The app reads the hotel ID and role ID from the session JWT before every
+provider and profile call. ``TokenHelper`` verifies an HS256 token once,
+then memoizes its claims in a bounded cache keyed by the SHA-256 of the
+token. Each entry lives exactly as long as the token's ``exp`` claim.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+
+from support.cache import TTLCache
+from support.clock import SystemClock
+
+
+TEST_SECRET = "sweet-manager-test-secret"
+
+
+class TokenError(Exception):
+    """The token is malformed, tampered with or expired"""
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def encode_token(claims, secret=TEST_SECRET):
+    """Sign claims as an HS256 JWT"""
+    header = _b64encode(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode())
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+    signing_input = f"{header}.{payload}".encode('ascii')
+    signature = hmac.new(secret.encode(), signing_input, hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64encode(signature)}"
+
+
+class TokenHelper:
+    """Verify JWTs once and serve their claims from a bounded cache"""
+
+    def __init__(self, secret=TEST_SECRET, clock=None, max_entries=1024):
+        self.secret = secret.encode()
+        self.cache = TTLCache(0, clock or SystemClock(), max_entries=max_entries)
+
+    @property
+    def clock(self):
+        return self.cache.clock
+
+    def set_clock(self, clock):
+        """Check expiry on another clock; claims cached under the old one are dropped"""
+        self.cache.set_clock(clock)
+
+    def claims(self, token):
+        """Verified claims of a token, decoded at most once per token lifetime"""
+        key = hashlib.sha256(token.encode()).digest()
+        return self.cache.get(key, lambda: self.decode(token), ttl=self._remaining)
+
+    def hotel_id(self, token):
+        return self.claims(token).get('hotelId')
+
+    def role_id(self, token):
+        return self.claims(token).get('roleId')
+
+    def decode(self, token):
+        """Verify the signature and expiry of a token and return its claims"""
+        try:
+            header, payload, signature = token.split('.')
+            expected = hmac.new(
+                self.secret, f"{header}.{payload}".encode('ascii'), hashlib.sha256
+            ).digest()
+            valid = hmac.compare_digest(expected, _b64decode(signature))
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, UnicodeError):
+            raise TokenError("Malformed token")
+        if not valid:
+            raise TokenError("Invalid token signature")
+        if self._remaining(claims) <= 0:
+            raise TokenError("Token expired")
+        return claims
+
+    def _remaining(self, claims):
+        """Seconds until the token expires, on the helper's clock"""
+        if 'exp' not in claims:
+            return float('inf')
+        return claims['exp'] - self.clock.now().timestamp()